@@ -1,3 +1,7 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -5,8 +9,9 @@ from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from .database import get_db
+from .database import session_for, run_db
 from .models import User
+from . import user_cache
 
 import os
 # SECRET_KEY should be in env vars in production
@@ -23,6 +28,70 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# bcrypt costs 100-300 ms of CPU per call. Run it on a small dedicated pool so
+# it never blocks the event loop and a login burst can't take every worker thread.
+# bcrypt releases the GIL, so threads give real parallelism here.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_lock = threading.Lock()
+_hash_stats = {
+    "queued": 0,
+    "running": 0,
+    "completed": 0,
+    "rejected": 0,
+    "max_queue_depth": 0,
+    "total_wait_seconds": 0.0,
+}
+
+def _run_hash_task(fn, args, submitted_at):
+    with _hash_lock:
+        _hash_stats["queued"] -= 1
+        _hash_stats["running"] += 1
+        _hash_stats["total_wait_seconds"] += time.perf_counter() - submitted_at
+    try:
+        return fn(*args)
+    finally:
+        with _hash_lock:
+            _hash_stats["running"] -= 1
+            _hash_stats["completed"] += 1
+
+def _submit_hash_task(fn, *args):
+    with _hash_lock:
+        if _hash_stats["queued"] >= PASSWORD_HASH_MAX_QUEUE:
+            _hash_stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password operations, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        _hash_stats["queued"] += 1
+        _hash_stats["max_queue_depth"] = max(_hash_stats["max_queue_depth"], _hash_stats["queued"])
+    return _hash_executor.submit(_run_hash_task, fn, args, time.perf_counter())
+
+async def verify_password_async(plain_password, hashed_password):
+    """verify_password for async endpoints: awaits the hashing pool instead of blocking the loop."""
+    return await asyncio.wrap_future(_submit_hash_task(verify_password, plain_password, hashed_password))
+
+def get_password_hash_pooled(password):
+    """get_password_hash for sync endpoints: bounded by the hashing pool's concurrency limit."""
+    return _submit_hash_task(get_password_hash, password).result()
+
+def password_hash_stats():
+    with _hash_lock:
+        stats = dict(_hash_stats)
+    stats["workers"] = PASSWORD_HASH_WORKERS
+    stats["max_queue"] = PASSWORD_HASH_MAX_QUEUE
+    return stats
+
+def create_user_access_token(user, expires_delta: Optional[timedelta] = None):
+    """Access token with id and role claims so get_current_user can skip the DB."""
+    return create_access_token(
+        data={"sub": user.email, "uid": user.id, "role": user.role},
+        expires_delta=expires_delta,
+    )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -33,7 +102,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db = Depends(session_for("auth"))):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -49,14 +118,33 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
+
+    # Fast path: tokens carry the user id, so a cached user needs no DB call
+    user_id = payload.get("uid")
+    if user_id is not None:
+        cached = user_cache.get(user_id)
+        if cached is not None and cached.email == email:
+            return cached
+    user = await run_db(db, _load_user, user_id, email)
     if user is None:
         raise credentials_exception
     return user
 
+def _load_user(db: Session, user_id: Optional[int], email: str):
+    query = db.query(User).filter(User.email == email)
+    if user_id is not None:
+        query = query.filter(User.id == user_id)
+    # Tokens issued before uid/role claims existed only carry the email
+    user = query.first()
+    cached = user_cache.put(user) if user else None
+    # End the read transaction so the connection goes back to the pool now, not
+    # when the request ends (streams and long-polls keep their request open)
+    db.commit()
+    return cached
+
 async def get_current_user_optional(
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db = Depends(session_for("auth"))
 ) -> Optional[User]:
     if not token:
         return None
@@ -65,6 +153,15 @@ async def get_current_user_optional(
     except HTTPException:
         return None
 
+async def get_current_user_from_query(
+    token: Optional[str] = Depends(oauth2_scheme),
+    access_token: Optional[str] = None,
+    db = Depends(session_for("auth"))
+):
+    # EventSource and WebSocket clients can't set an Authorization header,
+    # so streaming endpoints also accept ?access_token=
+    return await get_current_user(token or access_token, db)
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     # Add active check if needed
     return current_user
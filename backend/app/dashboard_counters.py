@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import random
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import func, insert, update
+from starlette.concurrency import run_in_threadpool
+
+from . import models
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Running totals behind GET /admin/dashboard.
+#
+# Order creation and every status change adjust dashboard_counters in the same
+# transaction, so the dashboard reads COUNTER_SLOTS rows instead of aggregating
+# the orders table. Each write picks a random slot to keep row-lock contention
+# low. reconcile() recomputes the totals from orders (at startup and every
+# DASHBOARD_RECONCILE_SECONDS) to fix drift from writes that bypass the API,
+# such as seed scripts or manual SQL.
+
+COUNTER_SLOTS = 8
+DASHBOARD_RECONCILE_SECONDS = float(os.getenv("DASHBOARD_RECONCILE_SECONDS", "300"))
+INACTIVE_STATUSES = ["delivered", "cancelled"]
+
+
+def _is_active(status: str) -> bool:
+    return status not in INACTIVE_STATUSES
+
+
+def _apply(db, total_orders: int = 0, active_orders: int = 0, total_revenue=0):
+    slot = random.randrange(COUNTER_SLOTS)
+    counter = models.DashboardCounter
+    result = db.execute(
+        update(counter)
+        .where(counter.slot == slot)
+        .values(
+            total_orders=counter.total_orders + total_orders,
+            active_orders=counter.active_orders + active_orders,
+            total_revenue=counter.total_revenue + total_revenue,
+        )
+    )
+    if result.rowcount == 0:
+        # Not seeded yet (fresh database before the first reconcile)
+        db.execute(insert(counter).values(
+            slot=slot, total_orders=total_orders, active_orders=active_orders, total_revenue=total_revenue
+        ))
+
+
+def order_created(db, total_amount, status: str = "pending"):
+    """Count a new order; call inside the transaction that inserts it."""
+    _apply(db, total_orders=1, active_orders=1 if _is_active(status) else 0, total_revenue=total_amount)
+
+
+def status_changed(db, from_statuses: Iterable[str], to_status: str):
+    """Adjust the active count for an order that moved from one of `from_statuses` to `to_status`."""
+    was_active = {_is_active(status) for status in from_statuses}
+    if len(was_active) != 1:
+        raise ValueError(f"Cannot tell whether an order leaving {sorted(from_statuses)} was active")
+    delta = int(_is_active(to_status)) - int(was_active.pop())
+    if delta:
+        _apply(db, active_orders=delta)
+
+
+def read(db) -> dict:
+    counter = models.DashboardCounter
+    total_orders, active_orders, total_revenue = db.query(
+        func.coalesce(func.sum(counter.total_orders), 0),
+        func.coalesce(func.sum(counter.active_orders), 0),
+        func.coalesce(func.sum(counter.total_revenue), 0),
+    ).one()
+    return {
+        "total_orders": int(total_orders),
+        "active_orders": int(active_orders),
+        "total_revenue": float(total_revenue),
+    }
+
+
+def reconcile(db) -> dict:
+    """Recompute the counters from orders; returns the drift that was corrected."""
+    counter = models.DashboardCounter
+    # Lock the slots first so concurrent writers apply their deltas on top of the rewrite
+    existing = {row.slot for row in db.query(counter).with_for_update().all()}
+    before = read(db)
+    total_orders, total_revenue = db.query(
+        func.count(models.Order.id), func.coalesce(func.sum(models.Order.total_amount), 0)
+    ).one()
+    active_orders = db.query(func.count(models.Order.id)).filter(
+        models.Order.status.notin_(INACTIVE_STATUSES)
+    ).scalar()
+
+    missing = [slot for slot in range(COUNTER_SLOTS) if slot not in existing]
+    if missing:
+        db.execute(insert(counter), [
+            {"slot": slot, "total_orders": 0, "active_orders": 0, "total_revenue": Decimal(0)}
+            for slot in missing
+        ])
+    db.execute(update(counter).where(counter.slot != 0).values(total_orders=0, active_orders=0, total_revenue=0))
+    db.execute(update(counter).where(counter.slot == 0).values(
+        total_orders=total_orders, active_orders=active_orders, total_revenue=total_revenue
+    ))
+    db.commit()
+
+    after = {"total_orders": total_orders, "active_orders": active_orders, "total_revenue": float(total_revenue)}
+    drift = {key: after[key] - before[key] for key in after if after[key] != before[key]}
+    if drift:
+        logger.warning("Dashboard counters drifted; corrected by %s", drift)
+    return drift
+
+
+def reconcile_with_new_session() -> dict:
+    db = SessionLocal()
+    try:
+        return reconcile(db)
+    finally:
+        db.close()
+
+
+async def run_reconcile_loop(interval: float = DASHBOARD_RECONCILE_SECONDS):
+    """Reconcile every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(reconcile_with_new_session)
+        except Exception:
+            logger.exception("Dashboard counter reconciliation failed; will retry")
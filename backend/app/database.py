@@ -1,7 +1,13 @@
+import itertools
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 import os
+from .pool_metrics import InstrumentedQueuePool, instrument_pool
+from . import n_plus_one, request_metrics, sql_profiler
 
 # Use environment variable for DB URL, fallback to default for local dev
 DB_USER = os.getenv("DB_USER", "root")
@@ -12,15 +18,51 @@ DB_NAME = os.getenv("DB_NAME", "food_delivery")
 
 # Prioritize DATABASE_URL if set (common in cloud providers)
 # Prioritize DATABASE_URL if set (common in cloud providers)
+def _normalize_url(url: str) -> str:
+    # Fix for Render/Heroku using postgres:// which SQLAlchemy 1.4+ doesn't support
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
+
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 if SQLALCHEMY_DATABASE_URL:
-    # Fix for Render/Heroku using postgres:// which SQLAlchemy 1.4+ doesn't support
-    if SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
-        SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql://", 1)
+    SQLALCHEMY_DATABASE_URL = _normalize_url(SQLALCHEMY_DATABASE_URL)
 else:
     SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+# Pool settings (ignored for SQLite, which uses its own single-file pools).
+# pre_ping + recycle drop connections the server closed while idle.
+POOL_SETTINGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": _env_flag("DB_POOL_PRE_PING", "true"),
+}
+
+def engine_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {}
+    return dict(POOL_SETTINGS)
+
+def _instrument(sync_engine):
+    request_metrics.instrument_engine(sync_engine)
+    sql_profiler.instrument_engine(sync_engine)
+    n_plus_one.instrument_engine(sync_engine)
+
+def _create_engine(url: str):
+    if url.startswith("sqlite"):
+        new_engine = create_engine(url)
+    else:
+        new_engine = create_engine(url, poolclass=InstrumentedQueuePool, **POOL_SETTINGS)
+    instrument_pool(new_engine)
+    _instrument(new_engine)
+    return new_engine
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -31,3 +73,142 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_session_factory():
+    """
+    Session factory for endpoints that outlive their DB work (SSE streams,
+    long-polls). They open a short session with run_in_new_session instead of
+    depending on get_db, whose session would keep its connection until the
+    response ends.
+    """
+    return SessionLocal
+
+
+# ---------------------------------------------------------------------------
+# Read replicas (optional)
+# ---------------------------------------------------------------------------
+# DATABASE_READ_URL is a comma-separated list of replica URLs. Read-only
+# endpoints depend on get_read_db, which round-robins across them. A client that
+# just wrote is pinned to the primary for READ_YOUR_WRITES_SECONDS (see
+# app/read_your_writes.py) so it never reads its own write from a lagging replica.
+# Without replicas get_read_db is the same as get_db.
+DATABASE_READ_URLS = [
+    _normalize_url(url.strip()) for url in os.getenv("DATABASE_READ_URL", "").split(",") if url.strip()
+]
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+read_engines = [_create_engine(url) for url in DATABASE_READ_URLS]
+_ReadSessionLocals = [sessionmaker(autocommit=False, autoflush=False, bind=e) for e in read_engines]
+_next_replica = itertools.count()
+
+def replicas_enabled() -> bool:
+    return bool(DATABASE_READ_URLS)
+
+def _use_primary(request: Request) -> bool:
+    return getattr(request.state, "read_from_primary", False)
+
+def get_read_db(request: Request):
+    if _ReadSessionLocals and not _use_primary(request):
+        factory = _ReadSessionLocals[next(_next_replica) % len(_ReadSessionLocals)]
+    else:
+        factory = SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ---------------------------------------------------------------------------
+# Async engine (opt-in per router)
+# ---------------------------------------------------------------------------
+# ASYNC_DB_ROUTERS lists the routers whose endpoints should use an AsyncSession,
+# e.g. "menu,guest,orders,auth". Supported so far: menu, guest, orders, auth.
+# The async URL is derived from the sync one (asyncpg for Postgres, aiosqlite for
+# SQLite, aiomysql for MySQL) unless ASYNC_DATABASE_URL is set.
+ASYNC_DB_ROUTERS = {name.strip() for name in os.getenv("ASYNC_DB_ROUTERS", "").split(",") if name.strip()}
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+ASYNC_SQLALCHEMY_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(SQLALCHEMY_DATABASE_URL)
+
+_async_engine = None
+_AsyncSessionLocal = None
+
+def get_async_engine():
+    # Created on first use so the async driver is only needed when a router opts in
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        _async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **engine_options(ASYNC_SQLALCHEMY_DATABASE_URL))
+        instrument_pool(_async_engine.sync_engine)
+        _instrument(_async_engine.sync_engine)
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+async def get_async_db():
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+_async_read_sessions = None
+
+async def get_async_read_db(request: Request):
+    global _async_read_sessions
+    if not DATABASE_READ_URLS or _use_primary(request):
+        async for db in get_async_db():
+            yield db
+        return
+    if _async_read_sessions is None:
+        _async_read_sessions = []
+        for url in DATABASE_READ_URLS:
+            read_engine = create_async_engine(to_async_url(url), **engine_options(url))
+            instrument_pool(read_engine.sync_engine)
+            _instrument(read_engine.sync_engine)
+            _async_read_sessions.append(async_sessionmaker(read_engine, autoflush=False, expire_on_commit=False))
+    factory = _async_read_sessions[next(_next_replica) % len(_async_read_sessions)]
+    async with factory() as db:
+        yield db
+
+async def run_in_new_session(factory, fn, *args, **kwargs):
+    """Run `fn(session, *args)` on a fresh session from `factory`, closed (connection returned) before this returns."""
+    def call():
+        db = factory()
+        try:
+            return fn(db, *args, **kwargs)
+        finally:
+            db.close()
+    return await run_in_threadpool(call)
+
+def async_enabled(router_name: str) -> bool:
+    return router_name in ASYNC_DB_ROUTERS
+
+def session_for(router_name: str):
+    """DB dependency for a router: get_async_db if it opted in, else get_db."""
+    return get_async_db if async_enabled(router_name) else get_db
+
+def read_session_for(router_name: str):
+    """Like session_for, but served by a read replica when one is configured."""
+    return get_async_read_db if async_enabled(router_name) else get_read_db
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Run `fn(session, *args)` without blocking the event loop.
+
+    With an AsyncSession the function runs through run_sync (greenlet-bridged,
+    so lazy loads still work); with a plain Session it runs in the threadpool.
+    Endpoints write their DB work once as a sync function and stay async-safe
+    either way. Serialize ORM objects inside `fn`.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from . import location_store, models, order_events, order_state
+from .database import SessionLocal
+from .spatial import haversine_km
+
+logger = logging.getLogger(__name__)
+
+# Batch auto-dispatch of ready orders to idle drivers.
+#
+# Every tick takes all unassigned `ready` orders and the idle drivers near their
+# pickup points, solves a min-cost matching (Hungarian algorithm) on pickup
+# distance, and applies the result in one transaction through order_state, so a
+# driver who accepted an order by hand in the meantime simply wins that order.
+#
+# Orders are collected from the kitchen at KITCHEN_LAT/KITCHEN_LNG. The loop only
+# runs when DISPATCH_INTERVAL_SECONDS > 0 and the kitchen location is set.
+
+DISPATCH_INTERVAL_SECONDS = float(os.getenv("DISPATCH_INTERVAL_SECONDS", "0"))
+DISPATCH_MAX_PICKUP_KM = float(os.getenv("DISPATCH_MAX_PICKUP_KM", "15"))
+# Each minute an order has waited counts as this many km saved when matching,
+# so that older orders win over newer ones when there are too few drivers
+DISPATCH_AGE_WEIGHT_KM = float(os.getenv("DISPATCH_AGE_WEIGHT_KM", "0.2"))
+DISPATCH_BATCH_LIMIT = int(os.getenv("DISPATCH_BATCH_LIMIT", "200"))
+KITCHEN_LAT = os.getenv("KITCHEN_LAT")
+KITCHEN_LNG = os.getenv("KITCHEN_LNG")
+
+_INFEASIBLE = 1e9
+
+stats = {"ticks": 0, "assigned": 0, "conflicts": 0, "last_tick_ms": 0.0, "last_batch": 0}
+
+
+@dataclass(frozen=True)
+class PendingOrder:
+    order_id: int
+    lat: float
+    lng: float
+    waited_minutes: float = 0.0
+
+
+@dataclass(frozen=True)
+class IdleDriver:
+    driver_id: int
+    lat: float
+    lng: float
+
+
+@dataclass(frozen=True)
+class Match:
+    order_id: int
+    driver_id: int
+    distance_km: float
+
+
+def kitchen_location() -> Optional[Tuple[float, float]]:
+    if not KITCHEN_LAT or not KITCHEN_LNG:
+        return None
+    return float(KITCHEN_LAT), float(KITCHEN_LNG)
+
+
+def min_cost_assignment(cost: Sequence[Sequence[float]]) -> List[Tuple[int, int]]:
+    """
+    Hungarian algorithm (shortest augmenting paths with potentials), O(n^2 m).
+    Returns (row, col) pairs covering min(rows, cols) of a rectangular matrix.
+    """
+    if not cost or not cost[0]:
+        return []
+    transposed = len(cost) > len(cost[0])
+    if transposed:
+        cost = [list(column) for column in zip(*cost)]
+    n, m = len(cost), len(cost[0])
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)  # owner[j] = row matched to column j (1-based, 0 = free)
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced = row[j - 1] - ui0 - v[j]
+                    if reduced < minv[j]:
+                        minv[j] = reduced
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+
+    pairs = [(owner[j] - 1, j - 1) for j in range(1, m + 1) if owner[j]]
+    if transposed:
+        pairs = [(col, row) for row, col in pairs]
+    return sorted(pairs)
+
+
+def plan(orders: Sequence[PendingOrder], drivers: Sequence[IdleDriver],
+         max_pickup_km: float = DISPATCH_MAX_PICKUP_KM,
+         age_weight_km: float = DISPATCH_AGE_WEIGHT_KM) -> List[Match]:
+    """Globally cheapest order -> driver matching; pairs beyond max_pickup_km are never made."""
+    if not orders or not drivers:
+        return []
+    distances = [[haversine_km(o.lat, o.lng, d.lat, d.lng) for d in drivers] for o in orders]
+    cost = [
+        [
+            km - age_weight_km * order.waited_minutes if km <= max_pickup_km else _INFEASIBLE
+            for km in row
+        ]
+        for order, row in zip(orders, distances)
+    ]
+    return [
+        Match(orders[i].order_id, drivers[j].driver_id, distances[i][j])
+        for i, j in min_cost_assignment(cost)
+        if cost[i][j] < _INFEASIBLE
+    ]
+
+
+def _candidates(db, pickup: Tuple[float, float], wanted: int, busy: set) -> List[IdleDriver]:
+    hits = location_store.store.nearest(
+        pickup[0], pickup[1], wanted, DISPATCH_MAX_PICKUP_KM,
+        exclude=busy, max_age=location_store.NEAREST_DRIVER_MAX_AGE,
+    )
+    if not hits:
+        return []
+    # Positions can outlive the account (or its driver role); keep real drivers only
+    drivers = {
+        row.id for row in db.query(models.User.id)
+        .filter(models.User.id.in_([p.driver_id for p, _ in hits]), models.User.role == "driver")
+    }
+    return [IdleDriver(p.driver_id, p.lat, p.lng) for p, _ in hits if p.driver_id in drivers]
+
+
+def run_tick(db, pickup: Tuple[float, float], now: Optional[datetime] = None) -> List[Match]:
+    """Plan and apply one dispatch round; returns the matches that were committed."""
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+    ready = (
+        db.query(models.Order.id, models.Order.created_at)
+        .filter(models.Order.status == order_events.READY_STATUS, models.Order.driver_id.is_(None))
+        .order_by(models.Order.created_at, models.Order.id)
+        .limit(DISPATCH_BATCH_LIMIT)
+        .all()
+    )
+    applied = []
+    if ready:
+        busy = {
+            row.driver_id for row in db.query(models.Order.driver_id)
+            .filter(models.Order.status.in_(order_state.DRIVER_BUSY_STATUSES), models.Order.driver_id.isnot(None))
+            .distinct()
+        }
+        orders = [
+            PendingOrder(row.id, pickup[0], pickup[1], max(0.0, (now - (row.created_at or now)).total_seconds() / 60))
+            for row in ready
+        ]
+        drivers = _candidates(db, pickup, len(orders), busy)
+
+        # All winning assignments land in one transaction
+        for match in plan(orders, drivers):
+            try:
+                order_state.advance(
+                    db, match.order_id, "assigned", [order_events.READY_STATUS],
+                    where=(models.Order.driver_id.is_(None),), driver_id=match.driver_id,
+                )
+            except HTTPException:
+                stats["conflicts"] += 1
+                continue
+            db.add(models.DriverAssignment(order_id=match.order_id, driver_id=match.driver_id, status="assigned"))
+            applied.append(match)
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        for match in applied:
+            order_events.order_status_changed(db, match.order_id, "assigned", order_events.READY_STATUS)
+
+    stats["ticks"] += 1
+    stats["assigned"] += len(applied)
+    stats["last_batch"] = len(ready)
+    stats["last_tick_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return applied
+
+
+def _tick_with_new_session(pickup) -> List[Match]:
+    db = SessionLocal()
+    try:
+        return run_tick(db, pickup)
+    finally:
+        db.close()
+
+
+async def run_dispatch_loop(pickup: Tuple[float, float], interval: float = DISPATCH_INTERVAL_SECONDS):
+    """Dispatch every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_tick_with_new_session, pickup)
+        except Exception:
+            logger.exception("Dispatch tick failed; will retry")
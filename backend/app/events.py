@@ -0,0 +1,138 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+# In-process publish/subscribe for live order updates.
+#
+# Each channel ("kitchen", "delivery", ...) numbers its events with a
+# monotonically increasing sequence and keeps the most recent ones in a ring
+# buffer, so a client that reconnects with the last sequence it saw gets
+# exactly what it missed. Publishers are usually sync endpoints running in the
+# threadpool; subscribers are async generators on the event loop.
+#
+# Events only reach subscribers connected to the same process, which matches
+# the single-worker uvicorn deployment. A multi-worker setup would need a shared
+# transport (e.g. Postgres LISTEN/NOTIFY) behind publish().
+
+HISTORY_SIZE = 1000
+KEEPALIVE_SECONDS = 15.0
+
+
+class Channel:
+    def __init__(self, name: str, history_size: int = HISTORY_SIZE):
+        self.name = name
+        self.seq = 0
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event_type: str, data: dict) -> dict:
+        with self._lock:
+            self.seq += 1
+            event = {"seq": self.seq, "type": event_type, "ts": time.time(), "data": data}
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                with self._lock:
+                    self._subscribers.discard((loop, queue))
+        return event
+
+    def since(self, seq: int) -> Optional[list]:
+        """Events after `seq`, or None if some of them already fell out of the buffer."""
+        with self._lock:
+            if seq > self.seq:
+                return None
+            if self._history and seq < self._history[0]["seq"] - 1:
+                return None
+            if not self._history and seq < self.seq:
+                return None
+            return [event for event in self._history if event["seq"] > seq]
+
+    def subscribe(self):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    async def listen(self, after_seq: int, keepalive: float = KEEPALIVE_SECONDS):
+        """
+        Yield events with seq > after_seq as they are published, starting with
+        any buffered ones. Yields None every `keepalive` seconds of silence.
+        """
+        subscriber = self.subscribe()
+        try:
+            last = after_seq
+            for event in self.since(after_seq) or []:
+                last = event["seq"]
+                yield event
+            queue = subscriber[1]
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                # Already replayed from the buffer
+                if event["seq"] <= last:
+                    continue
+                last = event["seq"]
+                yield event
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def wait(self, after_seq: int, timeout: float) -> list:
+        """Long-poll: return events after `after_seq`, waiting up to `timeout` for the first one."""
+        events = self.since(after_seq)
+        if events:
+            return events
+        subscriber = self.subscribe()
+        try:
+            # Re-check after subscribing so nothing published in between is missed
+            events = self.since(after_seq)
+            if events:
+                return events
+            try:
+                await asyncio.wait_for(subscriber[1].get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return []
+            return self.since(after_seq) or []
+        finally:
+            self.unsubscribe(subscriber)
+
+
+_channels = {}
+_channels_lock = threading.Lock()
+
+
+def channel(name: str) -> Channel:
+    with _channels_lock:
+        if name not in _channels:
+            _channels[name] = Channel(name)
+        return _channels[name]
+
+
+def publish(channel_name: str, event_type: str, data: dict) -> dict:
+    return channel(channel_name).publish(event_type, data)
+
+
+def reset():
+    with _channels_lock:
+        _channels.clear()
+
+
+def format_sse(event: Optional[dict]) -> str:
+    """Server-Sent Events wire format; None becomes a keepalive comment."""
+    if event is None:
+        return ": keepalive\n\n"
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import groupby
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import select
+
+from . import models
+
+# Streaming order export for finance (GET /admin/export/orders).
+#
+# One SELECT of orders joined to their item lines, read through a server-side
+# cursor in YIELD_PER batches and written out as it arrives, so memory stays
+# flat however many orders match. Output is flushed in ~CHUNK_BYTES pieces; the
+# first piece (the CSV header, or the first NDJSON order) goes out at once.
+
+YIELD_PER = 1000
+CHUNK_BYTES = 64 * 1024
+
+ORDER_FIELDS = [
+    "order_id", "created_at", "status", "total_amount", "customer_id", "guest_name",
+    "guest_email", "guest_phone", "delivery_address", "driver_id", "tracking_id",
+]
+ITEM_FIELDS = ["item_id", "menu_item_id", "menu_item_name", "category", "quantity", "item_price"]
+CSV_FIELDS = ORDER_FIELDS + ITEM_FIELDS
+
+
+def _rows(db, date_from: Optional[datetime], date_to: Optional[datetime], statuses: Optional[list]):
+    order, item, menu_item = models.Order, models.OrderItem, models.MenuItem
+    stmt = (
+        select(
+            order.id.label("order_id"), order.created_at, order.status, order.total_amount,
+            order.customer_id, order.guest_name, order.guest_email, order.guest_phone,
+            order.delivery_address, order.driver_id, order.tracking_id,
+            item.id.label("item_id"), item.menu_item_id, menu_item.name.label("menu_item_name"),
+            menu_item.category, item.quantity, item.item_price,
+        )
+        .outerjoin(item, item.order_id == order.id)
+        .outerjoin(menu_item, menu_item.id == item.menu_item_id)
+        .order_by(order.created_at, order.id, item.id)
+    )
+    if date_from:
+        stmt = stmt.where(order.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(order.created_at < date_to)
+    if statuses:
+        stmt = stmt.where(order.status.in_(statuses))
+    # Core execution: rows come back as plain tuples in CSV_FIELDS order
+    return db.connection().execute(stmt.execution_options(yield_per=YIELD_PER))
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _chunked(pieces: Iterable[str]) -> Iterator[bytes]:
+    buffer, size, first = [], 0, True
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if first or size >= CHUNK_BYTES:
+            yield "".join(buffer).encode()
+            buffer, size, first = [], 0, False
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+# Spreadsheets evaluate cells starting with these as formulas (CSV injection)
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        # Names and addresses are user input; a leading quote keeps them plain text
+        return "'" + value
+    return value
+
+
+def _csv_lines(rows) -> Iterator[str]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(CSV_FIELDS)
+    yield out.getvalue()
+    # One write per fetched batch rather than per row
+    for batch in rows.partitions():
+        out.seek(0)
+        out.truncate()
+        writer.writerows([[_csv_value(v) for v in row] for row in batch])
+        yield out.getvalue()
+
+
+_ORDER_COLUMNS = len(ORDER_FIELDS)
+
+
+def _ndjson_lines(rows) -> Iterator[str]:
+    # Rows arrive ordered by order, so each order's item lines are consecutive
+    for _, lines in groupby(rows, key=lambda row: row[0]):
+        lines = list(lines)
+        record = dict(zip(ORDER_FIELDS, lines[0][:_ORDER_COLUMNS]))
+        record["items"] = [
+            dict(zip(ITEM_FIELDS, line[_ORDER_COLUMNS:]))
+            for line in lines
+            if line[_ORDER_COLUMNS] is not None
+        ]
+        yield json.dumps(record, default=_json_default, separators=(",", ":")) + "\n"
+
+
+def stream_orders(db, fmt: str, date_from=None, date_to=None, statuses=None) -> Iterator[bytes]:
+    """CSV has one line per item (order columns repeated); NDJSON has one object per order."""
+    rows = _rows(db, date_from, date_to, statuses)
+    try:
+        lines = _csv_lines(rows) if fmt == "csv" else _ndjson_lines(rows)
+        yield from _chunked(lines)
+    finally:
+        rows.close()
@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, insert, update
+from starlette.concurrency import run_in_threadpool
+
+from . import models
+from .database import SessionLocal
+from .spatial import GridIndex
+
+logger = logging.getLogger(__name__)
+
+# Latest driver positions, held in memory.
+#
+# Drivers report GPS every few seconds; writing each ping would swamp the
+# primary. Pings land here instead, customers read positions from here, and a
+# periodic flush writes the newest position per (driver, order) back to
+# driver_locations in bulk. A downsampled trail (one point per driver every
+# LOCATION_HISTORY_SECONDS, 0 disables it) goes to driver_location_history.
+#
+# Positions live in this process only; after a restart reads fall back to
+# driver_locations until the driver's next ping.
+
+LOCATION_FLUSH_SECONDS = float(os.getenv("LOCATION_FLUSH_SECONDS", "5"))
+LOCATION_HISTORY_SECONDS = float(os.getenv("LOCATION_HISTORY_SECONDS", "30"))
+# Drivers silent for longer than this are not offered as nearest
+NEAREST_DRIVER_MAX_AGE = float(os.getenv("NEAREST_DRIVER_MAX_AGE", "300"))
+
+
+@dataclass(frozen=True)
+class Position:
+    driver_id: int
+    order_id: Optional[int]
+    lat: float
+    lng: float
+    recorded_at: datetime
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Client timestamps may carry an offset; compare everything as naive UTC
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class LocationStore:
+    def __init__(self, history_seconds: float = LOCATION_HISTORY_SECONDS):
+        self.history_seconds = history_seconds
+        self._lock = threading.Lock()
+        self._latest = {}       # driver_id -> Position
+        self._by_order = {}     # order_id -> driver_id
+        self._dirty = {}        # (driver_id, order_id) -> Position awaiting flush
+        self._history = []      # downsampled Positions awaiting flush
+        self._last_history = {}  # driver_id -> recorded_at of last history point
+        self._verified = {}     # order_id -> driver_ids already checked against orders
+        self._index = GridIndex()  # latest position per driver, for nearest-driver lookups
+        self.stats = {"pings": 0, "stale": 0, "flushes": 0, "rows_written": 0}
+
+    def record(self, driver_id: int, points) -> int:
+        """Record a batch of pings for one driver; returns how many were newer than what we had."""
+        now = datetime.utcnow()
+        accepted = 0
+        with self._lock:
+            # A clock running ahead would pin a future point as "latest" and make
+            # every honest ping after it look stale, so nothing is later than now
+            stamped = [(min(_naive_utc(p.recorded_at) or now, now), p) for p in points]
+            for recorded_at, point in sorted(stamped, key=lambda s: s[0]):
+                position = Position(driver_id, point.order_id, point.lat, point.lng, recorded_at)
+                self.stats["pings"] += 1
+                current = self._latest.get(driver_id)
+                if current and current.recorded_at > position.recorded_at:
+                    self.stats["stale"] += 1
+                    continue
+                accepted += 1
+                if current and current.order_id is not None and current.order_id != position.order_id:
+                    if self._by_order.get(current.order_id) == driver_id:
+                        del self._by_order[current.order_id]
+                self._latest[driver_id] = position
+                self._index.upsert(driver_id, position.lat, position.lng)
+                if position.order_id is not None:
+                    self._by_order[position.order_id] = driver_id
+                self._dirty[(driver_id, position.order_id)] = position
+                self._sample_history(position)
+        return accepted
+
+    def _sample_history(self, position: Position):
+        if self.history_seconds <= 0:
+            return
+        last = self._last_history.get(position.driver_id)
+        if last is None or (position.recorded_at - last).total_seconds() >= self.history_seconds:
+            self._history.append(position)
+            self._last_history[position.driver_id] = position.recorded_at
+
+    def is_verified(self, driver_id: int, order_id: int) -> bool:
+        with self._lock:
+            return driver_id in self._verified.get(order_id, ())
+
+    def mark_verified(self, driver_id: int, order_ids):
+        with self._lock:
+            for order_id in order_ids:
+                self._verified.setdefault(order_id, set()).add(driver_id)
+
+    def forget_order(self, order_id: int):
+        """Drop an order's ownership checks and live position, e.g. when its driver changes or it ends."""
+        with self._lock:
+            self._verified.pop(order_id, None)
+            self._by_order.pop(order_id, None)
+
+    def latest_for_driver(self, driver_id: int) -> Optional[Position]:
+        with self._lock:
+            return self._latest.get(driver_id)
+
+    def latest_for_order(self, order_id: int) -> Optional[Position]:
+        with self._lock:
+            driver_id = self._by_order.get(order_id)
+            return self._latest.get(driver_id) if driver_id is not None else None
+
+    def nearest(self, lat: float, lng: float, k: int, max_km: float, exclude=(), max_age: Optional[float] = None):
+        """k closest drivers as (Position, distance_km), skipping `exclude` and positions older than max_age seconds."""
+        oldest = datetime.utcnow() - timedelta(seconds=max_age) if max_age else None
+        with self._lock:
+            def accept(driver_id):
+                if driver_id in exclude:
+                    return False
+                return oldest is None or self._latest[driver_id].recorded_at >= oldest
+            hits = self._index.nearest(lat, lng, k, max_km=max_km, accept=accept)
+            return [(self._latest[driver_id], distance) for driver_id, distance in hits]
+
+    def warm(self, db) -> int:
+        """Seed positions from driver_locations (after a restart); returns drivers loaded."""
+        newest = (
+            db.query(models.DriverLocation.driver_id, func.max(models.DriverLocation.updated_at).label("updated_at"))
+            .filter(models.DriverLocation.driver_id.isnot(None))
+            .group_by(models.DriverLocation.driver_id)
+            .subquery()
+        )
+        rows = (
+            db.query(models.DriverLocation)
+            .join(newest, (models.DriverLocation.driver_id == newest.c.driver_id)
+                  & (models.DriverLocation.updated_at == newest.c.updated_at))
+            .all()
+        )
+        now = datetime.utcnow()
+        loaded = 0
+        with self._lock:
+            for row in rows:
+                if row.driver_id in self._latest or row.updated_at is None:
+                    continue
+                recorded_at = min(_naive_utc(row.updated_at), now)
+                position = Position(row.driver_id, row.order_id, row.lat, row.lng, recorded_at)
+                self._latest[row.driver_id] = position
+                self._index.upsert(row.driver_id, row.lat, row.lng)
+                loaded += 1
+        return loaded
+
+    def all_latest(self) -> list:
+        with self._lock:
+            return list(self._latest.values())
+
+    def flush(self, db) -> int:
+        """Write pending positions and history in bulk; returns rows written."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            history, self._history = self._history, []
+        if not dirty and not history:
+            return 0
+        try:
+            written = self._write(db, list(dirty.values()), history)
+        except Exception:
+            db.rollback()
+            self._requeue(dirty, history)
+            raise
+        with self._lock:
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += written
+        return written
+
+    def _write(self, db, positions, history) -> int:
+        driver_ids = {p.driver_id for p in positions}
+        existing = {}
+        if driver_ids:
+            rows = (
+                db.query(models.DriverLocation.id, models.DriverLocation.driver_id, models.DriverLocation.order_id)
+                .filter(models.DriverLocation.driver_id.in_(driver_ids))
+                .all()
+            )
+            existing = {(row.driver_id, row.order_id): row.id for row in rows}
+
+        updates, inserts = [], []
+        for p in positions:
+            values = {"lat": p.lat, "lng": p.lng, "updated_at": p.recorded_at}
+            row_id = existing.get((p.driver_id, p.order_id))
+            if row_id is not None:
+                updates.append({"id": row_id, **values})
+            else:
+                inserts.append({"driver_id": p.driver_id, "order_id": p.order_id, **values})
+
+        # One executemany each, however many drivers reported
+        if updates:
+            db.execute(update(models.DriverLocation), updates)
+        if inserts:
+            db.execute(insert(models.DriverLocation), inserts)
+        if history:
+            db.execute(insert(models.DriverLocationHistory), [
+                {"driver_id": p.driver_id, "order_id": p.order_id, "lat": p.lat, "lng": p.lng,
+                 "recorded_at": p.recorded_at}
+                for p in history
+            ])
+        db.commit()
+        return len(updates) + len(inserts) + len(history)
+
+    def _requeue(self, dirty, history):
+        with self._lock:
+            for key, position in dirty.items():
+                newer = self._dirty.get(key)
+                if newer is None or newer.recorded_at < position.recorded_at:
+                    self._dirty[key] = position
+            self._history[:0] = history
+
+    def clear(self):
+        with self._lock:
+            self._latest.clear()
+            self._by_order.clear()
+            self._dirty.clear()
+            self._history.clear()
+            self._last_history.clear()
+            self._verified.clear()
+            self._index.clear()
+            for key in self.stats:
+                self.stats[key] = 0
+
+
+store = LocationStore()
+
+
+def stored_for_order(db, order_id: int) -> Optional[Position]:
+    """Last flushed position for an order, for reads before the driver's next ping."""
+    row = (
+        db.query(models.DriverLocation)
+        .filter(models.DriverLocation.order_id == order_id)
+        .order_by(models.DriverLocation.updated_at.desc())
+        .first()
+    )
+    if not row:
+        return None
+    return Position(row.driver_id, row.order_id, row.lat, row.lng, row.updated_at)
+
+
+def warm_from_database() -> int:
+    db = SessionLocal()
+    try:
+        return store.warm(db)
+    finally:
+        db.close()
+
+
+def _flush_with_new_session() -> int:
+    db = SessionLocal()
+    try:
+        return store.flush(db)
+    finally:
+        db.close()
+
+
+async def run_flush_loop(interval: float = LOCATION_FLUSH_SECONDS):
+    """Flush pending positions every `interval` seconds until cancelled."""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await run_in_threadpool(_flush_with_new_session)
+            except Exception:
+                logger.exception("Driver location flush failed; will retry")
+    finally:
+        # Last write on shutdown so the newest positions survive a restart
+        try:
+            await run_in_threadpool(_flush_with_new_session)
+        except Exception:
+            logger.exception("Final driver location flush failed")
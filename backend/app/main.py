@@ -1,13 +1,58 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from .database import engine, Base
+from starlette.concurrency import run_in_threadpool
+from .database import engine, Base, replicas_enabled
+from .read_your_writes import ReadYourWritesMiddleware
+from . import dashboard_counters, dispatch, location_store, menu_search, n_plus_one, request_metrics, sql_profiler
 from .routers import auth, users, menu, orders, payments, kitchen, delivery, admin, guest, upload
 
+logger = logging.getLogger(__name__)
+
 # Create tables (optional, good for dev)
 Base.metadata.create_all(bind=engine)
+menu_search.install(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nearest-driver lookups need positions before the first pings arrive
+    try:
+        await run_in_threadpool(location_store.warm_from_database)
+    except Exception:
+        logger.exception("Could not preload driver locations")
+    # Correct any dashboard counter drift from writes made while we were down
+    try:
+        await run_in_threadpool(dashboard_counters.reconcile_with_new_session)
+    except Exception:
+        logger.exception("Could not reconcile dashboard counters")
+    tasks = [
+        # Background writer for buffered driver locations
+        asyncio.create_task(location_store.run_flush_loop()),
+        # Periodic dashboard counter reconcile
+        asyncio.create_task(dashboard_counters.run_reconcile_loop()),
+    ]
+    # Auto-dispatch is opt-in and needs to know where orders are collected
+    pickup = dispatch.kitchen_location()
+    if dispatch.DISPATCH_INTERVAL_SECONDS > 0:
+        if pickup:
+            tasks.append(asyncio.create_task(dispatch.run_dispatch_loop(pickup)))
+        else:
+            logger.warning("DISPATCH_INTERVAL_SECONDS is set but KITCHEN_LAT/KITCHEN_LNG are not; auto-dispatch disabled")
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
 
-app = FastAPI(title="Food Delivery API")
+app = FastAPI(title="Food Delivery API", lifespan=lifespan)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -26,8 +71,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Debug-SQL", "X-Debug-SQL-Statements"],
 )
 
+# Pin writers to the primary for a moment so they read their own writes
+if replicas_enabled():
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Slow-query log context, and X-Debug-SQL summaries for admins when profiling is on
+if sql_profiler.SQL_PROFILER_ENABLED or sql_profiler.SLOW_QUERY_MS:
+    app.add_middleware(sql_profiler.SqlProfilerMiddleware)
+
+# Flag N+1 query patterns per request (warn in development, raise under pytest)
+if n_plus_one.N_PLUS_ONE_MODE != "off":
+    app.add_middleware(n_plus_one.NPlusOneMiddleware)
+
+# Added last so it is outermost and times the whole stack
+if request_metrics.REQUEST_METRICS_ENABLED:
+    app.add_middleware(request_metrics.MetricsMiddleware)
+    app.add_route("/metrics", request_metrics.metrics_endpoint, include_in_schema=False)
+
 # Include Routers
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+# In-process cache of pre-serialized GET /menu/ responses.
+# Entries are keyed by (version, skip, limit, <filters>); menu writes call
+# invalidate(), which bumps the version so every older entry is ignored.
+# Other workers don't see the bump, so entries also expire after MENU_CACHE_TTL.
+
+MENU_CACHE_TTL = float(os.getenv("MENU_CACHE_TTL", "30"))
+MENU_CACHE_MAX_ENTRIES = 256
+
+_lock = threading.Lock()
+_version = 0
+_invalidated_at = 0.0  # time.monotonic() of the last invalidate()
+_entries = {}
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def make_etag(body: bytes) -> str:
+    # Content-based, so every worker hands out the same ETag for the same menu
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check: a list of tags, weak comparison (W/ ignored), or "*"."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def get(key: tuple) -> Optional[Tuple[bytes, str]]:
+    with _lock:
+        entry = _entries.get((_version,) + key)
+        if entry is None or entry[2] < time.monotonic():
+            _stats["misses"] += 1
+            return None
+        _stats["hits"] += 1
+        return entry[0], entry[1]
+
+
+def put(key: tuple, body: bytes, version: int, settle: float = 0.0) -> Tuple[bytes, str]:
+    etag = make_etag(body)
+    with _lock:
+        # Don't store a result computed before an invalidation landed, nor one read
+        # within `settle` seconds of it (a lagging replica may still serve the old menu)
+        if version == _version and time.monotonic() - _invalidated_at >= settle:
+            if len(_entries) >= MENU_CACHE_MAX_ENTRIES:
+                _entries.clear()
+            _entries[(version,) + key] = (body, etag, time.monotonic() + MENU_CACHE_TTL)
+    return body, etag
+
+
+def current_version() -> int:
+    return _version
+
+
+async def get_or_load(key: tuple, load: Callable, settle: float = 0.0) -> Tuple[bytes, str]:
+    """
+    Return (body, etag) for `key`, awaiting `load()` for the JSON bytes on a miss.
+    Loads within `settle` seconds of an invalidation are served but not cached.
+    """
+    cached = get(key)
+    if cached is not None:
+        return cached
+    version = current_version()
+    return put(key, await load(), version, settle)
+
+
+def invalidate():
+    global _version, _invalidated_at
+    with _lock:
+        _version += 1
+        _invalidated_at = time.monotonic()
+        _entries.clear()
+        _stats["invalidations"] += 1
+
+
+def clear():
+    global _version, _invalidated_at
+    with _lock:
+        _version = 0
+        _invalidated_at = 0.0
+        _entries.clear()
+        for key in _stats:
+            _stats[key] = 0
+
+
+def stats():
+    with _lock:
+        result = dict(_stats)
+        result["version"] = _version
+        result["entries"] = len(_entries)
+    return result
@@ -0,0 +1,80 @@
+import re
+
+from sqlalchemy import DDL, Integer, and_, column, event, or_, text
+
+from . import models
+
+# Text search over menu item names and descriptions.
+#
+# Postgres uses full-text search plus a trigram ILIKE for partial words, both
+# backed by GIN indexes (migrations/006_menu_search.sql). SQLite, used in dev and
+# tests, gets an FTS5 table kept in sync by triggers. Anything else falls back
+# to a plain ILIKE.
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_PG_DOCUMENT = "to_tsvector('simple', coalesce(menu_items.name, '') || ' ' || coalesce(menu_items.description, ''))"
+
+_SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS menu_items_fts USING fts5("
+    "name, description, content='menu_items', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS menu_items_fts_insert AFTER INSERT ON menu_items BEGIN "
+    "INSERT INTO menu_items_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS menu_items_fts_delete AFTER DELETE ON menu_items BEGIN "
+    "INSERT INTO menu_items_fts(menu_items_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS menu_items_fts_update AFTER UPDATE ON menu_items BEGIN "
+    "INSERT INTO menu_items_fts(menu_items_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO menu_items_fts(rowid, name, description) VALUES (new.id, new.name, new.description); END",
+]
+
+# Fresh SQLite schemas (tests, dev) get the FTS table alongside menu_items
+for _statement in _SQLITE_FTS:
+    event.listen(models.MenuItem.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    models.MenuItem.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS menu_items_fts").execute_if(dialect="sqlite"),
+)
+
+
+def install(engine):
+    """Create (and backfill) the SQLite FTS table on a database that predates it; no-op elsewhere."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        for statement in _SQLITE_FTS:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO menu_items_fts(menu_items_fts) VALUES ('rebuild')"))
+
+
+def _contains(value: str) -> str:
+    # \w+ words can still hold "_", a LIKE wildcard; match it literally
+    return "%" + value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def normalize(q: str) -> str:
+    return " ".join(_TOKEN.findall(q.lower()))
+
+
+def search_clause(dialect_name: str, q: str):
+    """WHERE clause matching items whose name or description contains every word of `q`."""
+    words = _TOKEN.findall(q)
+    if not words:
+        return None
+    item = models.MenuItem
+    if dialect_name == "sqlite":
+        # Quote each word so user input can't inject FTS syntax; * makes it a prefix match
+        match = " ".join('"' + word.replace('"', "") + '"*' for word in words)
+        return item.id.in_(text("SELECT rowid FROM menu_items_fts WHERE menu_items_fts MATCH :menu_q")
+                           .bindparams(menu_q=match).columns(column("rowid", Integer)))
+    if dialect_name == "postgresql":
+        phrase = " ".join(words)
+        return or_(
+            # Spelled exactly as in idx_menu_items_search_fts so the planner can use it
+            text(f"{_PG_DOCUMENT} @@ plainto_tsquery('simple', :menu_q)").bindparams(menu_q=phrase),
+            item.name.ilike(_contains(phrase), escape="\\"),
+        )
+    return and_(*[
+        or_(item.name.ilike(_contains(w), escape="\\"), item.description.ilike(_contains(w), escape="\\"))
+        for w in words
+    ])
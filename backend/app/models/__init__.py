@@ -1,5 +1,6 @@
 from .user import User
 from .menu import MenuItem
-from .order import Order, OrderItem, DriverAssignment, DriverLocation
+from .order import Order, OrderItem, DriverAssignment, DriverLocation, DriverLocationHistory
 from .payment import Payment
 from .tracking import Tracking
+from .report import DashboardCounter, SalesDaily, RollupWatermark
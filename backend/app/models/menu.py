@@ -1,8 +1,18 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, Boolean, Text
+from sqlalchemy import Column, Integer, String, DECIMAL, Boolean, Text, Index, text
 from ..database import Base
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
+    __table_args__ = (
+        # GET /menu/ filters live items by availability and category
+        Index("idx_menu_items_deleted_available_category", "is_deleted", "is_available", "category"),
+        # Customer browsing: only live, available items, by category then price
+        Index(
+            "idx_menu_items_live_category_price", "category", "price",
+            postgresql_where=text("is_deleted = false AND is_available = true"),
+            sqlite_where=text("is_deleted = 0 AND is_available = 1"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime # Added for datetime.utcnow
@@ -6,6 +6,12 @@ from ..database import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination indexes for GET /orders/ (one per role branch)
+        Index("idx_orders_created_at_id", "created_at", "id"),
+        Index("idx_orders_customer_created_at_id", "customer_id", "created_at", "id"),
+        Index("idx_orders_driver_created_at_id", "driver_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tracking_id = Column(String(36), unique=True, index=True, nullable=True) # Added
@@ -34,6 +40,9 @@ class Order(Base):
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("idx_order_items_order_id", "order_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     menu_item_id = Column(Integer, ForeignKey("menu_items.id"))
@@ -58,6 +67,10 @@ class DriverAssignment(Base):
 
 class DriverLocation(Base):
     __tablename__ = "driver_locations"
+    __table_args__ = (
+        Index("idx_driver_locations_driver_order", "driver_id", "order_id"),
+        Index("idx_driver_locations_driver_updated", "driver_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"))
@@ -68,3 +81,16 @@ class DriverLocation(Base):
 
     order = relationship("Order", back_populates="driver_location")
     driver = relationship("User", back_populates="driver_locations")
+
+class DriverLocationHistory(Base):
+    __tablename__ = "driver_location_history"
+    __table_args__ = (
+        Index("idx_driver_location_history_driver_recorded", "driver_id", "recorded_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    driver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    recorded_at = Column(DateTime, nullable=False)
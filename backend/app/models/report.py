@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, BigInteger, DECIMAL, Date, String
+from ..database import Base
+
+class DashboardCounter(Base):
+    __tablename__ = "dashboard_counters"
+
+    # Counters are spread over a few slot rows so concurrent orders don't queue on one row lock
+    slot = Column(Integer, primary_key=True, autoincrement=False)
+    total_orders = Column(BigInteger, nullable=False, default=0)
+    active_orders = Column(BigInteger, nullable=False, default=0)
+    total_revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+
+    # One row per (day, hour, category). category "" holds whole-order totals;
+    # other rows hold the item lines of that menu category.
+    day = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True, autoincrement=False)
+    category = Column(String(50), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    last_order_id = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,122 @@
+import logging
+import os
+import re
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# N+1 query detector.
+#
+# Within a request, every statement is reduced to a fingerprint (literals,
+# bind parameters and IN lists collapsed) and counted. Once one shape runs more
+# than N_PLUS_ONE_THRESHOLD times the request is flagged: N_PLUS_ONE_MODE=warn
+# logs it (development), =raise fails it with NPlusOneError before the statement
+# is sent (the test suite sets this), and =off, the default, installs nothing.
+#
+# Relationship loads are tagged by a Session hook so the report names the
+# relationship (e.g. "Order.items") instead of only showing SQL.
+
+N_PLUS_ONE_MODE = os.getenv("N_PLUS_ONE_MODE", "off").lower()
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+RELATIONSHIP_OPTION = "n_plus_one_relationship"
+FINGERPRINT_CACHE_SIZE = 2048
+
+logger = logging.getLogger(__name__)
+
+
+class NPlusOneError(RuntimeError):
+    pass
+
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*(?:\?|__\[POSTCOMPILE_\w+\])(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+_fingerprints = {}
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape with literals, parameters and IN lists collapsed."""
+    cached = _fingerprints.get(statement)
+    if cached is not None:
+        return cached
+    shape = statement
+    for pattern, replacement in _LITERALS:
+        shape = pattern.sub(replacement, shape)
+    shape = shape.strip()
+    if len(_fingerprints) >= FINGERPRINT_CACHE_SIZE:
+        _fingerprints.clear()
+    _fingerprints[statement] = shape
+    return shape
+
+
+class RequestTally:
+    __slots__ = ("request", "counts", "flagged")
+
+    def __init__(self, request: str):
+        self.request = request
+        self.counts = {}
+        self.flagged = set()
+
+
+_current = ContextVar("n_plus_one_tally", default=None)
+
+
+def _describe(tally, shape, relationship):
+    source = f"lazy load of {relationship}" if relationship else "repeated statement"
+    return (
+        f"N+1 queries in {tally.request}: {source} ran {tally.counts[shape]} times "
+        f"(threshold {N_PLUS_ONE_THRESHOLD})\n  {shape}"
+    )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    tally = _current.get()
+    if tally is None:
+        return
+    shape = fingerprint(statement)
+    count = tally.counts.get(shape, 0) + 1
+    tally.counts[shape] = count
+    if count <= N_PLUS_ONE_THRESHOLD or shape in tally.flagged:
+        return
+    tally.flagged.add(shape)
+    message = _describe(tally, shape, context.execution_options.get(RELATIONSHIP_OPTION))
+    if N_PLUS_ONE_MODE == "raise":
+        raise NPlusOneError(message)
+    logger.warning(message)
+
+
+def _tag_relationship_load(orm_execute_state):
+    if orm_execute_state.is_relationship_load:
+        path = orm_execute_state.loader_strategy_path
+        if path is not None:
+            orm_execute_state.update_execution_options(**{RELATIONSHIP_OPTION: str(path.path[-1])})
+
+
+def instrument_engine(engine):
+    """Count the engine's statements per request (no-op when the detector is off)."""
+    if N_PLUS_ONE_MODE == "off":
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    if not event.contains(Session, "do_orm_execute", _tag_relationship_load):
+        event.listen(Session, "do_orm_execute", _tag_relationship_load)
+
+
+class NPlusOneMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current.set(RequestTally(f"{scope['method']} {scope['path']}"))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
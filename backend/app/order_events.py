@@ -0,0 +1,38 @@
+from . import events
+from .query_options import load_order
+from .schemas.order import OrderResponse
+
+# Order lifecycle notifications for the live kitchen display and driver feed.
+# Call these after the change is committed so subscribers never see rolled-back state.
+
+KITCHEN_CHANNEL = "kitchen"
+KITCHEN_STATUSES = ["paid", "preparing"]
+
+DELIVERY_CHANNEL = "delivery"
+READY_STATUS = "ready"
+
+
+def serialize_order(order) -> dict:
+    return OrderResponse.model_validate(order).model_dump(mode="json")
+
+
+def order_paid(db, order_id: int):
+    """A paid order enters the kitchen queue; send it in full so displays need no refetch."""
+    order = load_order(db, order_id)
+    if order:
+        events.publish(KITCHEN_CHANNEL, "order_created", {"order": serialize_order(order)})
+
+
+def order_status_changed(db, order_id: int, status: str, previous_status: str = None):
+    events.publish(KITCHEN_CHANNEL, "status_changed", {"order_id": order_id, "status": status})
+
+    if status == READY_STATUS and previous_status != READY_STATUS:
+        order = load_order(db, order_id)
+        if order:
+            events.publish(DELIVERY_CHANNEL, "order_ready", {"order": serialize_order(order)})
+    elif previous_status == READY_STATUS and status != READY_STATUS:
+        events.publish(DELIVERY_CHANNEL, "order_taken", {"order_id": order_id, "status": status})
+
+
+def delivery_accepted(order_id: int, driver_id: int):
+    events.publish(DELIVERY_CHANNEL, "order_taken", {"order_id": order_id, "driver_id": driver_id})
@@ -0,0 +1,84 @@
+from typing import Iterable
+
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from . import dashboard_counters, location_store, models
+
+# Order status state machine.
+#
+# Every status change is a conditional UPDATE ... WHERE id = ? AND status IN (...)
+# so two requests racing on the same order can't both win: the loser's UPDATE
+# matches no row and gets a 409. Nothing here commits; callers add any related
+# rows (payment, driver assignment) and commit in the same transaction.
+#
+# The graph covers both the kitchen flow (paid -> preparing) and the staff
+# dashboard flow (pending -> cooking).
+
+TRANSITIONS = {
+    "pending": {"paid", "preparing", "cooking", "cancelled"},
+    "paid": {"preparing", "cooking", "ready", "cancelled"},
+    "preparing": {"ready", "cancelled"},
+    "cooking": {"ready", "cancelled"},
+    "ready": {"assigned", "picked_up", "cancelled"},
+    "assigned": {"picked_up", "ready", "cancelled"},
+    "picked_up": {"delivered"},
+    "delivered": set(),
+    "cancelled": set(),
+}
+
+# A driver holding an order in one of these statuses is not available for another
+DRIVER_BUSY_STATUSES = ["assigned", "picked_up"]
+
+# Entering one of these ends (or hands over) a driver's hold on an order, so
+# cached location ownership for it must be checked again
+DRIVER_RELEASE_STATUSES = {"ready", "assigned", "delivered", "cancelled"}
+
+
+def sources(to_status: str) -> list:
+    """Statuses an order may move to `to_status` from."""
+    return sorted(status for status, targets in TRANSITIONS.items() if to_status in targets)
+
+
+def can_transition(from_status: str, to_status: str) -> bool:
+    return to_status in TRANSITIONS.get(from_status, ())
+
+
+def _conflict(db, order_id: int, to_status: str):
+    current = db.query(models.Order.status).filter(models.Order.id == order_id).scalar()
+    if current is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    raise HTTPException(status_code=409, detail=f"Order is {current}, cannot move to {to_status}")
+
+
+def advance(db, order_id: int, to_status: str, from_statuses: Iterable[str], where=(), **values):
+    """
+    Move order `order_id` to `to_status` if it is currently in `from_statuses`
+    (and matches any extra `where` clauses), setting `values` alongside.
+    One round trip when it wins (two if the order enters or leaves the active
+    set, for the dashboard counters); raises 404/409 when it doesn't.
+    """
+    from_statuses = list(from_statuses)
+    result = db.execute(
+        update(models.Order)
+        .where(models.Order.id == order_id, models.Order.status.in_(from_statuses), *where)
+        .values(status=to_status, **values)
+    )
+    if result.rowcount != 1:
+        _conflict(db, order_id, to_status)
+    dashboard_counters.status_changed(db, from_statuses, to_status)
+    if to_status in DRIVER_RELEASE_STATUSES or "driver_id" in values:
+        location_store.store.forget_order(order_id)
+
+
+def advance_from(db, order, to_status: str, force: bool = False, where=(), **values) -> str:
+    """
+    Move an already loaded order on from the status it was read with. Fails with
+    409 if it changed since the read, and 400 if the graph doesn't allow the move
+    (unless `force`). Returns the previous status.
+    """
+    previous = order.status
+    if not force and not can_transition(previous, to_status):
+        raise HTTPException(status_code=400, detail=f"Cannot move order from {previous} to {to_status}")
+    advance(db, order.id, to_status, [previous], where=where, **values)
+    return previous
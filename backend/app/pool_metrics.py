@@ -0,0 +1,64 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from .metrics import Histogram
+
+# Connection pool telemetry: counts from SQLAlchemy pool events plus a
+# histogram of how long callers waited to check a connection out.
+
+checkout_wait = Histogram()
+_lock = threading.Lock()
+_counters = {"connects": 0, "checkouts": 0, "checkins": 0, "invalidations": 0, "timeouts": 0}
+
+
+def _incr(name):
+    with _lock:
+        _counters[name] += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records the time spent waiting for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            _incr("timeouts")
+            raise
+        finally:
+            checkout_wait.observe(time.perf_counter() - start)
+
+
+def instrument_pool(engine):
+    pool = engine.pool
+    event.listen(pool, "connect", lambda dbapi_conn, record: _incr("connects"))
+    event.listen(pool, "checkout", lambda dbapi_conn, record, proxy: _incr("checkouts"))
+    event.listen(pool, "checkin", lambda dbapi_conn, record: _incr("checkins"))
+    event.listen(pool, "invalidate", lambda dbapi_conn, record, exc: _incr("invalidations"))
+
+
+def pool_usage(engine):
+    """Pool class and, for queue pools, current size and checkouts."""
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    # Only queue pools track size/overflow; SQLite's single-connection pools don't
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    return stats
+
+
+def pool_stats(engine):
+    with _lock:
+        stats = dict(_counters)
+    stats.update(pool_usage(engine))
+    stats["checkout_wait_seconds"] = checkout_wait.snapshot()
+    return stats
@@ -0,0 +1,22 @@
+from sqlalchemy.orm import selectinload
+from . import models
+
+# Shared loader options for endpoints that serialize OrderResponse.
+# OrderResponse walks order.items -> item.menu_item, so both levels are loaded up front:
+# items in one batched SELECT ... WHERE order_id IN (...), menu items joined onto it.
+# Listing N orders costs a fixed 2 queries instead of 1 + N + N*items.
+
+def order_response_options():
+    return (
+        selectinload(models.Order.items).joinedload(models.OrderItem.menu_item),
+    )
+
+
+def load_order(db, order_id: int):
+    """Fetch a single order ready for OrderResponse serialization."""
+    return (
+        db.query(models.Order)
+        .options(*order_response_options())
+        .filter(models.Order.id == order_id)
+        .first()
+    )
@@ -0,0 +1,79 @@
+import hashlib
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import Optional
+
+from . import database
+
+# Pins a client to the primary for READ_YOUR_WRITES_SECONDS after it writes.
+#
+# Any successful non-GET request marks the client in a cookie, so a browser that
+# lands on another worker is pinned as well, and, for authenticated clients, in
+# this worker's memory keyed by the bearer token (API clients that drop cookies).
+# Anonymous clients are pinned by the cookie alone: behind a proxy they all
+# share one address, which would pin every guest to the primary. While pinned,
+# get_read_db hands out primary sessions. Only installed when replicas are.
+
+PIN_COOKIE = "db_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+MAX_PINS = 10000
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app, window: float = database.READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.window = window
+        self._lock = threading.Lock()
+        self._pins = {}  # client key -> pinned until (epoch seconds)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        key = self._client_key(scope, headers)
+        now = time.time()
+        until = max(self._pins.get(key, 0.0) if key else 0.0, self._cookie_until(headers))
+        scope.setdefault("state", {})["read_from_primary"] = until > now
+
+        if scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                pinned_until = time.time() + self.window
+                if key:
+                    self._pin(key, pinned_until)
+                cookie = f"{PIN_COOKIE}={pinned_until:.3f}; Max-Age={int(self.window) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+    @staticmethod
+    def _client_key(scope, headers) -> Optional[str]:
+        auth = headers.get(b"authorization")
+        if auth:
+            return hashlib.blake2b(auth, digest_size=16).hexdigest()
+        return None
+
+    @staticmethod
+    def _cookie_until(headers) -> float:
+        raw = headers.get(b"cookie")
+        if not raw:
+            return 0.0
+        morsel = SimpleCookie(raw.decode("latin-1")).get(PIN_COOKIE)
+        try:
+            return float(morsel.value) if morsel else 0.0
+        except ValueError:
+            return 0.0
+
+    def _pin(self, key: str, until: float):
+        with self._lock:
+            if len(self._pins) >= MAX_PINS:
+                now = time.time()
+                self._pins = {k: v for k, v in self._pins.items() if v > now}
+            self._pins[key] = until
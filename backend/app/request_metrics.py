@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from .metrics import Histogram
+from .pool_metrics import checkout_wait
+
+# Per-route HTTP metrics, exposed in Prometheus text format at GET /metrics.
+#
+# MetricsMiddleware times each request and counts response bytes and status
+# codes per (method, route template); the template keeps label cardinality
+# bounded no matter what ids appear in paths. Statements executed while a
+# request is in flight are counted by engine cursor hooks through a context
+# variable, which also reaches the threadpool that runs sync endpoints and the
+# greenlet behind AsyncSession.run_sync. Work outside a request (background
+# loops) isn't attributed.
+#
+# Cost per request is a couple of perf_counter calls, a few dict lookups and
+# three histogram updates; see benchmarks/bench_metrics_overhead.py.
+
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Optional bearer token the scraper must send; empty leaves /metrics open
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+DB_TIME_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    """Database work done on behalf of the current request."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current = ContextVar("request_stats", default=None)
+
+
+def current_stats():
+    """The RequestStats of the request being served, or None outside one."""
+    return _current.get()
+
+
+class _RouteMetrics:
+    __slots__ = ("latency", "size", "db_time", "queries", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.size = Histogram(SIZE_BUCKETS)
+        self.db_time = Histogram(DB_TIME_BUCKETS)
+        self.queries = 0
+        self.statuses = {}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}  # (method, route) -> _RouteMetrics
+        self.in_flight = 0
+
+    def route(self, method: str, route: str) -> _RouteMetrics:
+        key = (method, route)
+        metrics = self._routes.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._routes.setdefault(key, _RouteMetrics())
+        return metrics
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method, route, status, seconds, size, stats: RequestStats):
+        metrics = self.route(method, route)
+        metrics.latency.observe(seconds)
+        metrics.size.observe(size)
+        metrics.db_time.observe(stats.db_seconds)
+        with self._lock:
+            self.in_flight -= 1
+            metrics.queries += stats.queries
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def items(self):
+        """[((method, route), metrics, statuses, queries)] copied under the lock."""
+        with self._lock:
+            return [
+                (key, metrics, dict(metrics.statuses), metrics.queries)
+                for key, metrics in sorted(self._routes.items())
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+registry = Registry()
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        size = 0
+
+        async def send_and_measure(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.started()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            registry.finished(scope["method"], _route_template(scope), status, elapsed, size, stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - context._metrics_start
+
+
+def instrument_engine(engine):
+    """Attribute the engine's statements to the request that runs them."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---------------------------------------------------------------------------
+# Prometheus text exposition
+# ---------------------------------------------------------------------------
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram_lines(name, snapshot, **labels):
+    for bound, count in snapshot["buckets"]:
+        yield f"{name}_bucket{_labels(**labels, le=bound)} {count}"
+    suffix = _labels(**labels) if labels else ""
+    yield f"{name}_sum{suffix} {snapshot['sum']}"
+    yield f"{name}_count{suffix} {snapshot['count']}"
+
+
+def render() -> str:
+    routes = registry.items()
+    lines = [
+        "# HELP http_requests_in_flight Requests currently being served.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {registry.in_flight}",
+    ]
+    families = (
+        ("http_request_duration_seconds", "histogram", "Request latency by route.", "latency"),
+        ("http_response_size_bytes", "histogram", "Response body size by route.", "size"),
+        ("http_request_db_seconds", "histogram", "Time spent in SQL statements per request.", "db_time"),
+    )
+    for name, kind, help_text, attr in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (method, route), metrics, _, _ in routes:
+            lines.extend(_histogram_lines(name, getattr(metrics, attr).snapshot(), method=method, route=route))
+
+    lines.append("# HELP http_requests_total Requests by route and status code.")
+    lines.append("# TYPE http_requests_total counter")
+    for (method, route), _, statuses, _ in routes:
+        for status, count in sorted(statuses.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines.append("# HELP http_request_db_queries_total SQL statements executed by route.")
+    lines.append("# TYPE http_request_db_queries_total counter")
+    for (method, route), _, _, queries in routes:
+        lines.append(f"http_request_db_queries_total{_labels(method=method, route=route)} {queries}")
+
+    lines.append("# HELP db_pool_checkout_wait_seconds Time spent waiting for a pooled connection.")
+    lines.append("# TYPE db_pool_checkout_wait_seconds histogram")
+    lines.extend(_histogram_lines("db_pool_checkout_wait_seconds", checkout_wait.snapshot()))
+    return "\n".join(lines) + "\n"
+
+
+def metrics_endpoint(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        return PlainTextResponse("Not authorized\n", status_code=401)
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from datetime import date, datetime
+from typing import List, Literal, Optional
 from .. import database, models, schemas
+from .. import auth, dashboard_counters, dispatch, exports, user_cache, menu_cache, location_store, sales_rollup
+from ..pool_metrics import pool_stats, pool_usage
 from ..auth import get_current_user
 
 router = APIRouter(
@@ -20,32 +23,79 @@ def get_dashboard_stats(
     current_user: models.User = Depends(get_current_user)
 ):
     check_admin(current_user)
-    
-    total_orders = db.query(models.Order).count()
-    active_orders = db.query(models.Order).filter(models.Order.status.notin_(["delivered", "cancelled"])).count()
-    total_revenue = db.query(func.sum(models.Order.total_amount)).scalar() or 0
-    
-    return {
-        "total_orders": total_orders,
-        "active_orders": active_orders,
-        "total_revenue": float(total_revenue)
-    }
+
+    # Maintained alongside every order write; see app/dashboard_counters.py
+    return dashboard_counters.read(db)
+
+@router.get("/metrics/password-hashing")
+def get_password_hashing_metrics(current_user: models.User = Depends(get_current_user)):
+    check_admin(current_user)
+    return auth.password_hash_stats()
+
+@router.get("/metrics/user-cache")
+def get_user_cache_metrics(current_user: models.User = Depends(get_current_user)):
+    check_admin(current_user)
+    return user_cache.stats()
+
+@router.get("/metrics/menu-cache")
+def get_menu_cache_metrics(current_user: models.User = Depends(get_current_user)):
+    check_admin(current_user)
+    return menu_cache.stats()
+
+@router.get("/metrics/db-pool")
+def get_db_pool_metrics(current_user: models.User = Depends(get_current_user)):
+    check_admin(current_user)
+    stats = pool_stats(database.engine)
+    if database.read_engines:
+        # Counters and wait times above cover all engines; replicas report their own usage
+        stats["replicas"] = [pool_usage(e) for e in database.read_engines]
+    return stats
+
+@router.get("/metrics/driver-locations")
+def get_driver_location_metrics(current_user: models.User = Depends(get_current_user)):
+    check_admin(current_user)
+    store = location_store.store
+    return {**store.stats, "drivers": len(store.all_latest())}
+
+@router.get("/metrics/dispatch")
+def get_dispatch_metrics(current_user: models.User = Depends(get_current_user)):
+    check_admin(current_user)
+    return dispatch.stats
 
 @router.get("/reports/sales")
 def get_sales_report(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    granularity: Literal["day", "hour"] = "day",
+    by_category: bool = False,
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     check_admin(current_user)
-    
-    # Simple daily sales aggregation
-    sales = db.query(
-        func.date(models.Order.created_at).label('date'),
-        func.count(models.Order.id).label('count'),
-        func.sum(models.Order.total_amount).label('revenue')
-    ).group_by(func.date(models.Order.created_at)).all()
-    
-    return [{"date": str(s.date), "count": s.count, "revenue": float(s.revenue)} for s in sales]
+
+    # Served from the sales_daily rollup; only days with new orders are recomputed
+    sales_rollup.ensure_fresh(db)
+    return sales_rollup.report(db, date_from, date_to, granularity, by_category)
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+@router.get("/export/orders")
+def export_orders(
+    format: Literal["csv", "ndjson"] = "csv",
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    status: Optional[List[str]] = Query(None),
+    db: Session = Depends(database.get_read_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    check_admin(current_user)
+
+    # Rows are streamed from a server-side cursor; the session stays open until the body is sent
+    return StreamingResponse(
+        exports.stream_orders(db, format, date_from, date_to, status),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=orders.{format}"},
+    )
 
 @router.post("/menu", response_model=schemas.MenuItem)
 def create_menu_item(
@@ -58,5 +108,6 @@ def create_menu_item(
     new_item = models.MenuItem(**item.dict())
     db.add(new_item)
     db.commit()
+    menu_cache.invalidate()
     db.refresh(new_item)
     return new_item
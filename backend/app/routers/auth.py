@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from .. import database, auth, models
+from .. import database, auth, models, user_cache
 from ..schemas import user as schemas
 
 router = APIRouter(
@@ -9,14 +9,22 @@ router = APIRouter(
     tags=["auth"]
 )
 
+def _find_user(db: Session, email: str):
+    user = db.query(models.User).filter(models.User.email == email).first()
+    if user:
+        # Load the columns the handler reads while still inside the session
+        return user_cache.CachedUser.from_model(user), user.hashed_password
+    return None, None
+
 @router.post("/login", response_model=schemas.Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(database.get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db = Depends(database.session_for("auth"))):
+    user, hashed_password = await database.run_db(db, _find_user, form_data.username)
+    if not user or not await auth.verify_password_async(form_data.password, hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = auth.create_access_token(data={"sub": user.email})
+    access_token = auth.create_user_access_token(user)
+    user_cache.put(user)
     return {"access_token": access_token, "token_type": "bearer"}
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
-from .. import database, models, schemas
+from typing import List, Optional
+from .. import database, events, location_store, models, order_events, order_state, schemas
 from ..auth import get_current_user
+from ..query_options import order_response_options
 
 router = APIRouter(
     prefix="/delivery",
@@ -11,16 +12,60 @@ router = APIRouter(
 
 @router.get("/available", response_model=List[schemas.Order])
 def get_available_deliveries(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     if current_user.role != "driver" and current_user.role != "manager":
         raise HTTPException(status_code=403, detail="Not authorized")
         
     # Drivers see orders that are 'ready'
-    orders = db.query(models.Order).filter(models.Order.status == "ready").all()
+    orders = (
+        db.query(models.Order)
+        .options(*order_response_options())
+        .filter(models.Order.status == order_events.READY_STATUS)
+        .all()
+    )
     return orders
 
+FEED_MAX_WAIT_SECONDS = 30.0
+
+def _ready_snapshot(db: Session):
+    orders = (
+        db.query(models.Order)
+        .options(*order_response_options())
+        .filter(models.Order.status == order_events.READY_STATUS)
+        .all()
+    )
+    return [order_events.serialize_order(order) for order in orders]
+
+@router.get("/feed")
+async def get_delivery_feed(
+    cursor: Optional[int] = None,
+    wait: float = 25.0,
+    session_factory = Depends(database.get_session_factory),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Long-poll feed of orders becoming ready (`order_ready`) and being taken
+    (`order_taken`). Call without a cursor to get a snapshot of ready orders,
+    then keep passing back the returned cursor. Each call answers as soon as
+    there is news, or with no events after `wait` seconds.
+    """
+    if current_user.role != "driver" and current_user.role != "manager":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    channel = events.channel(order_events.DELIVERY_CHANNEL)
+    if cursor is None or channel.since(cursor) is None:
+        # New or stale cursor: start from a snapshot
+        seq = channel.seq
+        orders = await database.run_in_new_session(session_factory, _ready_snapshot)
+        return {"cursor": seq, "snapshot": orders, "events": []}
+
+    # No session is open here, so a waiting poll holds no pooled connection
+    new_events = await channel.wait(cursor, timeout=max(0.0, min(wait, FEED_MAX_WAIT_SECONDS)))
+    next_cursor = new_events[-1]["seq"] if new_events else cursor
+    return {"cursor": next_cursor, "snapshot": None, "events": new_events}
+
 @router.post("/accept/{order_id}")
 def accept_delivery(
     order_id: int,
@@ -30,26 +75,19 @@ def accept_delivery(
     if current_user.role != "driver":
         raise HTTPException(status_code=403, detail="Only drivers can accept deliveries")
         
-    order = db.query(models.Order).filter(models.Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-        
-    if order.status != "ready":
-        raise HTTPException(status_code=400, detail="Order is not ready for pickup")
-        
-    # Assign driver
-    order.driver_id = current_user.id
-    order.status = "picked_up"
+    # Claim the order atomically: only one driver's UPDATE can match status='ready'
+    order_state.advance(db, order_id, "picked_up", ["ready"], driver_id=current_user.id)
     
     # Create assignment record
     assignment = models.DriverAssignment(
-        order_id=order.id,
+        order_id=order_id,
         driver_id=current_user.id,
         status="assigned"
     )
     db.add(assignment)
     
     db.commit()
+    order_events.delivery_accepted(order_id, current_user.id)
     return {"message": "Delivery accepted"}
 
 @router.put("/orders/{order_id}/status")
@@ -73,7 +111,39 @@ def update_delivery_status(
     if status_update.status not in ["picked_up", "delivered"]:
         raise HTTPException(status_code=400, detail="Invalid status for delivery")
         
-    order.status = status_update.status
+    # Drivers may only move orders that are still theirs at write time
+    where = (models.Order.driver_id == current_user.id,) if current_user.role == "driver" else ()
+    previous_status = order_state.advance_from(db, order, status_update.status, where=where)
     db.commit()
+    order_events.order_status_changed(db, order_id, status_update.status, previous_status)
     
     return {"message": f"Order status updated to {status_update.status}"}
+
+@router.post("/locations", status_code=status.HTTP_202_ACCEPTED)
+def ingest_locations(
+    batch: schemas.LocationBatch,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    if current_user.role != "driver":
+        raise HTTPException(status_code=403, detail="Only drivers can report locations")
+
+    # Check order ownership once per (driver, order); later batches skip the query
+    store = location_store.store
+    order_ids = {p.order_id for p in batch.points if p.order_id is not None}
+    unverified = {oid for oid in order_ids if not store.is_verified(current_user.id, oid)}
+    if unverified:
+        owned = {
+            row.id
+            for row in db.query(models.Order.id)
+            .filter(models.Order.id.in_(unverified), models.Order.driver_id == current_user.id,
+                    models.Order.status.in_(order_state.DRIVER_BUSY_STATUSES))
+            .all()
+        }
+        if owned != unverified:
+            raise HTTPException(status_code=403, detail="Order not assigned to this driver")
+        store.mark_verified(current_user.id, owned)
+
+    # Buffered in memory; the background flush writes to driver_locations
+    accepted = store.record(current_user.id, batch.points)
+    return {"received": len(batch.points), "accepted": accepted}
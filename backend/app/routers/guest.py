@@ -1,17 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from .. import database, models, schemas
+from .. import database, location_store, models, schemas
+from ..query_options import order_response_options, load_order
+from ..schemas.location import DriverPosition
 
 router = APIRouter(
     prefix="/guest",
     tags=["guest"]
 )
 
-@router.get("/track/{tracking_input}", response_model=schemas.Order)
-def track_order(
-    tracking_input: str,
-    db: Session = Depends(database.get_db)
-):
+def _find_tracked_order(db: Session, tracking_input: str):
     # 1) Try lookup by numeric Tracking ID (from Tracking Table)
     try:
         tracking_id_val = int(tracking_input)
@@ -19,17 +20,58 @@ def track_order(
         tracking_entry = db.query(models.Tracking).filter(models.Tracking.id == tracking_id_val).first()
         
         # Return the associated order
-        if tracking_entry and tracking_entry.order:
-            return tracking_entry.order
+        if tracking_entry and tracking_entry.order_id:
+            order = load_order(db, tracking_entry.order_id)
+            if order:
+                return schemas.Order.model_validate(order)
             
     except ValueError:
         pass  # not numeric, move on
 
     # 2) Fallback: Lookup by old legacy tracking_id (string) on Order table
     # This keeps backward compatibility if needed, though strictly we use Tracking Table now.
-    order = db.query(models.Order).filter(models.Order.tracking_id == tracking_input).first()
+    order = (
+        db.query(models.Order)
+        .options(*order_response_options())
+        .filter(models.Order.tracking_id == tracking_input)
+        .first()
+    )
+    if order:
+        return schemas.Order.model_validate(order)
+    return None
+
+@router.get("/track/{tracking_input}", response_model=schemas.Order)
+async def track_order(
+    tracking_input: str,
+    db = Depends(database.read_session_for("guest"))
+):
+    order = await database.run_db(db, _find_tracked_order, tracking_input)
     if order:
         return order
 
     # 3) Not found
     raise HTTPException(status_code=404, detail="Order not found")
+
+def _phone_digits(phone: Optional[str]) -> str:
+    return "".join(ch for ch in phone or "" if ch.isdigit())
+
+@router.get("/track/{tracking_input}/driver-location", response_model=DriverPosition)
+async def track_driver_location(
+    tracking_input: str,
+    phone: str = Query(..., min_length=4),
+    db = Depends(database.read_session_for("guest"))
+):
+    # Tracking numbers are sequential, so they alone can't unlock a live driver
+    # position; the guest must also give the phone number the order was placed with.
+    # Any mismatch is a 404 so the route doesn't confirm which orders exist.
+    order = await database.run_db(db, _find_tracked_order, tracking_input)
+    expected = _phone_digits(order.guest_phone) if order else ""
+    if not expected or not hmac.compare_digest(expected, _phone_digits(phone)):
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    position = location_store.store.latest_for_order(order.id)
+    if not position:
+        position = await database.run_db(db, location_store.stored_for_order, order.id)
+    if not position:
+        raise HTTPException(status_code=404, detail="No location for this order")
+    return DriverPosition(**position.__dict__)
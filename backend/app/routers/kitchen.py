@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from .. import database, models, schemas
-from ..auth import get_current_user
+from typing import List, Optional
+from .. import database, events, models, order_events, order_state, schemas, serializers
+from ..auth import get_current_user, get_current_user_from_query
+from ..query_options import order_response_options
 
 router = APIRouter(
     prefix="/kitchen",
@@ -11,15 +13,72 @@ router = APIRouter(
 
 @router.get("/queue", response_model=List[schemas.Order])
 def get_kitchen_queue(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
     if current_user.role != "kitchen":
         raise HTTPException(status_code=403, detail="Not authorized")
         
     # Kitchen sees orders that are 'paid' (new) or 'preparing'
-    orders = db.query(models.Order).filter(models.Order.status.in_(["paid", "preparing"])).all()
-    return orders
+    orders = (
+        db.query(models.Order)
+        .options(*order_response_options())
+        .filter(models.Order.status.in_(order_events.KITCHEN_STATUSES))
+        .all()
+    )
+    return serializers.OrjsonResponse(serializers.orders(orders))
+
+def _queue_snapshot(db: Session):
+    orders = (
+        db.query(models.Order)
+        .options(*order_response_options())
+        .filter(models.Order.status.in_(order_events.KITCHEN_STATUSES))
+        .all()
+    )
+    return [order_events.serialize_order(order) for order in orders]
+
+@router.get("/stream")
+async def stream_kitchen_queue(
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    session_factory = Depends(database.get_session_factory),
+    current_user: models.User = Depends(get_current_user_from_query)
+):
+    """
+    Server-Sent Events feed of the kitchen queue.
+
+    New connections get a `snapshot` event with the current queue, then
+    `order_created` / `status_changed` deltas. Every event id is a sequence
+    number; reconnecting with Last-Event-ID (or ?last_event_id=) resumes after
+    it, falling back to a fresh snapshot if it is too old.
+    """
+    if current_user.role not in ["kitchen", "manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    channel = events.channel(order_events.KITCHEN_CHANNEL)
+    resume_from = last_event_id
+    if resume_from is None and last_event_id_header and last_event_id_header.isdigit():
+        resume_from = int(last_event_id_header)
+
+    snapshot = None
+    if resume_from is None or channel.since(resume_from) is None:
+        # Read the sequence first: anything published during the query is replayed after the snapshot
+        resume_from = channel.seq
+        # Own short session: nothing may hold a pooled connection while the stream is open
+        orders = await database.run_in_new_session(session_factory, _queue_snapshot)
+        snapshot = {"seq": resume_from, "type": "snapshot", "data": {"orders": orders}}
+
+    async def event_stream():
+        if snapshot:
+            yield events.format_sse(snapshot)
+        async for event in channel.listen(resume_from):
+            yield events.format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.put("/orders/{order_id}/status")
 def update_kitchen_status(
@@ -38,7 +97,8 @@ def update_kitchen_status(
     if status_update.status not in ["preparing", "ready"]:
         raise HTTPException(status_code=400, detail="Invalid status for kitchen")
         
-    order.status = status_update.status
+    previous_status = order_state.advance_from(db, order, status_update.status)
     db.commit()
+    order_events.order_status_changed(db, order_id, status_update.status, previous_status)
     
     return {"message": f"Order status updated to {status_update.status}"}
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from decimal import Decimal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
-from .. import database, models, auth
+from typing import List, Optional
+from .. import database, models, auth, menu_cache, menu_search, serializers
 from ..schemas import menu as schemas
 
 router = APIRouter(
@@ -9,10 +10,56 @@ router = APIRouter(
     tags=["menu"]
 )
 
+# Clients and nginx may reuse the menu but must revalidate it with If-None-Match
+MENU_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+def _list_menu_items(db: Session, skip: int, limit: int, category: Optional[str], available: Optional[bool],
+                     min_price: Optional[Decimal], max_price: Optional[Decimal], q: Optional[str]):
+    query = db.query(models.MenuItem).filter(models.MenuItem.is_deleted == False)
+    if category:
+        query = query.filter(models.MenuItem.category == category)
+    if available is not None:
+        query = query.filter(models.MenuItem.is_available == available)
+    if min_price is not None:
+        query = query.filter(models.MenuItem.price >= min_price)
+    if max_price is not None:
+        query = query.filter(models.MenuItem.price <= max_price)
+    if q:
+        clause = menu_search.search_clause(db.get_bind().dialect.name, q)
+        if clause is not None:
+            query = query.filter(clause)
+    items = query.order_by(models.MenuItem.id).offset(skip).limit(limit).all()
+    return serializers.dumps(serializers.menu_items(items))
+
 @router.get("/", response_model=List[schemas.MenuItemResponse])
-def read_menu_items(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    items = db.query(models.MenuItem).filter(models.MenuItem.is_deleted == False).offset(skip).limit(limit).all()
-    return items
+async def read_menu_items(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[str] = None,
+    available: Optional[bool] = None,
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    q: Optional[str] = Query(None, max_length=100),
+    db = Depends(database.read_session_for("menu"))
+):
+    q = menu_search.normalize(q) if q else None
+    load = lambda: database.run_db(db, _list_menu_items, skip, limit, category, available, min_price, max_price, q)
+    if q:
+        # Free-text searches are too varied to be worth caching; they would only evict the common listings
+        body = await load()
+        etag = menu_cache.make_etag(body)
+    else:
+        # Unpinned reads may come from a replica that hasn't caught up with the last menu
+        # write yet; don't cache those until the read-your-writes window has passed
+        settle = database.READ_YOUR_WRITES_SECONDS if database.replicas_enabled() else 0.0
+        body, etag = await menu_cache.get_or_load(
+            (skip, limit, category, available, min_price, max_price), load, settle
+        )
+    headers = {"ETag": etag, "Cache-Control": MENU_CACHE_CONTROL}
+    if menu_cache.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.post("/", response_model=schemas.MenuItemResponse)
 def create_menu_item(
@@ -26,6 +73,7 @@ def create_menu_item(
     db_item = models.MenuItem(**item.dict())
     db.add(db_item)
     db.commit()
+    menu_cache.invalidate()
     db.refresh(db_item)
     return db_item
 
@@ -47,6 +95,7 @@ def update_menu_item(
         setattr(db_item, key, value)
         
     db.commit()
+    menu_cache.invalidate()
     db.refresh(db_item)
     return db_item
 
@@ -65,4 +114,5 @@ def delete_menu_item(
         
     db_item.is_deleted = True
     db.commit()
+    menu_cache.invalidate()
     return {"message": "Item deleted"}
@@ -1,9 +1,15 @@
 import uuid
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import List
-from .. import database, models, auth
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
+from .. import database, models, auth, dashboard_counters, location_store, order_events, order_state, serializers
+from ..pagination import keyset_page
+from ..query_options import order_response_options, load_order
 from ..schemas import order as schemas
+from ..schemas.location import DriverPosition
 from pydantic import BaseModel
 
 
@@ -24,17 +30,21 @@ def create_order(
     if not customer_id and not (order.guest_name and order.guest_phone):
         raise HTTPException(status_code=400, detail="Guest name and phone required for guest orders")
 
-    # Calculate total and prepare items
+    # Price every line item with a single IN (...) query
+    menu_item_ids = {item.menu_item_id for item in order.items}
+    menu_items = {
+        m.id: m
+        for m in db.query(models.MenuItem).filter(models.MenuItem.id.in_(menu_item_ids)).all()
+    }
+
     total_amount = 0
     order_items_data = []
-    
     for item in order.items:
-        menu_item = db.query(models.MenuItem).filter(models.MenuItem.id == item.menu_item_id).first()
+        menu_item = menu_items.get(item.menu_item_id)
         if not menu_item:
             raise HTTPException(status_code=404, detail=f"Menu item {item.menu_item_id} not found")
-        
-        item_total = menu_item.price * item.quantity
-        total_amount += item_total
+
+        total_amount += menu_item.price * item.quantity
         order_items_data.append({
             "menu_item_id": item.menu_item_id,
             "quantity": item.quantity,
@@ -51,57 +61,79 @@ def create_order(
         guest_email=order.guest_email,
         guest_phone=order.guest_phone
     )
+    db_tracking = models.Tracking(order=db_order, status="pending")
     db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
 
-    # Create Tracking Record (Separate Table)
-    db_tracking = models.Tracking(
-        order_id=db_order.id,
-        status="pending"
-    )
-    db.add(db_tracking)
-    db.commit()
-    db.refresh(db_tracking)
-    
-    # Fake/Inject the Tracking ID into the response object so the Schema picks it up
-    # Schema expects 'tracking_id' (str). We give it the new Tracking Table ID.
-    db_order.tracking_id = str(db_tracking.id)
-
-    # Save order items
-
-    # Save order items
-    for item_data in order_items_data:
-        db_item = models.OrderItem(
-            order_id=db_order.id,
-            menu_item_id=item_data["menu_item_id"],
-            quantity=item_data["quantity"],
-            item_price=item_data["item_price"]
+    # Order, tracking row and items all go out in one transaction
+    try:
+        db.flush()
+        # Expose the Tracking Table ID as the order's tracking_id
+        db_order.tracking_id = str(db_tracking.id)
+
+        # Bulk insert the items as a single executemany, then load them back in one SELECT.
+        # menu_item resolves from the identity map, so no per-item queries.
+        for item_data in order_items_data:
+            item_data["order_id"] = db_order.id
+        if order_items_data:
+            db.execute(insert(models.OrderItem), order_items_data)
+        items = (
+            db.query(models.OrderItem)
+            .filter(models.OrderItem.order_id == db_order.id)
+            .order_by(models.OrderItem.id)
+            .all()
         )
-        db.add(db_item)
-    
-    db.commit()
-    db.refresh(db_order)
-    
-    # Re-inject Tracking ID (refresh wipes it out)
-    db_order.tracking_id = str(db_tracking.id)
-    
-    return db_order
+        set_committed_value(db_order, "items", items)
+        dashboard_counters.order_created(db, total_amount)
+
+        # Build the response before commit so expire_on_commit doesn't trigger reloads
+        response = schemas.OrderResponse.model_validate(db_order)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return response
+
+def _list_orders(db: Session, current_user, cursor, limit, status, created_from, created_to, customer_id):
+    query = db.query(models.Order).options(*order_response_options())
 
-@router.get("/", response_model=List[schemas.OrderResponse])
-def read_orders(
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_user)
-):
     # Filter by role
     if current_user.role in ["admin", "kitchen"]:
-        return db.query(models.Order).all()
+        if customer_id is not None:
+            query = query.filter(models.Order.customer_id == customer_id)
     elif current_user.role == "driver":
-        return db.query(models.Order).filter(models.Order.driver_id == current_user.id).all()
+        query = query.filter(models.Order.driver_id == current_user.id)
     else:
-        return db.query(models.Order).filter(models.Order.customer_id == current_user.id).all()
+        query = query.filter(models.Order.customer_id == current_user.id)
+
+    if status:
+        query = query.filter(models.Order.status == status)
+    if created_from:
+        query = query.filter(models.Order.created_at >= created_from)
+    if created_to:
+        query = query.filter(models.Order.created_at < created_to)
+
+    orders, next_cursor = keyset_page(query, models.Order.created_at, models.Order.id, cursor, limit)
+    return serializers.orders(orders), next_cursor
+
+@router.get("/", response_model=List[schemas.OrderResponse])
+async def read_orders(
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    customer_id: Optional[int] = None,
+    db = Depends(database.read_session_for("orders")),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    orders, next_cursor = await database.run_db(
+        db, _list_orders, current_user, cursor, limit, status, created_from, created_to, customer_id
+    )
+
+    # The body stays a plain list; the cursor for the next page travels in a header
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return serializers.OrjsonResponse(orders, headers=headers)
 
 class OrderStatusUpdate(BaseModel):
     status: str
@@ -121,10 +153,13 @@ def update_order_status(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
         
-    order.status = status_update.status
+    # Admins may force any status; everyone else follows the state machine
+    previous_status = order_state.advance_from(
+        db, order, status_update.status, force=current_user.role == "admin"
+    )
     db.commit()
-    db.refresh(order)
-    return order
+    order_events.order_status_changed(db, order_id, status_update.status, previous_status)
+    return load_order(db, order_id)
 
 class AssignDriverRequest(BaseModel):
     driver_id: int
@@ -147,18 +182,53 @@ def assign_driver(
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
         
-    order.driver_id = driver.id
-    order.status = "assigned" # Auto update status
+    # Auto update status
+    previous_status = order_state.advance_from(db, order, "assigned", driver_id=driver.id)
     db.commit()
-    db.refresh(order)
-    return order
+    order_events.order_status_changed(db, order_id, "assigned", previous_status)
+    return load_order(db, order_id)
+
+def _get_order_response(db: Session, order_id: int):
+    order = load_order(db, order_id)
+    return schemas.OrderResponse.model_validate(order) if order else None
 
 @router.get("/{order_id}", response_model=schemas.OrderResponse)
-def get_order(
+async def get_order(
     order_id: int,
-    db: Session = Depends(database.get_db)
+    db = Depends(database.read_session_for("orders"))
 ):
-    order = db.query(models.Order).filter(models.Order.id == order_id).first()
+    order = await database.run_db(db, _get_order_response, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     return order
+
+def _order_parties(db: Session, order_id: int):
+    return (
+        db.query(models.Order.customer_id, models.Order.driver_id)
+        .filter(models.Order.id == order_id)
+        .first()
+    )
+
+@router.get("/{order_id}/driver-location", response_model=DriverPosition)
+async def get_driver_location(
+    order_id: int,
+    db = Depends(database.read_session_for("orders")),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    # Served from memory; the table is only consulted after a restart
+    position = location_store.store.latest_for_order(order_id)
+
+    # Staff see every order, and the driver reporting for it is already verified;
+    # anyone else must be the order's customer or assigned driver
+    if current_user.role not in ["admin", "kitchen"] and not (position and position.driver_id == current_user.id):
+        parties = await database.run_db(db, _order_parties, order_id)
+        if not parties:
+            raise HTTPException(status_code=404, detail="Order not found")
+        if current_user.id not in (parties.customer_id, parties.driver_id):
+            raise HTTPException(status_code=403, detail="Not authorized")
+
+    if not position:
+        position = await database.run_db(db, location_store.stored_for_order, order_id)
+    if not position:
+        raise HTTPException(status_code=404, detail="No location for this order")
+    return DriverPosition(**position.__dict__)
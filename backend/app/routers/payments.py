@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from .. import database, models, schemas
+from .. import database, models, order_events, order_state, schemas
 from ..auth import get_current_user
 from datetime import datetime
 import uuid
@@ -18,12 +18,8 @@ def process_payment(
     # Simulate payment processing
     # In a real system, this would interact with Stripe/PayPal
     
-    order = db.query(models.Order).filter(models.Order.id == payment_data.order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    if order.status == "paid":
-        raise HTTPException(status_code=400, detail="Order already paid")
+    # Mark the order paid first: a concurrent or repeated payment loses here with a 409
+    order_state.advance(db, payment_data.order_id, "paid", ["pending"])
 
     # Create payment record
     transaction_id = str(uuid.uuid4())
@@ -36,17 +32,13 @@ def process_payment(
     )
     
     db.add(new_payment)
-    
-    # Update order status
-    order.status = "paid"
-    
     db.commit()
-    db.refresh(new_payment)
+    order_events.order_paid(db, payment_data.order_id)
     
     return {"message": "Payment successful", "transaction_id": transaction_id, "status": "completed"}
 
 @router.get("/{order_id}")
-def get_payment_status(order_id: int, db: Session = Depends(database.get_db)):
+def get_payment_status(order_id: int, db: Session = Depends(database.get_read_db)):
     payment = db.query(models.Payment).filter(models.Payment.order_id == order_id).first()
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
@@ -1,9 +1,10 @@
 # backend/app/routers/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
-from .. import database, models, auth
+from .. import database, models, auth, location_store, order_state, serializers, user_cache
 from ..schemas import user as schemas
+from ..schemas.location import NearestDriver
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -21,7 +22,7 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
     if db.query(models.User).filter(models.User.email == user.email).first():
         raise HTTPException(status_code=400, detail="Email already registered")
     # Hash password and create user
-    hashed_password = auth.get_password_hash(user.password)
+    hashed_password = auth.get_password_hash_pooled(user.password)
     db_user = models.User(
         email=user.email,
         name=user.name,
@@ -37,11 +38,12 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
 def read_users_me(current_user: models.User = Depends(auth.get_current_active_user)):
     return current_user
 # backend/app/routers/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
-from .. import database, models, auth
+from .. import database, models, auth, location_store, order_state, serializers, user_cache
 from ..schemas import user as schemas
+from ..schemas.location import NearestDriver
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -59,7 +61,7 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
     if db.query(models.User).filter(models.User.email == user.email).first():
         raise HTTPException(status_code=400, detail="Email already registered")
     # Hash password and create user
-    hashed_password = auth.get_password_hash(user.password)
+    hashed_password = auth.get_password_hash_pooled(user.password)
     db_user = models.User(
         email=user.email,
         name=user.name,
@@ -77,24 +79,60 @@ def read_users_me(current_user: models.User = Depends(auth.get_current_active_us
 
 @router.get("/drivers", response_model=List[schemas.UserResponse])
 def get_drivers(
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     if current_user.role not in ["admin", "kitchen"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     return db.query(models.User).filter(models.User.role == "driver").all()
 
+@router.get("/drivers/nearest", response_model=List[NearestDriver])
+def get_nearest_drivers(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=50),
+    radius_km: float = Query(20, gt=0, le=200),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    if current_user.role not in ["admin", "kitchen"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    # Idle means no order currently assigned or picked up
+    busy = {
+        row.driver_id
+        for row in db.query(models.Order.driver_id)
+        .filter(models.Order.status.in_(order_state.DRIVER_BUSY_STATUSES), models.Order.driver_id.isnot(None))
+        .distinct()
+    }
+    hits = location_store.store.nearest(
+        lat, lng, k, radius_km, exclude=busy, max_age=location_store.NEAREST_DRIVER_MAX_AGE
+    )
+    if not hits:
+        return []
+
+    names = dict(
+        db.query(models.User.id, models.User.name)
+        .filter(models.User.id.in_([p.driver_id for p, _ in hits]), models.User.role == "driver")
+    )
+    return [
+        NearestDriver(driver_id=p.driver_id, name=names[p.driver_id], lat=p.lat, lng=p.lng,
+                      distance_km=round(distance, 3), recorded_at=p.recorded_at)
+        for p, distance in hits
+        if p.driver_id in names
+    ]
+
 @router.get("/", response_model=List[schemas.UserResponse])
 def read_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(database.get_db),
+    db: Session = Depends(database.get_read_db),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
     users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
+    return serializers.OrjsonResponse(serializers.users(users))
 
 @router.put("/{user_id}", response_model=schemas.UserResponse)
 def update_user(
@@ -119,9 +157,10 @@ def update_user(
              raise HTTPException(status_code=400, detail="Invalid role")
         db_user.role = user_update.role
     if user_update.password:
-        db_user.hashed_password = auth.get_password_hash(user_update.password)
+        db_user.hashed_password = auth.get_password_hash_pooled(user_update.password)
         
     db.commit()
+    user_cache.invalidate(user_id)
     db.refresh(db_user)
     return db_user
 
@@ -140,4 +179,5 @@ def delete_user(
         
     db.delete(db_user)
     db.commit()
+    user_cache.invalidate(user_id)
     return {"message": "User deleted"}
\ No newline at end of file
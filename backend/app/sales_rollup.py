@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import distinct, extract, func, insert
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+
+# Pre-aggregated sales behind GET /admin/reports/sales.
+#
+# sales_daily holds one row per (day, hour, category): category "" is whole
+# orders (count and total_amount), the other categories are item lines. A
+# refresh recomputes only days that gained orders since the last processed order
+# id (the watermark), plus today and yesterday, which still have orders
+# committing behind a higher id. Reports read the rollup and refresh it first
+# if it is more than SALES_ROLLUP_MAX_AGE seconds old.
+
+ROLLUP_NAME = "sales_daily"
+TOTAL_CATEGORY = ""
+UNCATEGORIZED = "uncategorized"
+SALES_ROLLUP_MAX_AGE = float(os.getenv("SALES_ROLLUP_MAX_AGE", "60"))
+
+_lock = threading.Lock()
+_last_refresh: Optional[float] = None
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def _day_runs(days: Iterable[date]) -> List[Tuple[date, date]]:
+    """Group days into contiguous [start, end) runs so each run is one range scan."""
+    runs = []
+    for day in sorted(set(days)):
+        if runs and runs[-1][1] == day:
+            runs[-1][1] = day + timedelta(days=1)
+        else:
+            runs.append([day, day + timedelta(days=1)])
+    return [(start, end) for start, end in runs]
+
+
+def _aggregate(db, start: date, end: date) -> list:
+    order = models.Order
+    day = func.date(order.created_at)
+    hour = extract("hour", order.created_at)
+    in_range = (
+        order.created_at >= datetime.combine(start, datetime.min.time()),
+        order.created_at < datetime.combine(end, datetime.min.time()),
+    )
+
+    lines = (
+        db.query(
+            day, hour, models.MenuItem.category,
+            func.count(distinct(order.id)),
+            func.sum(models.OrderItem.quantity),
+            func.sum(models.OrderItem.item_price * models.OrderItem.quantity),
+        )
+        .join(models.OrderItem, models.OrderItem.order_id == order.id)
+        .join(models.MenuItem, models.MenuItem.id == models.OrderItem.menu_item_id)
+        .filter(*in_range)
+        .group_by(day, hour, models.MenuItem.category)
+        .all()
+    )
+    rows = {}
+    items_per_hour = {}
+    for d, h, category, orders, items, revenue in lines:
+        key = (_as_date(d), int(h), category or UNCATEGORIZED)
+        row = rows.setdefault(key, {"order_count": 0, "item_count": 0, "revenue": 0})
+        row["order_count"] += orders
+        row["item_count"] += items or 0
+        row["revenue"] += revenue or 0
+        items_per_hour[key[:2]] = items_per_hour.get(key[:2], 0) + (items or 0)
+
+    totals = (
+        db.query(day, hour, func.count(order.id), func.sum(order.total_amount))
+        .filter(*in_range)
+        .group_by(day, hour)
+        .all()
+    )
+    for d, h, orders, revenue in totals:
+        key = (_as_date(d), int(h))
+        rows[key + (TOTAL_CATEGORY,)] = {
+            "order_count": orders, "item_count": items_per_hour.get(key, 0), "revenue": revenue or 0
+        }
+
+    return [
+        {"day": d, "hour": h, "category": category, **values}
+        for (d, h, category), values in rows.items()
+    ]
+
+
+def _lock_watermark(db):
+    """The rollup's watermark row, locked for this transaction; created on first use."""
+    query = (
+        db.query(models.RollupWatermark)
+        .filter(models.RollupWatermark.name == ROLLUP_NAME)
+        .with_for_update()
+    )
+    watermark = query.first()
+    if watermark is None:
+        # Migrations seed the row; databases built by create_all don't
+        try:
+            db.add(models.RollupWatermark(name=ROLLUP_NAME, last_order_id=0))
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # another worker created it first
+        watermark = query.first()
+    return watermark
+
+
+def refresh(db, now: Optional[datetime] = None) -> dict:
+    """Bring sales_daily up to date; returns how many days were recomputed."""
+    global _last_refresh
+    with _lock:
+        watermark = _lock_watermark(db)
+        last_id = watermark.last_order_id
+        max_id = db.query(func.max(models.Order.id)).scalar() or 0
+
+        changed = db.query(func.date(models.Order.created_at)).filter(models.Order.id > last_id).distinct()
+        dirty = {_as_date(d) for (d,) in changed if d is not None}
+        today = (now or datetime.utcnow()).date()
+        dirty |= {today, today - timedelta(days=1)}
+
+        for start, end in _day_runs(dirty):
+            db.query(models.SalesDaily).filter(
+                models.SalesDaily.day >= start, models.SalesDaily.day < end
+            ).delete(synchronize_session=False)
+            rows = _aggregate(db, start, end)
+            if rows:
+                db.execute(insert(models.SalesDaily), rows)
+
+        watermark.last_order_id = max_id
+        db.commit()
+        _last_refresh = time.monotonic()
+    return {"days_refreshed": len(dirty), "last_order_id": max_id}
+
+
+def ensure_fresh(db, max_age: float = SALES_ROLLUP_MAX_AGE):
+    if _last_refresh is None or time.monotonic() - _last_refresh > max_age:
+        refresh(db)
+
+
+def report(db, date_from: Optional[date] = None, date_to: Optional[date] = None,
+           granularity: str = "day", by_category: bool = False) -> list:
+    """Sales per day (or hour), optionally split by category; both dates inclusive."""
+    sales = models.SalesDaily
+    columns = [sales.day]
+    if granularity == "hour":
+        columns.append(sales.hour)
+    if by_category:
+        columns.append(sales.category)
+
+    query = db.query(*columns, func.sum(sales.order_count), func.sum(sales.item_count), func.sum(sales.revenue))
+    query = query.filter(sales.category != TOTAL_CATEGORY if by_category else sales.category == TOTAL_CATEGORY)
+    if date_from:
+        query = query.filter(sales.day >= date_from)
+    if date_to:
+        query = query.filter(sales.day <= date_to)
+    rows = query.group_by(*columns).order_by(*columns).all()
+
+    result = []
+    for row in rows:
+        values = list(row)
+        entry = {"date": str(_as_date(values.pop(0)))}
+        if granularity == "hour":
+            entry["hour"] = values.pop(0)
+        if by_category:
+            entry["category"] = values.pop(0)
+        count, items, revenue = values
+        entry["count"] = count
+        if by_category:
+            entry["items"] = items
+        entry["revenue"] = float(revenue or 0)
+        result.append(entry)
+    return result
+
+
+def reset():
+    global _last_refresh
+    _last_refresh = None
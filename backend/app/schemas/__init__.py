@@ -2,3 +2,4 @@ from .user import User, UserCreate, Token, TokenData, UserLogin
 from .menu import MenuItem, MenuItemCreate, MenuItemUpdate
 from .order import Order, OrderCreate, OrderItem, OrderItemCreate, OrderStatusUpdate, OrderResponse, OrderItemResponse
 from .payment import Payment, PaymentCreate
+from .location import LocationPoint, LocationBatch, DriverPosition, NearestDriver
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+class LocationPoint(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    order_id: Optional[int] = None
+    recorded_at: Optional[datetime] = None
+
+class LocationBatch(BaseModel):
+    points: List[LocationPoint] = Field(..., min_length=1, max_length=500)
+
+class DriverPosition(BaseModel):
+    driver_id: int
+    order_id: Optional[int] = None
+    lat: float
+    lng: float
+    recorded_at: datetime
+
+class NearestDriver(BaseModel):
+    driver_id: int
+    name: str
+    lat: float
+    lng: float
+    distance_km: float
+    recorded_at: datetime
@@ -0,0 +1,92 @@
+from decimal import Decimal
+from typing import Optional, get_args, get_origin
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from .schemas.menu import MenuItemResponse
+from .schemas.order import OrderResponse
+from .schemas.user import UserResponse
+
+# Direct JSON for the big list endpoints.
+#
+# FastAPI would validate every ORM row into its response model and then dump
+# the models; for a page of orders with nested items and menu items that is
+# most of the request's CPU. These build plain dicts straight from the loaded
+# rows, walking the response models' fields in declaration order, and encode
+# them with orjson. Output is byte-for-byte what the models produce (Decimal as
+# a string, datetimes in ISO 8601 with a Z for UTC); tests/test_serializers.py
+# holds them to that. The response_model on each route still documents the shape.
+
+_DECIMAL, _NESTED, _NESTED_LIST = 1, 2, 3
+
+
+def _plan(model):
+    """(field, kind, nested plan) for each field of a response model."""
+    plan = []
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        if annotation in (Decimal, Optional[Decimal]):
+            plan.append((name, _DECIMAL, None))
+        elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            plan.append((name, _NESTED, _plan(annotation)))
+        elif get_origin(annotation) is list and issubclass(get_args(annotation)[0], BaseModel):
+            plan.append((name, _NESTED_LIST, _plan(get_args(annotation)[0])))
+        else:
+            plan.append((name, 0, None))
+    return tuple(plan)
+
+
+def _row(obj, plan) -> dict:
+    # Loaded ORM attributes sit in the instance __dict__; reading them there skips
+    # the instrumented descriptor. Anything missing (expired, unloaded) goes through getattr.
+    loaded = obj.__dict__
+    row = {}
+    for name, kind, nested in plan:
+        value = loaded[name] if name in loaded else getattr(obj, name)
+        if kind == _DECIMAL:
+            # Columns give Decimals already; match the model's coercion for anything else
+            if value is not None and type(value) is not Decimal:
+                value = Decimal(str(value))
+        elif kind == _NESTED_LIST:
+            value = [_row(child, nested) for child in value]
+        elif kind == _NESTED and value is not None:
+            value = _row(value, nested)
+        row[name] = value
+    return row
+
+
+_ORDER = _plan(OrderResponse)
+_MENU_ITEM = _plan(MenuItemResponse)
+_USER = _plan(UserResponse)
+
+
+def orders(rows) -> list:
+    """OrderResponse-shaped dicts; items and their menu items must already be loaded."""
+    return [_row(order, _ORDER) for order in rows]
+
+
+def menu_items(rows) -> list:
+    return [_row(item, _MENU_ITEM) for item in rows]
+
+
+def users(rows) -> list:
+    return [_row(user, _USER) for user in rows]
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+class OrjsonResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
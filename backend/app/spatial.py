@@ -0,0 +1,118 @@
+import math
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Uniform lat/lng grid for k-nearest-driver lookups.
+#
+# Each driver sits in one cell of CELL_KM (~1 km at the equator). A query scans
+# rings of cells outward from the pickup point and stops as soon as the k-th
+# best distance found is no further than anything in the unscanned rings, so
+# cost tracks local density rather than the total number of drivers.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+DEFAULT_CELL_KM = 1.0
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """Point index keyed by id; not thread-safe, callers hold their own lock."""
+
+    def __init__(self, cell_km: float = DEFAULT_CELL_KM):
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._points: Dict[int, Tuple[float, float, Tuple[int, int]]] = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def upsert(self, key: int, lat: float, lng: float):
+        cell = self._cell(lat, lng)
+        current = self._points.get(key)
+        if current and current[2] != cell:
+            self._discard(key, current[2])
+        self._points[key] = (lat, lng, cell)
+        self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key: int):
+        current = self._points.pop(key, None)
+        if current:
+            self._discard(key, current[2])
+
+    def _discard(self, key: int, cell):
+        members = self._cells.get(cell)
+        if members:
+            members.discard(key)
+            if not members:
+                del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._points.clear()
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int = 5,
+        max_km: Optional[float] = None,
+        accept: Optional[Callable[[int], bool]] = None,
+    ) -> List[Tuple[int, float]]:
+        """Return up to k (key, distance_km) pairs, closest first."""
+        if k <= 0 or not self._points:
+            return []
+        ci, cj = self._cell(lat, lng)
+        # Longitude cells shrink towards the poles; bound with the worst case in range
+        reach_lat = min(89.0, abs(lat) + (max_km or 0) / KM_PER_DEGREE)
+        lng_scale = max(math.cos(math.radians(reach_lat)), 0.01)
+        ring_km = self.cell_deg * KM_PER_DEGREE * lng_scale
+        max_ring = math.ceil(max_km / ring_km) + 1 if max_km is not None else None
+
+        found: List[Tuple[float, int]] = []
+        seen = 0
+        ring = 0
+        while True:
+            for cell in _ring_cells(ci, cj, ring):
+                members = self._cells.get(cell)
+                if not members:
+                    continue
+                for key in members:
+                    seen += 1
+                    if accept is not None and not accept(key):
+                        continue
+                    p_lat, p_lng, _ = self._points[key]
+                    distance = haversine_km(lat, lng, p_lat, p_lng)
+                    if max_km is None or distance <= max_km:
+                        found.append((distance, key))
+            # Everything outside rings 0..ring is at least ring * cell away
+            if len(found) >= k:
+                found.sort()
+                del found[k:]
+                if found[-1][0] <= ring * ring_km:
+                    break
+            if seen >= len(self._points) or (max_ring is not None and ring >= max_ring):
+                break
+            ring += 1
+        found.sort()
+        return [(key, distance) for distance, key in found[:k]]
+
+
+def _ring_cells(ci: int, cj: int, ring: int):
+    if ring == 0:
+        yield (ci, cj)
+        return
+    for dj in range(-ring, ring + 1):
+        yield (ci - ring, cj + dj)
+        yield (ci + ring, cj + dj)
+    for di in range(-ring + 1, ring):
+        yield (ci + di, cj - ring)
+        yield (ci + di, cj + ring)
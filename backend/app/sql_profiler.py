@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import re
+import time
+from contextvars import ContextVar
+
+from jose import JWTError, jwt
+from sqlalchemy import event
+
+# Opt-in SQL profiler and slow-query log.
+#
+# Cursor hooks on every engine time each statement. Statements slower than
+# SLOW_QUERY_MS are logged as one JSON object per line on the "app.sql.slow"
+# logger, with the request that ran them (parameters are never logged).
+#
+# With SQL_PROFILER_ENABLED, an admin can send `X-Debug-SQL: 1` on any request:
+# its statements, timings and row counts are collected in request.state.sql_profile
+# and a summary comes back in the X-Debug-SQL (totals) and X-Debug-SQL-Statements
+# (slowest statements, JSON) response headers. Admin is judged from the signed
+# role claim in the bearer token, so no extra query is made. Headers go out
+# before a streamed body, so statements run while streaming aren't included.
+
+SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER_ENABLED", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SQL_PROFILE_MAX_STATEMENTS = int(os.getenv("SQL_PROFILE_MAX_STATEMENTS", "500"))
+
+DEBUG_HEADER = b"x-debug-sql"
+SUMMARY_STATEMENTS = 5
+STATEMENT_PREVIEW = 200
+SLOW_LOG_STATEMENT = 2000
+
+slow_logger = logging.getLogger("app.sql.slow")
+
+_request = ContextVar("sql_profiler_request", default=None)  # "METHOD /path"
+_profile = ContextVar("sql_profile", default=None)  # list of statement dicts, when profiling
+
+
+def current_profile():
+    """Statements recorded so far for the current request, or None when not profiling."""
+    return _profile.get()
+
+
+def _compact(statement: str, limit: int) -> str:
+    statement = re.sub(r"\s+", " ", statement).strip()
+    return statement if len(statement) <= limit else statement[: limit - 3] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._profile_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - context._profile_start) * 1000
+    rowcount = cursor.rowcount if cursor.rowcount >= 0 else None
+
+    profile = _profile.get()
+    if profile is not None and len(profile) < SQL_PROFILE_MAX_STATEMENTS:
+        profile.append({"statement": statement, "ms": elapsed_ms, "rows": rowcount, "executemany": executemany})
+
+    if SLOW_QUERY_MS and elapsed_ms >= SLOW_QUERY_MS:
+        slow_logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(elapsed_ms, 2),
+            "rows": rowcount,
+            "executemany": executemany,
+            "request": _request.get(),
+            "statement": _compact(statement, SLOW_LOG_STATEMENT),
+        }))
+
+
+def instrument_engine(engine):
+    """Time the engine's statements for the slow-query log and per-request profiles."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _is_admin(headers) -> bool:
+    from .auth import ALGORITHM, SECRET_KEY
+
+    scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("role") == "admin"
+    except JWTError:
+        return False
+
+
+def summary_headers(profile):
+    """(name, value) header pairs summarising a request's statements."""
+    total_ms = sum(s["ms"] for s in profile)
+    shapes = {}
+    for s in profile:
+        shapes[s["statement"]] = shapes.get(s["statement"], 0) + 1
+    summary = f"queries={len(profile)}; total_ms={total_ms:.2f}; distinct={len(shapes)}"
+    slowest = sorted(profile, key=lambda s: s["ms"], reverse=True)[:SUMMARY_STATEMENTS]
+    detail = [
+        {"ms": round(s["ms"], 3), "rows": s["rows"], "count": shapes[s["statement"]],
+         "sql": _compact(s["statement"], STATEMENT_PREVIEW)}
+        for s in slowest
+    ]
+    return [
+        (b"x-debug-sql", summary.encode()),
+        (b"x-debug-sql-statements", json.dumps(detail, separators=(",", ":")).encode()),
+    ]
+
+
+class SqlProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_token = _request.set(f"{scope['method']} {scope['path']}")
+        headers = dict(scope.get("headers") or [])
+        profile = None
+        if SQL_PROFILER_ENABLED and headers.get(DEBUG_HEADER) and _is_admin(headers):
+            profile = []
+            scope.setdefault("state", {})["sql_profile"] = profile
+        profile_token = _profile.set(profile)
+
+        async def send_with_summary(message):
+            if profile is not None and message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + summary_headers(profile)}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            _profile.reset(profile_token)
+            _request.reset(request_token)
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+# Small TTL + LRU cache of authenticated users, keyed by user id.
+# get_current_user consults it before hitting the users table, so the common
+# authenticated request makes no auth-related DB call. Entries are dropped by
+# users.update_user/delete_user; other workers converge within the TTL.
+
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Detached snapshot of the user columns handlers read (id, role, profile)."""
+    id: int
+    email: str
+    name: str
+    role: str
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, user):
+        return cls(id=user.id, email=user.email, name=user.name, role=user.role, created_at=user.created_at)
+
+
+_lock = threading.Lock()
+_entries: "OrderedDict[int, tuple]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+
+def get(user_id: int) -> Optional[CachedUser]:
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry is None or entry[1] < now:
+            if entry is not None:
+                del _entries[user_id]
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(user_id)
+        _stats["hits"] += 1
+        return entry[0]
+
+
+def put(user) -> CachedUser:
+    cached = user if isinstance(user, CachedUser) else CachedUser.from_model(user)
+    with _lock:
+        _entries[cached.id] = (cached, time.monotonic() + AUTH_USER_CACHE_TTL)
+        _entries.move_to_end(cached.id)
+        while len(_entries) > AUTH_USER_CACHE_SIZE:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+    return cached
+
+
+def invalidate(user_id: int):
+    with _lock:
+        if _entries.pop(user_id, None) is not None:
+            _stats["invalidations"] += 1
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+        for key in _stats:
+            _stats[key] = 0
+
+
+def stats():
+    with _lock:
+        result = dict(_stats)
+        result["size"] = len(_entries)
+    lookups = result["hits"] + result["misses"]
+    result["hit_rate"] = result["hits"] / lookups if lookups else 0.0
+    return result
@@ -0,0 +1,151 @@
+"""
+Benchmark for the order-write path (POST /orders/).
+
+Compares the legacy create_order (one SELECT per item, three commits)
+with the current single-transaction implementation for orders with
+1, 10 and 50 items, reporting DB round trips and latency per order.
+
+Usage (from backend/):
+    python benchmarks/bench_create_order.py [--orders 200] [--database-url sqlite:///bench.db]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import Base
+from app.routers.orders import create_order
+from app.schemas.order import OrderCreate
+
+ITEM_COUNTS = (1, 10, 50)
+
+
+class RoundTripCounter:
+    """Counts statements and commits sent to the database."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def _on_commit(self, conn):
+        self.count += 1
+
+
+def legacy_create_order(order, db):
+    """The pre-batching implementation, kept here as the baseline."""
+    total_amount = 0
+    order_items_data = []
+    for item in order.items:
+        menu_item = db.query(models.MenuItem).filter(models.MenuItem.id == item.menu_item_id).first()
+        total_amount += menu_item.price * item.quantity
+        order_items_data.append({
+            "menu_item_id": item.menu_item_id,
+            "quantity": item.quantity,
+            "item_price": menu_item.price
+        })
+
+    db_order = models.Order(
+        status="pending",
+        delivery_address=order.delivery_address,
+        total_amount=total_amount,
+        guest_name=order.guest_name,
+        guest_phone=order.guest_phone
+    )
+    db.add(db_order)
+    db.commit()
+    db.refresh(db_order)
+
+    db_tracking = models.Tracking(order_id=db_order.id, status="pending")
+    db.add(db_tracking)
+    db.commit()
+    db.refresh(db_tracking)
+    db_order.tracking_id = str(db_tracking.id)
+
+    for item_data in order_items_data:
+        db.add(models.OrderItem(order_id=db_order.id, **item_data))
+    db.commit()
+    db.refresh(db_order)
+    db_order.tracking_id = str(db_tracking.id)
+    return db_order
+
+
+def current_create_order(order, db):
+    return create_order(order=order, db=db, current_user=None)
+
+
+def seed_menu(session_factory, count):
+    db = session_factory()
+    db.add_all([
+        models.MenuItem(name=f"Item {i}", price=5 + i % 10, category="Bench")
+        for i in range(count)
+    ])
+    db.commit()
+    ids = [m.id for m in db.query(models.MenuItem.id).all()]
+    db.close()
+    return ids
+
+
+def run(name, fn, session_factory, counter, payload, n_orders):
+    latencies = []
+    round_trips = []
+    for _ in range(n_orders):
+        db = session_factory()
+        before = counter.count
+        start = time.perf_counter()
+        fn(payload, db)
+        latencies.append((time.perf_counter() - start) * 1000)
+        round_trips.append(counter.count - before)
+        db.close()
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{name:<8} items={len(payload.items):<3} "
+        f"round_trips={statistics.mean(round_trips):6.1f} "
+        f"p50={statistics.median(latencies):7.2f}ms p99={p99:7.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=200, help="orders per scenario")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counter = RoundTripCounter(engine)
+
+    menu_ids = seed_menu(session_factory, max(ITEM_COUNTS))
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    for n_items in ITEM_COUNTS:
+        payload = OrderCreate(
+            delivery_address="1 Bench St",
+            guest_name="Bench",
+            guest_phone="555-0000",
+            items=[{"menu_item_id": menu_ids[i], "quantity": 2} for i in range(n_items)],
+        )
+        run("before", legacy_create_order, session_factory, counter, payload, args.orders)
+        run("after", current_create_order, session_factory, counter, payload, args.orders)
+
+    Base.metadata.drop_all(bind=engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark for the streaming order export (GET /admin/export/orders).
+
+For growing order counts (three item lines each), compares the streaming
+export with materialising the orders through the ORM and OrderResponse, as
+GET /orders/ does. Reports time to first byte, total time and peak Python
+heap (tracemalloc) for each.
+
+Usage (from backend/):
+    python benchmarks/bench_export.py [--sizes 10000,50000,200000] [--format csv] [--materialise-max 50000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import exports, models
+from app.database import Base
+from app.query_options import order_response_options
+from app.schemas.order import OrderResponse
+
+
+def populate(db, count, rng):
+    menu = [models.MenuItem(name=f"Item {i}", description="", price=3 + i, category="Main") for i in range(10)]
+    db.add_all(menu)
+    db.commit()
+    start = datetime(2025, 1, 1)
+    for offset in range(0, count, 20_000):
+        ids = range(offset + 1, min(count, offset + 20_000) + 1)
+        db.execute(insert(models.Order), [
+            {"id": i, "status": "delivered", "delivery_address": "bench", "total_amount": 30,
+             "created_at": start + timedelta(minutes=i)} for i in ids
+        ])
+        db.execute(insert(models.OrderItem), [
+            {"order_id": i, "menu_item_id": rng.choice(menu).id, "quantity": 1, "item_price": 10}
+            for i in ids for _ in range(3)
+        ])
+        db.commit()
+
+
+def measure(fn):
+    # Timing and heap tracing in separate passes; tracemalloc slows allocation-heavy code a lot
+    started = time.perf_counter()
+    first_byte = None
+    total = 0
+    for chunk in fn():
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        total += len(chunk)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for _ in fn():
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_byte, elapsed, peak, total
+
+
+def materialised(db):
+    orders = db.query(models.Order).options(*order_response_options()).order_by(models.Order.created_at).all()
+    body = [OrderResponse.model_validate(order).model_dump(mode="json") for order in orders]
+    yield json.dumps(body).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,50000,200000")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--materialise-max", type=int, default=50000,
+                        help="skip the in-memory baseline above this many orders")
+    args = parser.parse_args()
+
+    print(f"{'orders':>8} {'mode':>12} {'first byte':>11} {'total':>9} {'peak heap':>10} {'bytes':>12}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        path = os.path.join(tempfile.mkdtemp(), "export.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        with Session() as db:
+            populate(db, size, random.Random(1))
+        modes = [("stream", lambda db: exports.stream_orders(db, args.format))]
+        if size <= args.materialise_max:
+            modes.append(("materialise", materialised))
+        for mode, fn in modes:
+            with Session() as db:
+                first, total, peak, written = measure(lambda: (db.expunge_all(), fn(db))[1])
+            print(f"{size:>8} {mode:>12} {first * 1000:>9.1f}ms {total:>8.2f}s {peak / 2**20:>8.1f}MB {written:>12,}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Micro-benchmarks for per-request hot paths, with stored baselines.
+
+Times, on fixed synthetic inputs (1, 100 and 1000 orders of 5 items each,
+built as transient ORM objects, so no database is involved):
+
+  order_validate     OrderResponse.model_validate over ORM orders (from_attributes)
+  order_serialize    JSON encoding of the validated List[OrderResponse]
+  menu_validate      MenuItemResponse.model_validate over 5 menu items per order
+  order_total        create_order's Decimal price * quantity summing
+  jwt_encode/decode  create_user_access_token and jwt.decode (single token)
+
+Each case reports the best per-call time over several rounds, with GC paused.
+A fixed pure-Python calibration workload is timed right after the case in every
+round, and comparisons use the median case/calibration ratio, which absorbs
+most of the drift in machine speed between runs (CPU steal, frequency scaling). --save writes the results to
+the baseline file; --check compares against it and exits non-zero when any case
+is relatively slower than baseline by more than --tolerance. Baselines are
+still best recorded on the machine that checks them.
+
+Usage (from backend/):
+    python benchmarks/bench_hot_paths.py [--save | --check] [--tolerance 0.3]
+        [--baseline benchmarks/baselines/hot_paths.json] [--only order_validate]
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from jose import jwt
+from pydantic import TypeAdapter
+
+from app import auth, models
+from app.schemas.menu import MenuItemResponse
+from app.schemas.order import OrderResponse
+
+ORDER_COUNTS = (1, 100, 1000)
+ITEMS_PER_ORDER = 5
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "hot_paths.json"
+CREATED_AT = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def make_menu():
+    return [
+        models.MenuItem(id=n + 1, name=f"Item {n}", description=f"Synthetic item {n}",
+                        price=Decimal(f"{5 + n % 7}.{n % 100:02d}"), image_url=f"/static/{n}.jpg",
+                        category=("Burgers", "Sides", "Drinks")[n % 3], is_available=True)
+        for n in range(50)
+    ]
+
+
+def make_orders(count, menu):
+    orders = []
+    for n in range(count):
+        items = [
+            models.OrderItem(id=n * ITEMS_PER_ORDER + i + 1, menu_item_id=menu[(n + i) % len(menu)].id,
+                             menu_item=menu[(n + i) % len(menu)], quantity=1 + (n + i) % 3,
+                             item_price=menu[(n + i) % len(menu)].price)
+            for i in range(ITEMS_PER_ORDER)
+        ]
+        orders.append(models.Order(
+            id=n + 1, tracking_id=str(n + 1), status="paid", delivery_address=f"{n} Bench St",
+            total_amount=sum(item.item_price * item.quantity for item in items), created_at=CREATED_AT,
+            customer_id=n % 10 + 1, items=items,
+        ))
+    return orders
+
+
+def order_total(lines):
+    # Mirrors the pricing loop in create_order
+    total = 0
+    for price, quantity in lines:
+        total += price * quantity
+    return total
+
+
+def build_cases():
+    menu = make_menu()
+    order_list = TypeAdapter(List[OrderResponse])
+    cases = {}
+    for count in ORDER_COUNTS:
+        orders = make_orders(count, menu)
+        validated = [OrderResponse.model_validate(o) for o in orders]
+        menu_items = [item.menu_item for o in orders for item in o.items]
+        lines = [[(item.item_price, item.quantity) for item in o.items] for o in orders]
+        cases[f"order_validate[{count}]"] = lambda orders=orders: [OrderResponse.model_validate(o) for o in orders]
+        cases[f"order_serialize[{count}]"] = lambda validated=validated: order_list.dump_json(validated)
+        cases[f"menu_validate[{count}]"] = lambda items=menu_items: [MenuItemResponse.model_validate(m) for m in items]
+        cases[f"order_total[{count}]"] = lambda lines=lines: [order_total(order_lines) for order_lines in lines]
+
+    user = models.User(id=42, email="bench@example.com", role="customer")
+    token = auth.create_user_access_token(user)
+    cases["jwt_encode"] = lambda: auth.create_user_access_token(user)
+    cases["jwt_decode"] = lambda: jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+    return cases
+
+
+def calibration():
+    # Fixed pure-Python workload; its speed tracks how fast this machine is right now
+    data = {n: str(n) for n in range(2000)}
+    return sorted(data.values(), key=len)
+
+
+def loop_count(fn, target_seconds=0.05):
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= target_seconds or loops >= 1_000_000:
+            return loops
+        loops *= 4
+
+
+def per_call(fn, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return (time.perf_counter() - start) / loops
+
+
+def measure(fn, repeats):
+    """
+    (best seconds per call, median of case/calibration) over `repeats` rounds.
+    Each round times the case and then the calibration back to back, so both
+    see the same machine conditions. GC is paused, as timeit does.
+    """
+    loops, reference_loops = loop_count(fn), loop_count(calibration)
+    timings, ratios = [], []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            seconds = per_call(fn, loops)
+            timings.append(seconds)
+            ratios.append(seconds / per_call(calibration, reference_loops))
+    finally:
+        gc.enable()
+    return min(timings), statistics.median(ratios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help="record the results as the new baseline")
+    mode.add_argument("--check", action="store_true", help="fail if slower than the baseline beyond --tolerance")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative slowdown per case")
+    parser.add_argument("--repeats", type=int, default=9)
+    parser.add_argument("--only", help="run only cases whose name starts with this")
+    args = parser.parse_args()
+
+    cases = {name: fn for name, fn in build_cases().items() if not args.only or name.startswith(args.only)}
+    baseline = json.loads(args.baseline.read_text())["results"] if args.check else {}
+    if args.check and not baseline:
+        parser.error(f"no baseline at {args.baseline}; record one with --save")
+
+    results = {}
+    regressions = []
+    print(f"{'case':<24} {'µs/call':>12} {'relative':>10} {'baseline':>10} {'change':>8}")
+    for name, fn in cases.items():
+        seconds, relative = measure(fn, args.repeats)
+        results[name] = {"us": round(seconds * 1e6, 3), "relative": round(relative, 5)}
+        line = f"{name:<24} {results[name]['us']:12.2f} {results[name]['relative']:10.4f}"
+        if name in baseline:
+            before = baseline[name]["relative"]
+            change = results[name]["relative"] / before - 1
+            line += f" {before:10.4f} {change:+8.1%}"
+            if change > args.tolerance:
+                regressions.append(name)
+                line += "  REGRESSED"
+        print(line)
+
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({
+            "meta": {
+                "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "unit": "us: microseconds per call; relative: time per call / calibration time",
+            },
+            "results": results,
+        }, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
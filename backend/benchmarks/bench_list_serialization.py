@@ -0,0 +1,72 @@
+"""
+Benchmark for list endpoint serialization (orders, kitchen queue, menu, users).
+
+Compares the response-model path FastAPI takes for these routes (validate every
+ORM row into the Pydantic response model, then dump it to JSON) with the direct
+serializers (dicts straight from the rows, encoded by orjson), on transient ORM
+objects so only serialization is measured. Reports CPU milliseconds per
+response and checks both paths produce identical bytes.
+
+Usage (from backend/):
+    python benchmarks/bench_list_serialization.py [--rounds 20]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pydantic import TypeAdapter
+
+from app import models, serializers
+from app.schemas.menu import MenuItemResponse
+from app.schemas.order import OrderResponse
+from app.schemas.user import UserResponse
+from bench_hot_paths import make_menu, make_orders
+
+ORDER_COUNTS = (100, 1000)
+
+
+def model_path(model):
+    adapter = TypeAdapter(List[model])
+    return lambda rows: adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+def cpu_ms(fn, rows, rounds):
+    fn(rows)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.process_time()
+        fn(rows)
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    menu = make_menu()
+    cases = []
+    for count in ORDER_COUNTS:
+        cases.append((f"orders x{count} (5 items)", OrderResponse, serializers.orders, make_orders(count, menu)))
+    cases.append(("menu items x1000", MenuItemResponse, serializers.menu_items, (menu * 20)[:1000]))
+    users = [models.User(id=n, email=f"user{n}@example.com", name=f"User {n}", role="customer",
+                         created_at=datetime(2025, 1, 1, 12, 0, n % 60)) for n in range(1000)]
+    cases.append(("users x1000", UserResponse, serializers.users, users))
+
+    print(f"{'payload':<26} {'model ms':>9} {'direct ms':>10} {'saved':>7}")
+    for name, model, serialize, rows in cases:
+        before = model_path(model)
+        after = lambda rows, serialize=serialize: serializers.dumps(serialize(rows))
+        assert before(rows) == after(rows), f"{name}: output differs"
+        old, new = cpu_ms(before, rows, args.rounds), cpu_ms(after, rows, args.rounds)
+        print(f"{name:<26} {old:9.2f} {new:10.2f} {1 - new / old:7.0%}")
+
+
+if __name__ == "__main__":
+    main()
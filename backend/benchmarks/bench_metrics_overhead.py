@@ -0,0 +1,91 @@
+"""
+Benchmark for the request metrics middleware and SQL hooks.
+
+Serves the same two endpoints (one without database work, one running three
+SQLite queries) from a bare FastAPI app and from one wrapped in
+MetricsMiddleware with an instrumented engine, driving each through the ASGI
+interface directly so that HTTP client cost doesn't drown out the difference.
+Reports mean microseconds per request and the added overhead.
+
+Usage (from backend/):
+    python benchmarks/bench_metrics_overhead.py [--requests 20000] [--rounds 5]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app import request_metrics
+
+
+def make_app(instrumented: bool):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (name) VALUES ('a'), ('b'), ('c')"))
+    if instrumented:
+        request_metrics.instrument_engine(engine)
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id}).scalar()
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(request_metrics.MetricsMiddleware)
+    return app
+
+
+async def drive(app, path, requests):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    apps = {"bare": make_app(False), "metrics": make_app(True)}
+    print(f"{'endpoint':>12} {'bare µs':>9} {'metrics µs':>11} {'overhead µs':>12} {'overhead':>9}")
+    for path in ("/ping", "/items/1"):
+        best = {}
+        for name, app in apps.items():
+            asyncio.run(drive(app, path, 500))  # warm up
+            best[name] = min(asyncio.run(drive(app, path, args.requests)) for _ in range(args.rounds))
+        extra = best["metrics"] - best["bare"]
+        print(f"{path:>12} {best['bare']:9.1f} {best['metrics']:11.1f} {extra:12.1f} {extra / best['bare']:9.1%}")
+
+
+if __name__ == "__main__":
+    main()
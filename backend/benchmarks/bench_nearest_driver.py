@@ -0,0 +1,75 @@
+"""
+Benchmark for nearest-driver lookups (GET /users/drivers/nearest).
+
+Scatters 100, 1k and 10k drivers over a ~40 km city and times k-nearest
+queries through the grid index against a full linear scan, reporting mean
+and p99 microseconds per query.
+
+Usage (from backend/):
+    python benchmarks/bench_nearest_driver.py [--queries 2000] [--k 5] [--cell-km 1.0]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.spatial import GridIndex, haversine_km
+
+DRIVER_COUNTS = (100, 1_000, 10_000)
+CENTER = (16.80, 96.15)
+SPREAD_DEG = 0.18
+
+
+def linear_scan(points, lat, lng, k):
+    return sorted((haversine_km(lat, lng, p_lat, p_lng), key) for key, (p_lat, p_lng) in points.items())[:k]
+
+
+def timed(fn, queries):
+    samples = []
+    for lat, lng in queries:
+        start = time.perf_counter()
+        fn(lat, lng)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--cell-km", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'drivers':>8} {'grid mean':>10} {'grid p99':>10} {'scan mean':>10} {'scan p99':>10}  (us/query, k={args.k})")
+    for count in DRIVER_COUNTS:
+        points = {
+            i: (CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG), CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG))
+            for i in range(count)
+        }
+        index = GridIndex(cell_km=args.cell_km)
+        for key, (lat, lng) in points.items():
+            index.upsert(key, lat, lng)
+        queries = [
+            (CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG), CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG))
+            for _ in range(args.queries)
+        ]
+
+        for lat, lng in queries[:50]:
+            assert [key for key, _ in index.nearest(lat, lng, args.k)] == \
+                [key for _, key in linear_scan(points, lat, lng, args.k)]
+
+        grid_mean, grid_p99 = timed(lambda lat, lng: index.nearest(lat, lng, args.k, max_km=20), queries)
+        scan_queries = queries[: max(20, args.queries // (count // 100))]
+        scan_mean, scan_p99 = timed(lambda lat, lng: linear_scan(points, lat, lng, args.k), scan_queries)
+        print(f"{count:>8} {grid_mean:>10.1f} {grid_p99:>10.1f} {scan_mean:>10.1f} {scan_p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
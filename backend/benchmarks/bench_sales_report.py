@@ -0,0 +1,117 @@
+"""
+Benchmark for the admin sales report (GET /admin/reports/sales).
+
+Builds a synthetic order history (default 2M orders over two years, one item
+line each) and compares the legacy GROUP BY date(created_at) over all orders
+with reads from the sales_daily rollup: the initial build, full-history and
+30-day reads, and an incremental refresh after a burst of new orders.
+
+Usage (from backend/):
+    python benchmarks/bench_sales_report.py [--orders 2000000] [--days 730] [--database-url sqlite:///sales.db]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import models, sales_rollup
+from app.database import Base
+
+CATEGORIES = ("Main", "Side", "Drink", "Dessert")
+CHUNK = 50_000
+
+
+def legacy_report(db):
+    sales = db.query(
+        func.date(models.Order.created_at).label("date"),
+        func.count(models.Order.id).label("count"),
+        func.sum(models.Order.total_amount).label("revenue"),
+    ).group_by(func.date(models.Order.created_at)).all()
+    return [{"date": str(s.date), "count": s.count, "revenue": float(s.revenue)} for s in sales]
+
+
+def timed(label, fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<42} {best * 1000:>10.1f} ms")
+    return result
+
+
+def populate(db, orders, days, now, rng):
+    menu = [models.MenuItem(name=c, description="", price=p, category=c) for c, p in zip(CATEGORIES, (9, 4, 2, 5))]
+    db.add_all(menu)
+    db.commit()
+    start = now - timedelta(days=days)
+    span = days * 86400
+    next_id = 1
+    for offset in range(0, orders, CHUNK):
+        size = min(CHUNK, orders - offset)
+        stamps = sorted(start + timedelta(seconds=rng.randrange(span)) for _ in range(size))
+        order_rows, item_rows = [], []
+        for created_at in stamps:
+            item = rng.choice(menu)
+            quantity = rng.randint(1, 3)
+            order_rows.append({"id": next_id, "status": "delivered", "delivery_address": "bench",
+                               "total_amount": item.price * quantity, "created_at": created_at})
+            item_rows.append({"order_id": next_id, "menu_item_id": item.id, "quantity": quantity,
+                              "item_price": item.price})
+            next_id += 1
+        db.execute(insert(models.Order), order_rows)
+        db.execute(insert(models.OrderItem), item_rows)
+        db.commit()
+    return menu, next_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--burst", type=int, default=1000, help="new orders before the incremental refresh")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'sales.db')}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    rng = random.Random(1)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    started = time.perf_counter()
+    menu, next_id = populate(db, args.orders, args.days, now, rng)
+    print(f"{args.orders:,} orders over {args.days} days on {engine.dialect.name} "
+          f"(generated in {time.perf_counter() - started:.0f}s)")
+
+    legacy = timed("legacy GROUP BY date(created_at)", lambda: legacy_report(db))
+    timed("rollup initial build", lambda: sales_rollup.refresh(db, now=now), repeat=1)
+    rollup = timed("rollup read, full history", lambda: sales_rollup.report(db))
+    assert rollup == legacy, "rollup disagrees with the raw aggregate"
+    recent = now.date() - timedelta(days=30)
+    timed("rollup read, last 30 days", lambda: sales_rollup.report(db, date_from=recent))
+    timed("rollup read, last 30 days hourly", lambda: sales_rollup.report(db, date_from=recent, granularity="hour"))
+    timed("rollup read, last 30 days by category", lambda: sales_rollup.report(db, date_from=recent, by_category=True))
+
+    burst = [{"id": next_id + i, "status": "pending", "delivery_address": "bench", "total_amount": 9,
+              "created_at": now - timedelta(seconds=rng.randrange(3600))} for i in range(args.burst)]
+    db.execute(insert(models.Order), burst)
+    db.commit()
+    result = timed(f"incremental refresh after {args.burst} new orders", lambda: sales_rollup.refresh(db, now=now), repeat=1)
+    print(f"  (recomputed {result['days_refreshed']} days)")
+    assert sales_rollup.report(db) == legacy_report(db)
+
+
+if __name__ == "__main__":
+    main()
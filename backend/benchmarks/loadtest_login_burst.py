@@ -0,0 +1,136 @@
+"""
+Load test: menu and guest-tracking latency during a burst of logins.
+
+Runs the app in-process (httpx ASGI transport) on a temporary SQLite
+database. For each mode it fires a burst of concurrent logins while a
+steady stream of GET /menu/ and GET /guest/track/{id} requests runs,
+and reports the p50/p99 latency of those background requests.
+
+Modes:
+  inline  - bcrypt verified directly on the event loop (the old login)
+  pooled  - POST /auth/login, verification on the bounded hashing pool
+
+Usage (from backend/):
+    python benchmarks/loadtest_login_burst.py [--logins 40] [--readers 4]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+DB_PATH = os.path.join(tempfile.mkdtemp(), "loadtest.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+import httpx
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import auth, models
+from app.database import Base, get_db
+from app.main import app
+
+engine = create_engine(
+    f"sqlite:///{DB_PATH}",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@app.post("/bench/login-inline")
+async def login_inline(form_data: OAuth2PasswordRequestForm = Depends(), db=Depends(get_db)):
+    user = db.query(models.User).filter(models.User.email == form_data.username).first()
+    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+        raise HTTPException(status_code=401)
+    return {"access_token": auth.create_access_token(data={"sub": user.email})}
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(models.User(email="burst@example.com", name="Burst", role="customer",
+                       hashed_password=auth.get_password_hash("burstpass")))
+    db.add_all([models.MenuItem(name=f"Item {i}", price=5, category="Main") for i in range(20)])
+    order = models.Order(status="pending", total_amount=5, delivery_address="1 Load St",
+                         guest_name="Load", guest_phone="555")
+    db.add(order)
+    db.flush()
+    tracking = models.Tracking(order_id=order.id, status="pending")
+    db.add(tracking)
+    db.commit()
+    tracking_id = tracking.id
+    db.close()
+    return tracking_id
+
+
+async def reader(client, url, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(url)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+
+
+async def run_mode(name, login_url, tracking_id, n_logins, n_readers):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = {"/menu/": [], f"/guest/track/{tracking_id}": []}
+        stop = asyncio.Event()
+        readers = [
+            asyncio.create_task(reader(client, url, stop, latencies[url]))
+            for url in latencies
+            for _ in range(n_readers)
+        ]
+        await asyncio.sleep(0.2)
+        for values in latencies.values():
+            values.clear()
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            client.post(login_url, data={"username": "burst@example.com", "password": "burstpass"})
+            for _ in range(n_logins)
+        ])
+        burst_seconds = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*readers)
+
+    ok = sum(1 for r in results if r.status_code == 200)
+    print(f"[{name}] {ok}/{n_logins} logins in {burst_seconds:.2f}s")
+    for url, values in latencies.items():
+        values.sort()
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))] if values else float("nan")
+        median = statistics.median(values) if values else float("nan")
+        print(f"    GET {url:<18} n={len(values):<5} p50={median:7.2f}ms p99={p99:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40, help="concurrent logins in the burst")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent readers per endpoint")
+    args = parser.parse_args()
+
+    app.dependency_overrides[get_db] = override_get_db
+    tracking_id = seed()
+    asyncio.run(run_mode("inline", "/bench/login-inline", tracking_id, args.logins, args.readers))
+    asyncio.run(run_mode("pooled", "/auth/login", tracking_id, args.logins, args.readers))
+    print(f"hashing pool: {auth.password_hash_stats()}")
+
+
+if __name__ == "__main__":
+    main()
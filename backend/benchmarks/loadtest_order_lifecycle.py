@@ -0,0 +1,307 @@
+"""
+Load test: the full order lifecycle under a realistic traffic mix.
+
+Runs the app in-process (httpx ASGI transport) against a fresh SQLite file,
+or a local Postgres via --database-url. Concurrent virtual users:
+
+  customers - browse the menu (plain, by category, text search); some place a
+              guest or logged-in order, pay for it and poll its tracking
+  kitchen   - read the queue and move paid orders to preparing, then ready
+  drivers   - read available deliveries, accept one and mark it delivered
+
+The random mix is seeded, so two runs with the same arguments send the same
+traffic. Reports requests/s and p50/p95/p99 per endpoint (route template) and
+writes them to --out as JSON, tagged with the git commit. --compare takes an
+earlier results file and exits non-zero when an endpoint's p95 or throughput
+moved by more than --tolerance.
+
+Usage (from backend/):
+    python benchmarks/loadtest_order_lifecycle.py [--customers 16] [--visits 25] [--kitchen 2] [--drivers 4]
+        [--seed 1] [--database-url postgresql://localhost/loadtest] [--out results.json]
+        [--compare baseline.json --tolerance 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=16, help="concurrent customer sessions")
+    parser.add_argument("--visits", type=int, default=25, help="visits per customer session")
+    parser.add_argument("--kitchen", type=int, default=2, help="concurrent kitchen workers")
+    parser.add_argument("--drivers", type=int, default=4, help="concurrent drivers")
+    parser.add_argument("--order-share", type=float, default=0.5, help="share of visits that place an order")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", help="database to run against (default: a temporary SQLite file)")
+    parser.add_argument("--drain-seconds", type=float, default=15.0,
+                        help="how long staff keep working after customers finish")
+    parser.add_argument("--out", default="loadtest_order_lifecycle.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative p95 increase / throughput drop per endpoint")
+    return parser.parse_args()
+
+
+ARGS = parse_args()
+if ARGS.database_url:
+    os.environ["DATABASE_URL"] = ARGS.database_url
+else:
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'loadtest.db')}"
+
+import httpx
+
+from app import auth, models
+from app.database import Base, SessionLocal, engine
+from app.main import app
+
+CATEGORIES = ("Burgers", "Sides", "Drinks", "Desserts")
+SEARCH_TERMS = ("burger", "fries", "cola", "cake")
+PASSWORD = "loadtest-pass"
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    async def call(self, client, method, template, url, expected=(200, 201), **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        name = f"{method} {template}"
+        self.latencies[name].append(elapsed)
+        self.statuses[name][response.status_code] += 1
+        return response if response.status_code in expected else None
+
+
+def seed(args, run_id):
+    """Menu, customers, kitchen staff and drivers; all share one password hash."""
+    Base.metadata.create_all(bind=engine)
+    hashed = auth.get_password_hash(PASSWORD)
+    db = SessionLocal()
+    menu = [
+        models.MenuItem(name=f"{term.title()} {n}", description=f"House {term} number {n}",
+                        price=random.Random(n).randint(3, 15), category=category)
+        for category, term in zip(CATEGORIES, SEARCH_TERMS)
+        for n in range(10)
+    ]
+    db.add_all(menu)
+    users = {"customer": [], "kitchen": [], "driver": []}
+    for role, count in (("customer", args.customers), ("kitchen", args.kitchen), ("driver", args.drivers)):
+        for n in range(count):
+            email = f"{role}{n}-{run_id}@loadtest.example"
+            db.add(models.User(email=email, name=f"{role} {n}", role=role, hashed_password=hashed))
+            users[role].append(email)
+    db.commit()
+    menu_ids = [item.id for item in menu]
+    db.close()
+    return menu_ids, users
+
+
+async def login(client, email):
+    response = await client.post("/auth/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def customer(client, rec, rng, menu_ids, headers, args, placed):
+    for _ in range(args.visits):
+        await rec.call(client, "GET", "/menu/", "/menu/")
+        roll = rng.random()
+        if roll < 0.3:
+            await rec.call(client, "GET", "/menu/", "/menu/", params={"category": rng.choice(CATEGORIES)})
+        elif roll < 0.45:
+            await rec.call(client, "GET", "/menu/", "/menu/", params={"q": rng.choice(SEARCH_TERMS)})
+        if rng.random() >= args.order_share:
+            continue
+
+        guest = rng.random() < 0.5
+        body = {
+            "delivery_address": f"{rng.randint(1, 999)} Load St",
+            "items": [{"menu_item_id": rng.choice(menu_ids), "quantity": rng.randint(1, 3)}
+                      for _ in range(rng.randint(1, 5))],
+        }
+        if guest:
+            body.update(guest_name="Guest", guest_phone="555-0100")
+        response = await rec.call(client, "POST", "/orders/", "/orders/", json=body,
+                                  headers=None if guest else headers)
+        if response is None:
+            continue
+        order = response.json()
+        placed.append(order["id"])
+        await rec.call(client, "POST", "/payments/process", "/payments/process", json={
+            "order_id": order["id"], "amount": float(order["total_amount"]), "payment_method": "card",
+        })
+        for _ in range(2):
+            await rec.call(client, "GET", "/guest/track/{tracking_input}", f"/guest/track/{order['tracking_id']}")
+        if not guest:
+            await rec.call(client, "GET", "/orders/{order_id}", f"/orders/{order['id']}", headers=headers)
+            await rec.call(client, "GET", "/orders/", "/orders/", headers=headers)
+
+
+async def kitchen_worker(client, rec, headers, done):
+    template = "/kitchen/orders/{order_id}/status"
+    while True:
+        response = await rec.call(client, "GET", "/kitchen/queue", "/kitchen/queue", headers=headers)
+        queue = response.json() if response else []
+        paid = [o["id"] for o in queue if o["status"] == "paid"][:5]
+        if not paid:
+            if done.is_set():
+                return
+            await asyncio.sleep(0.01)
+            continue
+        for order_id in paid:
+            # 409 when another kitchen worker got there first
+            for status in ("preparing", "ready"):
+                if not await rec.call(client, "PUT", template, f"/kitchen/orders/{order_id}/status",
+                                      expected=(200, 409), json={"status": status}, headers=headers):
+                    break
+
+
+async def driver(client, rec, rng, headers, done):
+    while True:
+        response = await rec.call(client, "GET", "/delivery/available", "/delivery/available", headers=headers)
+        ready = [o["id"] for o in response.json()] if response else []
+        if not ready:
+            if done.is_set():
+                return
+            await asyncio.sleep(0.01)
+            continue
+        order_id = rng.choice(ready)
+        accepted = await rec.call(client, "POST", "/delivery/accept/{order_id}", f"/delivery/accept/{order_id}",
+                                  expected=(200,), headers=headers)
+        if accepted:
+            await rec.call(client, "PUT", "/delivery/orders/{order_id}/status",
+                           f"/delivery/orders/{order_id}/status", json={"status": "delivered"}, headers=headers)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarise(rec, wall_seconds):
+    endpoints = {}
+    for name in sorted(rec.latencies):
+        values = sorted(rec.latencies[name])
+        statuses = rec.statuses[name]
+        endpoints[name] = {
+            "requests": len(values),
+            "rps": round(len(values) / wall_seconds, 2),
+            "p50_ms": round(percentile(values, 0.50), 3),
+            "p95_ms": round(percentile(values, 0.95), 3),
+            "p99_ms": round(percentile(values, 0.99), 3),
+            "mean_ms": round(sum(values) / len(values), 3),
+            "status_counts": {str(code): count for code, count in sorted(statuses.items())},
+            "errors": sum(count for code, count in statuses.items() if code >= 500),
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "requests": total,
+        "wall_seconds": round(wall_seconds, 3),
+        "rps": round(total / wall_seconds, 2),
+        "errors": sum(e["errors"] for e in endpoints.values()),
+    }, endpoints
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    run_id = uuid.uuid4().hex[:8]
+    menu_ids, users = seed(args, run_id)
+    rec = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+        # Logins are setup, not part of the measured mix
+        tokens = {email: await login(client, email) for emails in users.values() for email in emails}
+        done = asyncio.Event()
+        placed = []
+        start = time.perf_counter()
+        staff = [asyncio.create_task(kitchen_worker(client, rec, tokens[email], done)) for email in users["kitchen"]]
+        staff += [
+            asyncio.create_task(driver(client, rec, random.Random(args.seed * 1000 + n), tokens[email], done))
+            for n, email in enumerate(users["driver"])
+        ]
+        await asyncio.gather(*[
+            customer(client, rec, random.Random(args.seed * 100_000 + n), menu_ids, tokens[email], args, placed)
+            for n, email in enumerate(users["customer"])
+        ])
+        done.set()
+        try:
+            await asyncio.wait_for(asyncio.gather(*staff), timeout=args.drain_seconds)
+        except asyncio.TimeoutError:
+            print(f"staff still busy after {args.drain_seconds}s drain; stopping them")
+        wall_seconds = time.perf_counter() - start
+
+    db = SessionLocal()
+    delivered = db.query(models.Order).filter(models.Order.id.in_(placed), models.Order.status == "delivered").count()
+    db.close()
+    overall, endpoints = summarise(rec, wall_seconds)
+    overall.update(orders_placed=len(placed), orders_delivered=delivered)
+    return overall, endpoints
+
+
+def compare(results, baseline_path, tolerance):
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nvs {baseline_path} (commit {baseline['meta'].get('commit')}), tolerance {tolerance:.0%}")
+    regressions = []
+    for name, current in results["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if not before:
+            continue
+        p95_change = current["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        rps_change = current["rps"] / before["rps"] - 1 if before["rps"] else 0.0
+        flag = p95_change > tolerance or rps_change < -tolerance
+        if flag:
+            regressions.append(name)
+        print(f"  {name:<42} p95 {p95_change:+7.1%}  req/s {rps_change:+7.1%}{'  REGRESSED' if flag else ''}")
+    return regressions
+
+
+def main(args):
+    overall, endpoints = asyncio.run(run(args))
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "database_url")},
+        },
+        "overall": overall,
+        "endpoints": endpoints,
+    }
+    Path(args.out).write_text(json.dumps(results, indent=2) + "\n")
+
+    print(f"{overall['requests']} requests in {overall['wall_seconds']:.2f}s = {overall['rps']:.1f} req/s, "
+          f"{overall['errors']} errors, {overall['orders_delivered']}/{overall['orders_placed']} orders delivered")
+    print(f"  {'endpoint':<42} {'n':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, e in endpoints.items():
+        print(f"  {name:<42} {e['requests']:>6} {e['rps']:>8.1f} {e['p50_ms']:>8.2f} {e['p95_ms']:>8.2f} {e['p99_ms']:>8.2f}")
+    print(f"results written to {args.out}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(ARGS)
@@ -0,0 +1,190 @@
+"""
+Simulation harness for the auto-dispatch engine (app/dispatch.py).
+
+Replays a synthetic stream of ready orders (spread over several pickup
+points) and a fleet of drivers, and compares three policies:
+
+    race      each order goes to a random idle driver in range (drivers racing /delivery/accept)
+    greedy    oldest order first takes its nearest idle driver
+    matching  dispatch.plan: min-cost matching over the whole batch
+
+For each it reports total pickup distance, how long orders waited for a
+driver and the per-tick planning latency. It then times dispatch.run_tick
+end to end (queries, matching, one commit) against a SQLite database.
+
+Usage (from backend/):
+    python benchmarks/sim_dispatch.py [--drivers 200] [--orders-per-tick 1] [--ticks 360] [--seed 1]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.dispatch import IdleDriver, PendingOrder, plan
+from app.spatial import haversine_km
+
+CENTER = (16.80, 96.15)
+SPREAD_DEG = 0.12
+TICK_SECONDS = 10
+SPEED_KMH = 25
+MAX_PICKUP_KM = 15
+
+
+def random_point(rng):
+    return CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG), CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG)
+
+
+def race(orders, drivers, rng):
+    free = list(drivers)
+    matches = []
+    for order in orders:
+        reachable = [d for d in free if haversine_km(order.lat, order.lng, d.lat, d.lng) <= MAX_PICKUP_KM]
+        if reachable:
+            driver = rng.choice(reachable)
+            free.remove(driver)
+            matches.append((order.order_id, driver.driver_id, haversine_km(order.lat, order.lng, driver.lat, driver.lng)))
+    return matches
+
+
+def greedy(orders, drivers, rng):
+    free = list(drivers)
+    matches = []
+    for order in sorted(orders, key=lambda o: -o.waited_minutes):
+        if not free:
+            break
+        driver = min(free, key=lambda d: haversine_km(order.lat, order.lng, d.lat, d.lng))
+        km = haversine_km(order.lat, order.lng, driver.lat, driver.lng)
+        if km <= MAX_PICKUP_KM:
+            free.remove(driver)
+            matches.append((order.order_id, driver.driver_id, km))
+    return matches
+
+
+def matching(orders, drivers, rng):
+    return [(m.order_id, m.driver_id, m.distance_km) for m in plan(orders, drivers, max_pickup_km=MAX_PICKUP_KM)]
+
+
+POLICIES = {"race": race, "greedy": greedy, "matching": matching}
+
+
+def simulate(policy, args):
+    rng = random.Random(args.seed)
+    kitchens = [random_point(rng) for _ in range(args.kitchens)]
+    # Both the stream and each order's drop-off/handling time are fixed by the seed
+    stream = [
+        [(random.Random(args.seed * 1_000_003 + tick * 1000 + n), rng.choice(kitchens))
+         for n in range(rng.randint(0, 2 * args.orders_per_tick))]
+        for tick in range(args.ticks)
+    ]
+    drivers = {i: (random_point(rng), 0.0) for i in range(args.drivers)}  # id -> (position, busy until)
+    policy_rng = random.Random(args.seed + 1)
+
+    waiting = {}
+    next_id = 0
+    total_km = 0.0
+    waits, plan_ms = [], []
+    for tick, arrivals in enumerate(stream):
+        now = tick * TICK_SECONDS
+        for order_rng, pickup in arrivals:
+            waiting[next_id] = (now, pickup, order_rng)
+            next_id += 1
+        orders = [PendingOrder(oid, p[0], p[1], (now - t) / 60) for oid, (t, p, _) in waiting.items()]
+        idle = [IdleDriver(did, pos[0], pos[1]) for did, (pos, until) in drivers.items() if until <= now]
+
+        started = time.perf_counter()
+        matches = POLICIES[policy](orders, idle, policy_rng)
+        plan_ms.append((time.perf_counter() - started) * 1000)
+
+        for order_id, driver_id, km in matches:
+            placed, pickup, order_rng = waiting.pop(order_id)
+            waits.append(now - placed)
+            total_km += km
+            dropoff = random_point(order_rng)
+            trip_km = km + haversine_km(pickup[0], pickup[1], dropoff[0], dropoff[1])
+            busy_seconds = trip_km / SPEED_KMH * 3600 + order_rng.uniform(120, 300)
+            drivers[driver_id] = (dropoff, now + busy_seconds)
+
+    waits.sort()
+    plan_ms.sort()
+    return {
+        "assigned": len(waits),
+        "unassigned": len(waiting),
+        "pickup_km": total_km,
+        "km_per_order": total_km / max(1, len(waits)),
+        "wait_mean_s": statistics.mean(waits) if waits else 0.0,
+        "wait_p95_s": waits[int(len(waits) * 0.95) - 1] if waits else 0.0,
+        "plan_p50_ms": plan_ms[len(plan_ms) // 2],
+        "plan_p95_ms": plan_ms[int(len(plan_ms) * 0.95) - 1],
+        "plan_max_ms": plan_ms[-1],
+    }
+
+
+def time_run_tick(orders, drivers, repeats):
+    from datetime import datetime
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app import location_store, models
+    from app.database import Base
+    from app.dispatch import run_tick
+    from app.schemas.location import LocationPoint
+
+    rng = random.Random(7)
+    path = os.path.join(tempfile.mkdtemp(), "dispatch.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    samples = []
+    for _ in range(repeats):
+        db = Session()
+        db.query(models.DriverAssignment).delete()
+        db.query(models.Order).delete()
+        db.query(models.User).delete()
+        location_store.store.clear()
+        users = [models.User(email=f"d{i}@sim", name=f"d{i}", role="driver", hashed_password="x") for i in range(drivers)]
+        db.add_all(users)
+        db.add_all(models.Order(status="ready", total_amount=10, delivery_address="sim", created_at=datetime.utcnow())
+                   for _ in range(orders))
+        db.commit()
+        for user in users:
+            lat, lng = random_point(rng)
+            location_store.store.record(user.id, [LocationPoint(lat=lat, lng=lng)])
+        started = time.perf_counter()
+        run_tick(db, CENTER)
+        samples.append((time.perf_counter() - started) * 1000)
+        db.close()
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drivers", type=int, default=200)
+    parser.add_argument("--kitchens", type=int, default=4)
+    parser.add_argument("--orders-per-tick", type=int, default=1)
+    parser.add_argument("--ticks", type=int, default=360)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db-orders", type=int, default=50)
+    parser.add_argument("--db-drivers", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.ticks} ticks of {TICK_SECONDS}s, {args.drivers} drivers, {args.kitchens} pickup points, "
+          f"~{args.orders_per_tick} orders/tick")
+    print(f"{'policy':>9} {'assigned':>9} {'left':>5} {'pickup km':>10} {'km/order':>9} "
+          f"{'wait mean':>10} {'wait p95':>9} {'plan p50':>9} {'plan p95':>9} {'plan max':>9}")
+    for policy in POLICIES:
+        r = simulate(policy, args)
+        print(f"{policy:>9} {r['assigned']:>9} {r['unassigned']:>5} {r['pickup_km']:>10.1f} {r['km_per_order']:>9.2f} "
+              f"{r['wait_mean_s']:>9.0f}s {r['wait_p95_s']:>8.0f}s {r['plan_p50_ms']:>7.2f}ms "
+              f"{r['plan_p95_ms']:>7.2f}ms {r['plan_max_ms']:>7.2f}ms")
+
+    ms = time_run_tick(args.db_orders, args.db_drivers, repeats=5)
+    print(f"\nrun_tick on SQLite, {args.db_orders} ready orders x {args.db_drivers} drivers: {ms:.1f} ms median")
+
+
+if __name__ == "__main__":
+    main()
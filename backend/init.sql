@@ -1,6 +1,10 @@
 -- ===========================
 -- DROP TABLES (clean reset)
 -- ===========================
+DROP TABLE IF EXISTS rollup_watermarks CASCADE;
+DROP TABLE IF EXISTS sales_daily CASCADE;
+DROP TABLE IF EXISTS dashboard_counters CASCADE;
+DROP TABLE IF EXISTS driver_location_history CASCADE;
 DROP TABLE IF EXISTS driver_locations CASCADE;
 DROP TABLE IF EXISTS driver_assignments CASCADE;
 DROP TABLE IF EXISTS payments CASCADE;
@@ -121,6 +125,34 @@ CREATE TABLE driver_locations (
     driver_id INT REFERENCES users(id),
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+CREATE TABLE driver_location_history (
+    id SERIAL PRIMARY KEY,
+    driver_id INT NOT NULL REFERENCES users(id),
+    order_id INT REFERENCES orders(id),
+    lat FLOAT NOT NULL,
+    lng FLOAT NOT NULL,
+    recorded_at TIMESTAMP NOT NULL
+);
+CREATE TABLE dashboard_counters (
+    slot INT PRIMARY KEY,
+    total_orders BIGINT NOT NULL DEFAULT 0,
+    active_orders BIGINT NOT NULL DEFAULT 0,
+    total_revenue DECIMAL(14, 2) NOT NULL DEFAULT 0
+);
+CREATE TABLE sales_daily (
+    day DATE NOT NULL,
+    hour INT NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    order_count INT NOT NULL DEFAULT 0,
+    item_count INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, hour, category)
+);
+CREATE TABLE rollup_watermarks (
+    name VARCHAR(50) PRIMARY KEY,
+    last_order_id INT NOT NULL DEFAULT 0
+);
+INSERT INTO rollup_watermarks (name, last_order_id) VALUES ('sales_daily', 0);
 -- ===========================
 -- INDEXES
 -- ===========================
@@ -128,6 +160,18 @@ CREATE INDEX idx_orders_status ON orders(status);
 CREATE INDEX idx_orders_tracking_id ON orders(tracking_id);
 CREATE INDEX idx_driver_assignments_status ON driver_assignments(status);
 CREATE INDEX idx_users_email ON users(email);
+CREATE INDEX idx_orders_created_at_id ON orders(created_at, id);
+CREATE INDEX idx_orders_customer_created_at_id ON orders(customer_id, created_at, id);
+CREATE INDEX idx_orders_driver_created_at_id ON orders(driver_id, created_at, id);
+CREATE INDEX idx_order_items_order_id ON order_items(order_id);
+CREATE INDEX idx_menu_items_deleted_available_category ON menu_items(is_deleted, is_available, category);
+CREATE INDEX idx_menu_items_live_category_price ON menu_items(category, price) WHERE is_deleted = false AND is_available = true;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_menu_items_search_fts ON menu_items USING gin (to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, '')));
+CREATE INDEX idx_menu_items_name_trgm ON menu_items USING gin (name gin_trgm_ops);
+CREATE INDEX idx_driver_locations_driver_order ON driver_locations(driver_id, order_id);
+CREATE INDEX idx_driver_locations_driver_updated ON driver_locations(driver_id, updated_at);
+CREATE INDEX idx_driver_location_history_driver_recorded ON driver_location_history(driver_id, recorded_at);
 -- ===========================
 -- INSERT USERS
 -- ===========================
@@ -0,0 +1,5 @@
+-- Keyset pagination indexes for GET /orders/
+-- Each role branch orders by (created_at, id) after an optional equality filter
+CREATE INDEX IF NOT EXISTS idx_orders_created_at_id ON orders (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_orders_customer_created_at_id ON orders (customer_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_orders_driver_created_at_id ON orders (driver_id, created_at, id);
@@ -0,0 +1,13 @@
+-- Driver location ingestion: the flush looks up rows by (driver_id, order_id),
+-- and a downsampled trail is appended to driver_location_history
+CREATE INDEX IF NOT EXISTS idx_driver_locations_driver_order ON driver_locations (driver_id, order_id);
+
+CREATE TABLE IF NOT EXISTS driver_location_history (
+    id SERIAL PRIMARY KEY,
+    driver_id INT NOT NULL REFERENCES users(id),
+    order_id INT REFERENCES orders(id),
+    lat FLOAT NOT NULL,
+    lng FLOAT NOT NULL,
+    recorded_at TIMESTAMP NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_driver_location_history_driver_recorded ON driver_location_history (driver_id, recorded_at);
@@ -0,0 +1,10 @@
+-- Nearest-driver lookups are served from the in-memory grid (app/spatial.py),
+-- seeded at startup from the newest driver_locations row per driver
+CREATE INDEX IF NOT EXISTS idx_driver_locations_driver_updated ON driver_locations (driver_id, updated_at);
+
+-- Optional: for radius queries run directly in Postgres (reports, ad-hoc ops),
+-- index great-circle positions with earthdistance. Needs the extensions, so it
+-- is left for the DBA to enable:
+--   CREATE EXTENSION IF NOT EXISTS cube;
+--   CREATE EXTENSION IF NOT EXISTS earthdistance;
+--   CREATE INDEX IF NOT EXISTS idx_driver_locations_earth ON driver_locations USING gist (ll_to_earth(lat, lng));
@@ -0,0 +1,8 @@
+-- Running totals for GET /admin/dashboard, kept in step with order writes.
+-- The API seeds the slots from orders on startup (dashboard_counters.reconcile).
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    slot INT PRIMARY KEY,
+    total_orders BIGINT NOT NULL DEFAULT 0,
+    active_orders BIGINT NOT NULL DEFAULT 0,
+    total_revenue DECIMAL(14, 2) NOT NULL DEFAULT 0
+);
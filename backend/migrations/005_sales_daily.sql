@@ -0,0 +1,23 @@
+-- Sales rollup for GET /admin/reports/sales. Filled by app/sales_rollup.py on
+-- first use; afterwards only days with orders past the watermark are rebuilt.
+CREATE TABLE IF NOT EXISTS sales_daily (
+    day DATE NOT NULL,
+    hour INT NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    order_count INT NOT NULL DEFAULT 0,
+    item_count INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, hour, category)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name VARCHAR(50) PRIMARY KEY,
+    last_order_id INT NOT NULL DEFAULT 0
+);
+-- Seeded here so concurrent first refreshes only ever update it
+INSERT INTO rollup_watermarks (name, last_order_id) VALUES ('sales_daily', 0)
+ON CONFLICT (name) DO NOTHING;
+
+-- Rebuilding a day joins its orders to their item lines; without this the
+-- join (and every items load by order) scans order_items
+CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON order_items (order_id);
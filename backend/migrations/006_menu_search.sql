@@ -0,0 +1,15 @@
+-- Server-side filtering and search for GET /menu/
+
+-- Filters on live items by availability and category
+CREATE INDEX IF NOT EXISTS idx_menu_items_deleted_available_category
+    ON menu_items (is_deleted, is_available, category);
+-- Customer browsing only ever sees live, available items
+CREATE INDEX IF NOT EXISTS idx_menu_items_live_category_price
+    ON menu_items (category, price) WHERE is_deleted = false AND is_available = true;
+
+-- Text search (app/menu_search.py): full-text on name + description, and
+-- trigram ILIKE on name for partial words
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_menu_items_search_fts ON menu_items
+    USING gin (to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, '')));
+CREATE INDEX IF NOT EXISTS idx_menu_items_name_trgm ON menu_items USING gin (name gin_trgm_ops);
@@ -1,18 +1,26 @@
+import os
 import pytest
 import sys
+from contextlib import contextmanager
 from pathlib import Path
 
+# Fail any request that repeats a statement shape (N+1); set before the app is imported
+os.environ.setdefault("N_PLUS_ONE_MODE", "raise")
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_read_db, get_session_factory
 from app.main import app
 from app.models.user import User
+from app.schemas.location import LocationPoint
 from app.auth import get_password_hash
+from app import user_cache, menu_cache, events, location_store, sales_rollup
+from app import n_plus_one, request_metrics, sql_profiler
 
 # Use in-memory SQLite for testing
 from sqlalchemy.pool import StaticPool
@@ -26,6 +34,25 @@ engine = create_engine(
     poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+request_metrics.instrument_engine(engine)
+sql_profiler.instrument_engine(engine)
+n_plus_one.instrument_engine(engine)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """The database is recreated per test, so cached state and event history must not leak between tests"""
+    user_cache.clear()
+    menu_cache.clear()
+    events.reset()
+    location_store.store.clear()
+    sales_rollup.reset()
+    yield
+    user_cache.clear()
+    menu_cache.clear()
+    events.reset()
+    location_store.store.clear()
+    sales_rollup.reset()
 
 
 @pytest.fixture(scope="function")
@@ -50,6 +77,8 @@ def client(db):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -99,6 +128,109 @@ def test_driver(db):
     return driver
 
 
+@pytest.fixture
+def driver_headers(client, test_driver):
+    """Get authentication headers for the test driver"""
+    response = client.post(
+        "/auth/login",
+        data={"username": test_driver.email, "password": "driverpass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def add_driver(db):
+    """Create extra drivers (password "driverpass"), optionally with a live position"""
+    def add(email, lat=None, lng=None, recorded_at=None):
+        driver = User(email=email, name=email.split("@")[0], role="driver",
+                      hashed_password=get_password_hash("driverpass"))
+        db.add(driver)
+        db.commit()
+        if lat is not None:
+            location_store.store.record(driver.id, [LocationPoint(lat=lat, lng=lng, recorded_at=recorded_at)])
+        return driver
+    return add
+
+
+@pytest.fixture
+def test_admin(db):
+    """Create a test admin"""
+    admin = User(
+        email="admin@example.com",
+        hashed_password=get_password_hash("adminpass"),
+        name="Test Admin",
+        role="admin"
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    return admin
+
+
+@pytest.fixture
+def admin_headers(client, test_admin):
+    """Get authentication headers for the test admin"""
+    response = client.post(
+        "/auth/login",
+        data={"username": test_admin.email, "password": "adminpass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_kitchen(db):
+    """Create a test kitchen user"""
+    kitchen = User(
+        email="kitchen@example.com",
+        hashed_password=get_password_hash("kitchenpass"),
+        name="Test Kitchen",
+        role="kitchen"
+    )
+    db.add(kitchen)
+    db.commit()
+    db.refresh(kitchen)
+    return kitchen
+
+
+class QueryCounter:
+    """Counts SQL statements executed on the test engine"""
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+    def reset(self):
+        self.count = 0
+        self.statements = []
+
+
+@pytest.fixture
+def query_counter():
+    """Count queries issued while the fixture is active"""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+def max_queries(query_counter):
+    """Cap the queries a block may issue: `with max_queries(2): client.get(...)`"""
+    @contextmanager
+    def limit(allowed):
+        query_counter.reset()
+        yield query_counter
+        assert query_counter.count <= allowed, (
+            f"{query_counter.count} queries, at most {allowed} allowed:\n  " + "\n  ".join(query_counter.statements)
+        )
+    return limit
+
+
 @pytest.fixture
 def auth_headers(client, test_user):
     """Get authentication headers for test user"""
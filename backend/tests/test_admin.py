@@ -0,0 +1,91 @@
+"""
+Tests for admin endpoints
+"""
+from sqlalchemy import create_engine
+
+from app import dashboard_counters
+from app.models.menu import MenuItem
+from app.models.order import Order
+from app.pool_metrics import InstrumentedQueuePool, instrument_pool, pool_stats
+
+
+def test_metrics_require_admin(client, auth_headers):
+    """Test that customers cannot read admin metrics"""
+    response = client.get("/admin/metrics/db-pool", headers=auth_headers)
+    assert response.status_code == 403
+
+
+def test_db_pool_metrics(client, admin_headers):
+    """Test that pool telemetry is exposed to admins"""
+    response = client.get("/admin/metrics/db-pool", headers=admin_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert "pool_class" in data
+    assert "checkout_wait_seconds" in data
+
+
+def test_instrumented_pool_tracks_checkouts(tmp_path):
+    """Test checked-out/idle/overflow counts and checkout wait histogram"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+    )
+    instrument_pool(engine)
+    before = pool_stats(engine)
+
+    first = engine.connect()
+    second = engine.connect()
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["checkouts"] - before["checkouts"] == 2
+    assert stats["checkout_wait_seconds"]["count"] - before["checkout_wait_seconds"]["count"] == 2
+
+    first.close()
+    second.close()
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert stats["idle"] == 1
+    engine.dispose()
+
+
+def test_dashboard_counters_follow_order_writes(client, db, admin_headers, query_counter):
+    """Test that order creation, payment and delivery keep the dashboard in step"""
+    item = MenuItem(name="Soup", description="", price=4.50, category="Main", is_available=True)
+    db.add(item)
+    db.commit()
+    order_ids = []
+    for _ in range(3):
+        response = client.post("/orders/", json={
+            "items": [{"menu_item_id": item.id, "quantity": 2}],
+            "delivery_address": "1 Count St", "guest_name": "G", "guest_phone": "1",
+        })
+        order_ids.append(response.json()["id"])
+    payment = {"order_id": order_ids[0], "amount": 9, "payment_method": "card"}
+    assert client.post("/payments/process", json=payment).status_code == 201
+    for status in ["ready", "picked_up", "delivered"]:
+        response = client.put(f"/orders/{order_ids[0]}/status", json={"status": status}, headers=admin_headers)
+        assert response.status_code == 200
+    client.put(f"/orders/{order_ids[1]}/status", json={"status": "cancelled"}, headers=admin_headers)
+
+    query_counter.reset()
+    response = client.get("/admin/dashboard", headers=admin_headers)
+    assert response.json() == {"total_orders": 3, "active_orders": 1, "total_revenue": 27.0}
+    # Auth is cached, so this is the single counter read
+    assert query_counter.count == 1
+    assert dashboard_counters.reconcile(db) == {}
+
+
+def test_dashboard_reconcile_corrects_drift(client, db, admin_headers):
+    """Test that orders written behind the API's back are picked up by reconciliation"""
+    db.add_all([Order(status="pending", total_amount=5, delivery_address="x"),
+                Order(status="delivered", total_amount=7, delivery_address="y")])
+    db.commit()
+    assert client.get("/admin/dashboard", headers=admin_headers).json()["total_orders"] == 0
+
+    assert dashboard_counters.reconcile(db) == {"total_orders": 2, "active_orders": 1, "total_revenue": 12.0}
+    assert client.get("/admin/dashboard", headers=admin_headers).json() == {
+        "total_orders": 2, "active_orders": 1, "total_revenue": 12.0
+    }
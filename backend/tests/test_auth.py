@@ -61,3 +61,63 @@ def test_token_expiration(client, test_user):
     assert "exp" in payload
     assert "sub" in payload
     assert payload["sub"] == test_user.email
+
+
+def test_login_uses_password_pool(client, test_user):
+    """Test that login verification runs on the bounded hashing pool"""
+    from app.auth import password_hash_stats
+    before = password_hash_stats()["completed"]
+    response = client.post(
+        "/auth/login",
+        data={"username": test_user.email, "password": "testpassword"}
+    )
+    assert response.status_code == 200
+    stats = password_hash_stats()
+    assert stats["completed"] == before + 1
+    assert stats["queued"] == 0
+
+
+def test_login_rejected_when_password_pool_full(client, test_user, monkeypatch):
+    """Test that logins are shed with 503 once the hashing queue is full"""
+    import app.auth
+    monkeypatch.setattr(app.auth, "PASSWORD_HASH_MAX_QUEUE", 0)
+    response = client.post(
+        "/auth/login",
+        data={"username": test_user.email, "password": "testpassword"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_token_carries_id_and_role(client, test_user):
+    """Test that access tokens include user id and role claims"""
+    from jose import jwt
+    from app.auth import SECRET_KEY, ALGORITHM
+    response = client.post(
+        "/auth/login",
+        data={"username": test_user.email, "password": "testpassword"}
+    )
+    payload = jwt.decode(response.json()["access_token"], SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["uid"] == test_user.id
+    assert payload["role"] == "customer"
+
+
+def test_authenticated_request_skips_user_lookup(client, auth_headers, query_counter):
+    """Test that a cached user costs no auth-related query"""
+    from app import user_cache
+    query_counter.reset()
+    response = client.get("/users/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert query_counter.count == 0
+    assert user_cache.stats()["hits"] >= 1
+
+
+def test_update_user_invalidates_cached_role(client, auth_headers, admin_headers, test_user):
+    """Test that a role change made by an admin applies on the next request"""
+    assert client.get("/users/me", headers=auth_headers).json()["role"] == "customer"
+    response = client.put(f"/users/{test_user.id}", json={"role": "driver"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/users/me", headers=auth_headers).json()["role"] == "driver"
+
+    client.delete(f"/users/{test_user.id}", headers=admin_headers)
+    assert client.get("/users/me", headers=auth_headers).status_code == 401
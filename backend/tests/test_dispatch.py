@@ -0,0 +1,62 @@
+"""
+Tests for batch auto-dispatch
+"""
+import itertools
+import random
+from datetime import datetime, timedelta
+
+from app import dispatch
+from app.models.order import DriverAssignment, Order
+
+KITCHEN = (16.80, 96.15)
+
+
+def brute_force(cost):
+    rows, cols = len(cost), len(cost[0])
+    if rows <= cols:
+        return min(sum(cost[i][j] for i, j in enumerate(p)) for p in itertools.permutations(range(cols), rows))
+    return min(sum(cost[i][j] for j, i in enumerate(p)) for p in itertools.permutations(range(rows), cols))
+
+
+def test_assignment_is_optimal():
+    """Test the Hungarian solver against exhaustive search on small matrices"""
+    rng = random.Random(3)
+    for rows, cols in [(1, 1), (3, 3), (2, 5), (5, 2), (6, 6)]:
+        for _ in range(10):
+            cost = [[rng.uniform(0, 10) for _ in range(cols)] for _ in range(rows)]
+            pairs = dispatch.min_cost_assignment(cost)
+            assert len(pairs) == min(rows, cols)
+            assert len({i for i, _ in pairs}) == len({j for _, j in pairs}) == len(pairs)
+            assert abs(sum(cost[i][j] for i, j in pairs) - brute_force(cost)) < 1e-9
+
+
+def test_plan_prefers_global_optimum_and_skips_far_drivers():
+    """Test that matching beats greedy nearest-first and never exceeds the pickup radius"""
+    orders = [dispatch.PendingOrder(1, 0.0, 0.0), dispatch.PendingOrder(2, 0.0, 0.02)]
+    drivers = [dispatch.IdleDriver(10, 0.0, 0.01), dispatch.IdleDriver(11, 0.0, -0.01), dispatch.IdleDriver(12, 5.0, 5.0)]
+    # Greedy would give order 1 driver 10 and order 2 a much longer trip
+    matches = dispatch.plan(orders, drivers, max_pickup_km=15, age_weight_km=0)
+    assert {(m.order_id, m.driver_id) for m in matches} == {(1, 11), (2, 10)}
+    assert dispatch.plan(orders, drivers[2:], max_pickup_km=15) == []
+
+
+def test_run_tick_assigns_oldest_orders_to_nearest_idle_drivers(db, add_driver):
+    """Test that a tick assigns in one transaction, skipping busy drivers"""
+    near = add_driver("near@example.com", 16.801, 96.15)
+    busy = add_driver("busy@example.com", 16.8001, 96.15)
+    add_driver("far@example.com", 17.5, 96.15)
+    now = datetime.utcnow()
+    old = Order(status="ready", total_amount=10, delivery_address="a", created_at=now - timedelta(minutes=10))
+    new = Order(status="ready", total_amount=10, delivery_address="b", created_at=now)
+    db.add_all([old, new, Order(status="picked_up", total_amount=10, delivery_address="c", driver_id=busy.id)])
+    db.commit()
+
+    matches = dispatch.run_tick(db, KITCHEN)
+    assert [(m.order_id, m.driver_id) for m in matches] == [(old.id, near.id)]
+    db.expire_all()
+    assert (old.status, old.driver_id) == ("assigned", near.id)
+    assert new.status == "ready"
+    assert db.query(DriverAssignment).filter_by(order_id=old.id, driver_id=near.id).count() == 1
+
+    # The assigned driver is now busy, so the next tick has nobody for the new order
+    assert dispatch.run_tick(db, KITCHEN) == []
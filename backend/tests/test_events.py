@@ -0,0 +1,190 @@
+"""
+Tests for live order event channels
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app import events, user_cache
+from app.auth import get_password_hash
+from app.database import Base, get_db, get_read_db, get_session_factory
+from app.main import app
+from app.models.user import User
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+
+
+def test_channel_sequence_and_resume():
+    """Test monotonically increasing sequence numbers and resume from a cursor"""
+    channel = events.Channel("test", history_size=3)
+    for n in range(5):
+        channel.publish("tick", {"n": n})
+
+    assert channel.seq == 5
+    assert [event["seq"] for event in channel.since(3)] == [4, 5]
+    assert channel.since(5) == []
+    # Events 1-2 fell out of the buffer: the client must take a new snapshot
+    assert channel.since(1) is None
+    # A cursor from the future (e.g. before a restart) is also stale
+    assert channel.since(9) is None
+
+
+def test_listen_replays_then_streams():
+    """Test that a subscriber gets missed events, then live ones, in order"""
+    channel = events.Channel("test")
+    channel.publish("tick", {"n": 1})
+    channel.publish("tick", {"n": 2})
+
+    async def main():
+        received = []
+
+        async def consume():
+            async for event in channel.listen(after_seq=1, keepalive=5):
+                received.append(event["seq"])
+                if len(received) == 3:
+                    return
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        channel.publish("tick", {"n": 3})
+        channel.publish("tick", {"n": 4})
+        await asyncio.wait_for(task, timeout=2)
+        return received
+
+    assert asyncio.run(main()) == [2, 3, 4]
+
+
+def test_wait_long_poll():
+    """Test that wait returns buffered events, or blocks until one arrives"""
+    channel = events.Channel("test")
+
+    async def main():
+        assert await channel.wait(0, timeout=0.01) == []
+        waiter = asyncio.create_task(channel.wait(0, timeout=2))
+        await asyncio.sleep(0.01)
+        channel.publish("tick", {})
+        return await waiter
+
+    assert [event["seq"] for event in asyncio.run(main())] == [1]
+
+
+def test_format_sse():
+    event = {"seq": 7, "type": "status_changed", "data": {"order_id": 1}}
+    assert events.format_sse(event).startswith("id: 7\nevent: status_changed\ndata: ")
+    assert events.format_sse(None) == ": keepalive\n\n"
+
+
+@pytest.fixture
+def paid_ready_order(db):
+    item = MenuItem(name="Stream Burger", price=10, category="Main")
+    order = Order(status="pending", total_amount=10, delivery_address="1 Stream St")
+    order.items = [OrderItem(menu_item=item, quantity=1, item_price=10)]
+    db.add(order)
+    db.commit()
+    return order
+
+
+def test_payment_and_status_changes_publish_kitchen_events(client, db, test_kitchen, paid_ready_order):
+    """Test that payment and kitchen status updates reach the kitchen channel"""
+    response = client.post(
+        "/payments/process",
+        json={"order_id": paid_ready_order.id, "amount": 10, "payment_method": "card"}
+    )
+    assert response.status_code == 201
+
+    login = client.post("/auth/login", data={"username": "kitchen@example.com", "password": "kitchenpass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    client.put(f"/kitchen/orders/{paid_ready_order.id}/status", json={"status": "preparing"}, headers=headers)
+
+    history = events.channel("kitchen").since(0)
+    assert [event["type"] for event in history] == ["order_created", "status_changed"]
+    assert history[0]["data"]["order"]["items"][0]["menu_item"]["name"] == "Stream Burger"
+    assert history[1]["data"] == {"order_id": paid_ready_order.id, "status": "preparing"}
+
+
+def test_kitchen_stream_requires_kitchen_role(client, auth_headers):
+    response = client.get("/kitchen/stream", headers=auth_headers)
+    assert response.status_code == 403
+
+
+def test_delivery_feed_snapshot_then_events(client, db, test_kitchen, test_driver, paid_ready_order):
+    """Test that drivers get ready orders as a snapshot, then ready/taken events"""
+    driver_login = client.post("/auth/login", data={"username": "driver@example.com", "password": "driverpass"})
+    driver_headers = {"Authorization": f"Bearer {driver_login.json()['access_token']}"}
+    kitchen_login = client.post("/auth/login", data={"username": "kitchen@example.com", "password": "kitchenpass"})
+    kitchen_headers = {"Authorization": f"Bearer {kitchen_login.json()['access_token']}"}
+
+    paid_ready_order.status = "preparing"
+    db.commit()
+
+    first = client.get("/delivery/feed", headers=driver_headers).json()
+    assert first["snapshot"] == []
+    cursor = first["cursor"]
+
+    # Nothing new: the long-poll times out empty and keeps the cursor
+    idle = client.get("/delivery/feed", params={"cursor": cursor, "wait": 0.05}, headers=driver_headers).json()
+    assert idle == {"cursor": cursor, "snapshot": None, "events": []}
+
+    client.put(f"/kitchen/orders/{paid_ready_order.id}/status", json={"status": "ready"}, headers=kitchen_headers)
+    ready = client.get("/delivery/feed", params={"cursor": cursor}, headers=driver_headers).json()
+    assert [event["type"] for event in ready["events"]] == ["order_ready"]
+    assert ready["events"][0]["data"]["order"]["id"] == paid_ready_order.id
+
+    client.post(f"/delivery/accept/{paid_ready_order.id}", headers=driver_headers)
+    taken = client.get("/delivery/feed", params={"cursor": ready["cursor"]}, headers=driver_headers).json()
+    assert [event["type"] for event in taken["events"]] == ["order_taken"]
+    assert taken["events"][0]["data"]["driver_id"] == test_driver.id
+
+
+def test_delivery_feed_requires_driver(client, auth_headers):
+    response = client.get("/delivery/feed", headers=auth_headers)
+    assert response.status_code == 403
+
+
+def test_waiting_long_poll_holds_no_connection(tmp_path):
+    """Test that a long-poll whose auth missed the user cache returns its connection before waiting"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'feed.db'}", poolclass=QueuePool,
+                           connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    db.add(User(email="poller@example.com", name="Poller", role="driver",
+                hashed_password=get_password_hash("pollpass")))
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: Session
+    try:
+        client = TestClient(app)
+        login = client.post("/auth/login", data={"username": "poller@example.com", "password": "pollpass"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        cursor = client.get("/delivery/feed", headers=headers).json()["cursor"]
+
+        user_cache.clear()
+        result = {}
+        poll = threading.Thread(target=lambda: result.update(response=client.get(
+            "/delivery/feed", params={"cursor": cursor, "wait": 1.0}, headers=headers)))
+        poll.start()
+        time.sleep(0.4)
+        assert poll.is_alive()
+        assert engine.pool.checkedout() == 0
+        poll.join()
+        assert result["response"].json()["events"] == []
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
@@ -0,0 +1,93 @@
+"""
+Tests for the streaming order export
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from app import exports
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+
+
+def seed(db):
+    burger = MenuItem(name="Burger", description="", price=8.5, category="Main")
+    tea = MenuItem(name="Tea", description="", price=2, category="Drink")
+    db.add_all([burger, tea])
+    db.flush()
+    first = Order(status="delivered", total_amount=19, delivery_address="1 A St", guest_name="Ann, B",
+                  created_at=datetime(2026, 2, 1, 10, 0))
+    second = Order(status="pending", total_amount=2, delivery_address="2 B St", created_at=datetime(2026, 2, 2, 10, 0))
+    empty = Order(status="cancelled", total_amount=0, delivery_address="3 C St", created_at=datetime(2026, 2, 3, 10, 0))
+    db.add_all([first, second, empty])
+    db.flush()
+    db.add_all([
+        OrderItem(order_id=first.id, menu_item_id=burger.id, quantity=2, item_price=8.5),
+        OrderItem(order_id=first.id, menu_item_id=tea.id, quantity=1, item_price=2),
+        OrderItem(order_id=second.id, menu_item_id=tea.id, quantity=1, item_price=2),
+    ])
+    db.commit()
+    return first, second, empty
+
+
+def test_export_csv_one_line_per_item(client, db, admin_headers):
+    """Test the CSV export, including orders without items and quoted fields"""
+    first, _, empty = seed(db)
+    response = client.get("/admin/export/orders", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "orders.csv" in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["order_id"] for r in rows] == [str(first.id), str(first.id), str(first.id + 1), str(empty.id)]
+    assert rows[0]["guest_name"] == "Ann, B"
+    assert (rows[0]["menu_item_name"], rows[0]["quantity"], rows[0]["item_price"]) == ("Burger", "2", "8.50")
+    assert rows[0]["created_at"] == "2026-02-01T10:00:00"
+    assert rows[3]["item_id"] == ""
+
+
+def test_export_csv_neutralizes_formulas(client, db, admin_headers):
+    """Test that user-entered text starting like a formula is exported as plain text, in CSV only"""
+    db.add(Order(status="pending", total_amount=-1, delivery_address="@SUM(A1:A9)",
+                 guest_name="=HYPERLINK(\"http://x\")", guest_email="+1@example.com"))
+    db.commit()
+    row = next(csv.DictReader(io.StringIO(client.get("/admin/export/orders", headers=admin_headers).text)))
+    assert row["guest_name"] == "'=HYPERLINK(\"http://x\")"
+    assert row["guest_email"] == "'+1@example.com"
+    assert row["delivery_address"] == "'@SUM(A1:A9)"
+    # Numbers are not text and keep their sign
+    assert row["total_amount"] == "-1.00"
+
+    record = json.loads(client.get("/admin/export/orders", params={"format": "ndjson"}, headers=admin_headers).text)
+    assert record["guest_name"] == "=HYPERLINK(\"http://x\")"
+
+
+def test_export_ndjson_with_filters(client, db, admin_headers):
+    """Test NDJSON grouping and the date and status filters"""
+    first, second, _ = seed(db)
+    response = client.get(
+        "/admin/export/orders?format=ndjson&from=2026-02-01T00:00:00&to=2026-02-03T00:00:00"
+        "&status=delivered&status=pending",
+        headers=admin_headers,
+    )
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["order_id"] for r in records] == [first.id, second.id]
+    assert records[0]["total_amount"] == "19.00"
+    assert [i["menu_item_name"] for i in records[0]["items"]] == ["Burger", "Tea"]
+
+
+def test_export_requires_admin(client, auth_headers):
+    """Test that customers cannot export orders"""
+    assert client.get("/admin/export/orders", headers=auth_headers).status_code == 403
+
+
+def test_export_flushes_first_row_immediately(db, monkeypatch):
+    """Test that the first chunk is sent before the rest of the export is read"""
+    seed(db)
+    monkeypatch.setattr(exports, "CHUNK_BYTES", 10 ** 9)
+    chunks = list(exports.stream_orders(db, "ndjson"))
+    assert len(chunks) == 2
+    assert chunks[0].count(b"\n") == 1
+    assert list(exports.stream_orders(db, "csv"))[0] == (",".join(exports.CSV_FIELDS) + "\r\n").encode()
@@ -0,0 +1,154 @@
+"""
+Tests for batched driver location ingestion
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import location_store
+from app.models.order import DriverLocation, DriverLocationHistory, Order
+
+
+@pytest.fixture
+def assigned_order(db, test_driver):
+    order = Order(status="picked_up", total_amount=10, delivery_address="1 Map St", driver_id=test_driver.id)
+    db.add(order)
+    db.commit()
+    return order
+
+
+def pings(order_id, start, count, step_seconds=5):
+    return [
+        {"lat": 16.8 + i * 0.001, "lng": 96.1, "order_id": order_id,
+         "recorded_at": (start + timedelta(seconds=i * step_seconds)).isoformat()}
+        for i in range(count)
+    ]
+
+
+def test_batch_is_buffered_and_served_from_memory(client, db, driver_headers, assigned_order, query_counter):
+    """Test that a batch of pings updates the in-memory position without writing rows"""
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    response = client.post("/delivery/locations", json={"points": pings(assigned_order.id, start, 10)},
+                           headers=driver_headers)
+    assert response.status_code == 202
+    assert response.json() == {"received": 10, "accepted": 10}
+    assert db.query(DriverLocation).count() == 0
+
+    query_counter.reset()
+    response = client.get(f"/orders/{assigned_order.id}/driver-location", headers=driver_headers)
+    assert response.status_code == 200
+    assert response.json()["lat"] == pytest.approx(16.809)
+    assert query_counter.count == 0
+
+
+def test_flush_upserts_latest_and_downsamples_history(client, db, driver_headers, assigned_order):
+    """Test that a flush keeps one row per driver/order and a thinned trail"""
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    client.post("/delivery/locations", json={"points": pings(assigned_order.id, start, 20)},
+                headers=driver_headers)
+    location_store.store.flush(db)
+
+    rows = db.query(DriverLocation).all()
+    assert len(rows) == 1
+    assert rows[0].lat == pytest.approx(16.819)
+    # 20 pings 5s apart with a 30s sample interval
+    assert db.query(DriverLocationHistory).count() == 4
+
+    later = start + timedelta(minutes=5)
+    client.post("/delivery/locations", json={"points": pings(assigned_order.id, later, 1)},
+                headers=driver_headers)
+    location_store.store.flush(db)
+    assert db.query(DriverLocation).count() == 1
+    assert db.query(DriverLocation).first().lat == pytest.approx(16.8)
+
+    # After a restart the position comes from the table
+    location_store.store.clear()
+    response = client.get(f"/orders/{assigned_order.id}/driver-location", headers=driver_headers)
+    assert response.status_code == 200
+    assert response.json()["lat"] == pytest.approx(16.8)
+
+
+def test_stale_points_are_ignored(client, driver_headers, assigned_order):
+    """Test that a late-arriving older ping does not move the driver backwards"""
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    client.post("/delivery/locations", json={"points": pings(assigned_order.id, start, 3)},
+                headers=driver_headers)
+    old = [{"lat": 1.0, "lng": 1.0, "order_id": assigned_order.id, "recorded_at": start.isoformat()}]
+    response = client.post("/delivery/locations", json={"points": old}, headers=driver_headers)
+    assert response.json()["accepted"] == 0
+    response = client.get(f"/orders/{assigned_order.id}/driver-location", headers=driver_headers)
+    assert response.json()["lat"] == pytest.approx(16.802)
+
+
+def test_future_timestamps_are_clamped(client, driver_headers, assigned_order):
+    """Test that a ping dated ahead of the server clock does not block later ones"""
+    now = datetime.utcnow()
+    ahead = [{"lat": 1.0, "lng": 1.0, "order_id": assigned_order.id,
+              "recorded_at": (now + timedelta(hours=1)).isoformat()}]
+    client.post("/delivery/locations", json={"points": ahead}, headers=driver_headers)
+    assert location_store.store.latest_for_driver(assigned_order.driver_id).recorded_at <= datetime.utcnow()
+
+    current = [{"lat": 2.0, "lng": 2.0, "order_id": assigned_order.id,
+                "recorded_at": (now + timedelta(seconds=1)).isoformat()}]
+    response = client.post("/delivery/locations", json={"points": current}, headers=driver_headers)
+    assert response.json()["accepted"] == 1
+    assert location_store.store.latest_for_order(assigned_order.id).lat == pytest.approx(2.0)
+
+
+def test_ingestion_rejects_other_orders_and_roles(client, db, driver_headers, auth_headers):
+    """Test that drivers can only report against their own orders"""
+    other = Order(status="picked_up", total_amount=10, delivery_address="2 Map St")
+    db.add(other)
+    db.commit()
+    points = {"points": [{"lat": 1.0, "lng": 1.0, "order_id": other.id}]}
+    assert client.post("/delivery/locations", json=points, headers=driver_headers).status_code == 403
+    assert client.post("/delivery/locations", json=points, headers=auth_headers).status_code == 403
+    assert client.post("/delivery/locations", json={"points": [{"lat": 91, "lng": 0}]},
+                       headers=driver_headers).status_code == 422
+    assert client.get(f"/orders/{other.id}/driver-location", headers=driver_headers).status_code == 403
+
+
+def test_ownership_is_rechecked_after_delivery(client, driver_headers, assigned_order):
+    """Test that a driver can no longer report against an order once it is delivered"""
+    points = {"points": pings(assigned_order.id, datetime(2026, 1, 1), 1)}
+    assert client.post("/delivery/locations", json=points, headers=driver_headers).status_code == 202
+    assert location_store.store.is_verified(assigned_order.driver_id, assigned_order.id)
+
+    response = client.put(f"/delivery/orders/{assigned_order.id}/status", json={"status": "delivered"},
+                          headers=driver_headers)
+    assert response.status_code == 200
+    assert not location_store.store.is_verified(assigned_order.driver_id, assigned_order.id)
+    assert location_store.store.latest_for_order(assigned_order.id) is None
+    assert client.post("/delivery/locations", json=points, headers=driver_headers).status_code == 403
+
+
+def test_driver_location_is_limited_to_order_parties(client, db, driver_headers, auth_headers, admin_headers,
+                                                      test_user, assigned_order):
+    """Test that only the customer, the assigned driver and staff can follow an order"""
+    client.post("/delivery/locations", json={"points": pings(assigned_order.id, datetime(2026, 1, 1), 1)},
+                headers=driver_headers)
+    url = f"/orders/{assigned_order.id}/driver-location"
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers=auth_headers).status_code == 403
+    assert client.get(url, headers=admin_headers).status_code == 200
+
+    assigned_order.customer_id = test_user.id
+    db.commit()
+    assert client.get(url, headers=auth_headers).status_code == 200
+    assert client.get("/orders/999999/driver-location", headers=auth_headers).status_code == 404
+
+
+def test_guest_follows_driver_with_tracking_number_and_phone(client, db, driver_headers, assigned_order):
+    """Test that guests need their order's phone number, not just the tracking number"""
+    assigned_order.tracking_id = "guest-track-1"
+    assigned_order.guest_phone = "+95 9 555-0101"
+    db.commit()
+    client.post("/delivery/locations", json={"points": pings(assigned_order.id, datetime(2026, 1, 1), 2)},
+                headers=driver_headers)
+    url = "/guest/track/guest-track-1/driver-location"
+    response = client.get(url, params={"phone": "9595550101"})
+    assert response.status_code == 200
+    assert response.json()["lat"] == pytest.approx(16.801)
+    assert client.get(url).status_code == 422
+    assert client.get(url, params={"phone": "9595550199"}).status_code == 404
+    assert client.get("/guest/track/unknown/driver-location", params={"phone": "9595550101"}).status_code == 404
\ No newline at end of file
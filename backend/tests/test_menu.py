@@ -68,3 +68,151 @@ def test_create_menu_item_unauthorized(client):
         }
     )
     assert response.status_code == 401  # Unauthorized
+
+
+def test_menu_served_from_cache(client, db, query_counter):
+    """Test that repeat menu reads hit the cache and revalidate with ETag"""
+    from app.models.menu import MenuItem
+    db.add(MenuItem(name="Cached Burger", price=9.99, category="Main"))
+    db.commit()
+
+    first = client.get("/menu/")
+    assert first.status_code == 200
+    assert first.json()[0]["name"] == "Cached Burger"
+    etag = first.headers["ETag"]
+    assert "must-revalidate" in first.headers["Cache-Control"]
+
+    query_counter.reset()
+    second = client.get("/menu/")
+    assert second.content == first.content
+    assert query_counter.count == 0
+
+    not_modified = client.get("/menu/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    # Browsers and proxies may send several tags, weak tags, or "*"
+    for header in (f'"stale", {etag}', f"W/{etag}", "*"):
+        assert client.get("/menu/", headers={"If-None-Match": header}).status_code == 304
+    assert client.get("/menu/", headers={"If-None-Match": '"stale", W/"other"'}).status_code == 200
+
+
+def test_menu_not_cached_from_replicas_right_after_a_write(client, admin_headers, query_counter, monkeypatch):
+    """Test that with replicas, reads just after an invalidation are served but not cached"""
+    from app import database
+    monkeypatch.setattr(database, "DATABASE_READ_URLS", ["sqlite://"])
+    client.post("/admin/menu", json={"name": "Fresh Wrap", "price": 6.50, "category": "Main"}, headers=admin_headers)
+
+    for _ in range(2):
+        query_counter.reset()
+        assert [item["name"] for item in client.get("/menu/").json()] == ["Fresh Wrap"]
+        assert query_counter.count > 0
+
+    # Once the read-your-writes window has passed, loads are cached again
+    monkeypatch.setattr(database, "READ_YOUR_WRITES_SECONDS", 0.0)
+    client.get("/menu/")
+    query_counter.reset()
+    client.get("/menu/")
+    assert query_counter.count == 0
+
+
+def test_menu_category_filter(client, db):
+    """Test that the category parameter filters menu items"""
+    from app.models.menu import MenuItem
+    db.add_all([
+        MenuItem(name="Burger", price=9.99, category="Main"),
+        MenuItem(name="Fries", price=2.99, category="Side"),
+    ])
+    db.commit()
+    response = client.get("/menu/", params={"category": "Side"})
+    assert [item["name"] for item in response.json()] == ["Fries"]
+
+
+def test_menu_write_invalidates_cache(client, admin_headers):
+    """Test that admin menu writes are visible on the next read"""
+    etag = client.get("/menu/").headers["ETag"]
+    response = client.post(
+        "/admin/menu",
+        json={"name": "New Wrap", "price": 6.50, "category": "Main"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+
+    refreshed = client.get("/menu/", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert [item["name"] for item in refreshed.json()] == ["New Wrap"]
+
+    item_id = response.json()["id"]
+    client.delete(f"/menu/{item_id}", headers=admin_headers)
+    assert client.get("/menu/").json() == []
+
+
+def test_menu_availability_and_price_filters(client, db):
+    """Test availability and price range filters"""
+    from app.models.menu import MenuItem
+    db.add_all([
+        MenuItem(name="Tea", price=2, category="Drink", is_available=True),
+        MenuItem(name="Coffee", price=4, category="Drink", is_available=False),
+        MenuItem(name="Steak", price=25, category="Main", is_available=True),
+    ])
+    db.commit()
+    names = lambda **params: [i["name"] for i in client.get("/menu/", params=params).json()]
+    assert names(available=True) == ["Tea", "Steak"]
+    assert names(min_price=3) == ["Coffee", "Steak"]
+    assert names(min_price=1, max_price=5, available=True) == ["Tea"]
+    assert client.get("/menu/", params={"min_price": -1}).status_code == 422
+
+
+def test_menu_text_search(client, db, admin_headers):
+    """Test word-prefix search on name and description, kept in sync with edits"""
+    from app.models.menu import MenuItem
+    db.add_all([
+        MenuItem(name="Mohinga", description="Fish noodle soup", price=3, category="Main"),
+        MenuItem(name="Shan Noodles", description="Rice noodles with chicken", price=4, category="Main"),
+        MenuItem(name="Tea Leaf Salad", description="Fermented tea leaves", price=3, category="Side"),
+    ])
+    db.commit()
+    names = lambda q, **params: [i["name"] for i in client.get("/menu/", params={"q": q, **params}).json()]
+    assert names("noodle") == ["Mohinga", "Shan Noodles"]
+    assert names("NOODLE chick") == ["Shan Noodles"]
+    assert names("noodle", category="Main", max_price=3) == ["Mohinga"]
+    assert names('"tea*') == ["Tea Leaf Salad"]
+    assert names("pizza") == []
+
+    salad = db.query(MenuItem).filter_by(name="Tea Leaf Salad").one()
+    client.put(f"/menu/{salad.id}", json={
+        "name": "Pickled Tea Salad", "description": "Fermented tea leaves", "price": 3,
+        "category": "Side", "is_available": True,
+    }, headers=admin_headers)
+    assert names("pickled") == ["Pickled Tea Salad"]
+    client.delete(f"/menu/{salad.id}", headers=admin_headers)
+    assert names("pickled") == []
+
+
+def test_like_fallback_treats_underscore_literally(db):
+    """Test that the ILIKE fallback doesn't read "_" in a search word as a wildcard"""
+    from app import menu_search
+    from app.models.menu import MenuItem
+    db.add_all([
+        MenuItem(name="Combo_A", description="", price=5, category="Main"),
+        MenuItem(name="ComboXA", description="", price=5, category="Main"),
+    ])
+    db.commit()
+    # Any dialect other than sqlite/postgresql takes the plain ILIKE path
+    clause = menu_search.search_clause("mysql", "combo_a")
+    assert [i.name for i in db.query(MenuItem).filter(clause)] == ["Combo_A"]
+
+
+def test_like_fallback_requires_every_word(db):
+    """Test that the ILIKE fallback, like FTS, only matches items containing all the words"""
+    from app import menu_search
+    from app.models.menu import MenuItem
+    db.add_all([
+        MenuItem(name="Spicy Burger", description="", price=9, category="Main"),
+        MenuItem(name="Spicy Noodles", description="", price=7, category="Main"),
+        MenuItem(name="Cheese Burger", description="Not spicy", price=8, category="Main"),
+        MenuItem(name="Plain Burger", description="", price=6, category="Main"),
+    ])
+    db.commit()
+    clause = menu_search.search_clause("mysql", "spicy burger")
+    assert [i.name for i in db.query(MenuItem).filter(clause).order_by(MenuItem.id)] == ["Spicy Burger", "Cheese Burger"]
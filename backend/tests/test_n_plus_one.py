@@ -0,0 +1,62 @@
+"""
+Tests for the N+1 query detector and the max_queries fixture
+"""
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import n_plus_one
+from app.models.order import Order
+
+
+@pytest.fixture
+def lazy_app(db):
+    """An app with a deliberate N+1: each order's items load lazily"""
+    for n in range(n_plus_one.N_PLUS_ONE_THRESHOLD + 2):
+        db.add(Order(status="pending", total_amount=10, delivery_address=f"{n} Lazy St"))
+    db.commit()
+    db.expunge_all()
+
+    app = FastAPI()
+    app.add_middleware(n_plus_one.NPlusOneMiddleware)
+
+    @app.get("/lazy")
+    def lazy():
+        return [len(order.items) for order in db.query(Order).all()]
+
+    return app
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    a = n_plus_one.fingerprint("SELECT * FROM orders WHERE id IN (?, ?, ?) AND status = 'ready' LIMIT 10")
+    b = n_plus_one.fingerprint("SELECT * FROM orders\n WHERE id IN (?) AND status = 'paid' LIMIT 5")
+    assert a == b == "SELECT * FROM orders WHERE id IN (...) AND status = ? LIMIT ?"
+    assert n_plus_one.fingerprint("SELECT %(id_1)s") == n_plus_one.fingerprint("SELECT $1") == "SELECT ?"
+
+
+def test_lazy_loads_raise_under_pytest(lazy_app):
+    with pytest.raises(n_plus_one.NPlusOneError, match=r"GET /lazy: lazy load of Order\.items"):
+        TestClient(lazy_app).get("/lazy")
+
+
+def test_warn_mode_logs(lazy_app, monkeypatch, caplog):
+    monkeypatch.setattr(n_plus_one, "N_PLUS_ONE_MODE", "warn")
+    with caplog.at_level(logging.WARNING, logger="app.n_plus_one"):
+        assert TestClient(lazy_app).get("/lazy").status_code == 200
+    warnings = [r.getMessage() for r in caplog.records if r.name == "app.n_plus_one"]
+    assert len(warnings) == 1 and "Order.items" in warnings[0]
+
+
+def test_statements_outside_requests_are_ignored(db):
+    for n in range(n_plus_one.N_PLUS_ONE_THRESHOLD + 2):
+        db.query(Order).filter(Order.id == n).first()
+
+
+def test_max_queries(client, db, auth_headers, max_queries):
+    with max_queries(2):
+        assert client.get("/orders/", headers=auth_headers).status_code == 200
+    with pytest.raises(AssertionError, match="at most 0 allowed"):
+        with max_queries(0):
+            client.get("/orders/", headers=auth_headers)
@@ -0,0 +1,121 @@
+"""
+Tests for the order status state machine
+"""
+import threading
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import order_state
+from app.database import Base
+from app.models.order import DriverAssignment, Order
+from app.models.payment import Payment
+
+
+@pytest.fixture
+def ready_order(db):
+    order = Order(status="ready", total_amount=10, delivery_address="1 Race St")
+    db.add(order)
+    db.commit()
+    return order
+
+
+def test_transition_graph():
+    assert order_state.can_transition("paid", "preparing")
+    assert order_state.can_transition("pending", "cooking")
+    assert not order_state.can_transition("delivered", "ready")
+    assert order_state.sources("picked_up") == ["assigned", "ready"]
+
+
+def test_second_accept_conflicts(client, db, ready_order, driver_headers, add_driver):
+    """Test that a ready order can only be accepted once"""
+    first = driver_headers
+    add_driver("d2@example.com")
+    login = client.post("/auth/login", data={"username": "d2@example.com", "password": "driverpass"})
+    second = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    assert client.post(f"/delivery/accept/{ready_order.id}", headers=first).status_code == 200
+    response = client.post(f"/delivery/accept/{ready_order.id}", headers=second)
+    assert response.status_code == 409
+    assert db.query(DriverAssignment).count() == 1
+
+    assert client.post("/delivery/accept/9999", headers=second).status_code == 404
+
+
+def test_double_payment_conflicts(client, db):
+    """Test that an order can only be paid once"""
+    order = Order(status="pending", total_amount=10, delivery_address="1 Pay St")
+    db.add(order)
+    db.commit()
+    payment = {"order_id": order.id, "amount": 10, "payment_method": "card"}
+
+    assert client.post("/payments/process", json=payment).status_code == 201
+    assert client.post("/payments/process", json=payment).status_code == 409
+    assert db.query(Payment).count() == 1
+
+
+def test_kitchen_rejects_invalid_transition(client, db, test_kitchen):
+    """Test that the kitchen can't move a delivered order back to ready"""
+    order = Order(status="delivered", total_amount=10, delivery_address="1 Done St")
+    db.add(order)
+    db.commit()
+    login = client.post("/auth/login", data={"username": "kitchen@example.com", "password": "kitchenpass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    response = client.put(f"/kitchen/orders/{order.id}/status", json={"status": "ready"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_concurrent_accepts_have_one_winner(tmp_path):
+    """Stress: many drivers accept the same order at once; exactly one wins"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'race.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    setup = Session()
+    order = Order(status="ready", total_amount=10, delivery_address="1 Race St")
+    setup.add(order)
+    setup.commit()
+    order_id = order.id
+    setup.close()
+
+    drivers = 24
+    barrier = threading.Barrier(drivers)
+    outcomes = []
+    lock = threading.Lock()
+
+    def accept(driver_id):
+        db = Session()
+        barrier.wait()
+        try:
+            order_state.advance(db, order_id, "picked_up", ["ready"], driver_id=driver_id)
+            db.add(DriverAssignment(order_id=order_id, driver_id=driver_id, status="assigned"))
+            db.commit()
+            result = ("won", driver_id)
+        except HTTPException as exc:
+            db.rollback()
+            result = (exc.status_code, driver_id)
+        finally:
+            db.close()
+        with lock:
+            outcomes.append(result)
+
+    threads = [threading.Thread(target=accept, args=(n + 1,)) for n in range(drivers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [driver for outcome, driver in outcomes if outcome == "won"]
+    assert len(winners) == 1
+    assert sorted(outcome for outcome, _ in outcomes if outcome != "won") == [409] * (drivers - 1)
+
+    check = Session()
+    assert check.get(Order, order_id).driver_id == winners[0]
+    assert check.query(DriverAssignment).count() == 1
+    check.close()
+    engine.dispose()
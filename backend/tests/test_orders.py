@@ -121,3 +121,95 @@ def test_list_orders_as_manager(client, test_manager, db, test_user):
     assert response.status_code == 200
     orders = response.json()
     assert len(orders) >= 2  # Manager sees all orders
+
+
+def test_create_order_multiple_items(client, auth_headers, db, test_menu_item):
+    """Test that every line item is priced and saved with the order"""
+    second = MenuItem(name="Test Fries", price=3.50, category="Side", is_available=True)
+    db.add(second)
+    db.commit()
+    db.refresh(second)
+
+    response = client.post(
+        "/orders/",
+        json={
+            "items": [
+                {"menu_item_id": test_menu_item.id, "quantity": 2},
+                {"menu_item_id": second.id, "quantity": 1}
+            ],
+            "delivery_address": "123 Test St"
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert float(data["total_amount"]) == 23.50
+    assert [item["menu_item_id"] for item in data["items"]] == [test_menu_item.id, second.id]
+    assert data["items"][1]["menu_item"]["name"] == "Test Fries"
+    assert data["tracking_id"] is not None
+
+
+def test_create_order_unknown_item_writes_nothing(client, auth_headers, db, test_menu_item):
+    """Test that an unknown menu item rejects the whole order"""
+    response = client.post(
+        "/orders/",
+        json={
+            "items": [
+                {"menu_item_id": test_menu_item.id, "quantity": 1},
+                {"menu_item_id": 9999, "quantity": 1}
+            ],
+            "delivery_address": "123 Test St"
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == 404
+    assert db.query(Order).count() == 0
+
+
+def test_list_orders_keyset_pagination(client, auth_headers, test_user, db):
+    """Test that orders are paged newest first with a next cursor header"""
+    from datetime import datetime, timedelta
+    base = datetime(2025, 1, 1, 12, 0)
+    for i in range(5):
+        db.add(Order(customer_id=test_user.id, total_amount=10, status="pending",
+                     delivery_address="123 Test St", created_at=base + timedelta(minutes=i)))
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/orders/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(order["id"] for order in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    created = [o.id for o in db.query(Order).order_by(Order.created_at.desc()).all()]
+    assert seen == created
+
+
+def test_list_orders_filters(client, auth_headers, test_user, db):
+    """Test status and date range filters on the order list"""
+    from datetime import datetime
+    db.add_all([
+        Order(customer_id=test_user.id, total_amount=10, status="pending",
+              delivery_address="A", created_at=datetime(2025, 1, 1)),
+        Order(customer_id=test_user.id, total_amount=10, status="delivered",
+              delivery_address="B", created_at=datetime(2025, 2, 1)),
+    ])
+    db.commit()
+
+    response = client.get("/orders/", params={"status": "delivered"}, headers=auth_headers)
+    assert [o["delivery_address"] for o in response.json()] == ["B"]
+
+    response = client.get("/orders/", params={"created_to": "2025-01-15T00:00:00"}, headers=auth_headers)
+    assert [o["delivery_address"] for o in response.json()] == ["A"]
+
+    response = client.get("/orders/", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+"""
+Tests that order list and detail endpoints issue a fixed number of queries
+"""
+import pytest
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+from app.models.tracking import Tracking
+
+
+def login(client, email, password):
+    response = client.post("/auth/login", data={"username": email, "password": password})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def seed_orders(db, count, status, **fields):
+    """Create `count` orders with three distinct menu items each"""
+    menu = [MenuItem(name=f"Item {i}", price=5, category="Main") for i in range(3)]
+    db.add_all(menu)
+    db.flush()
+    for _ in range(count):
+        order = Order(status=status, total_amount=15, delivery_address="1 Test St", **fields)
+        order.items = [OrderItem(menu_item_id=m.id, quantity=1, item_price=5) for m in menu]
+        db.add(order)
+    db.commit()
+
+
+def queries_for(client, query_counter, url, headers=None):
+    query_counter.reset()
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return query_counter.count, response.json()
+
+
+@pytest.mark.parametrize("count", [1, 25])
+def test_read_orders_query_count(client, db, test_user, auth_headers, query_counter, count):
+    seed_orders(db, count, "pending", customer_id=test_user.id)
+    queries, orders = queries_for(client, query_counter, "/orders/", auth_headers)
+    assert len(orders) == count
+    # orders + batched items/menu items; the user comes from the auth cache
+    assert queries <= 2
+
+
+@pytest.mark.parametrize("count", [1, 25])
+def test_kitchen_queue_query_count(client, db, test_kitchen, query_counter, count):
+    headers = login(client, "kitchen@example.com", "kitchenpass")
+    seed_orders(db, count, "paid")
+    queries, orders = queries_for(client, query_counter, "/kitchen/queue", headers)
+    assert len(orders) == count
+    assert all(len(order["items"]) == 3 for order in orders)
+    assert queries <= 2
+
+
+@pytest.mark.parametrize("count", [1, 25])
+def test_available_deliveries_query_count(client, db, test_driver, query_counter, count):
+    headers = login(client, "driver@example.com", "driverpass")
+    seed_orders(db, count, "ready")
+    queries, orders = queries_for(client, query_counter, "/delivery/available", headers)
+    assert len(orders) == count
+    assert queries <= 2
+
+
+def test_order_detail_and_tracking_query_count(client, db, query_counter):
+    seed_orders(db, 1, "pending")
+    order = db.query(Order).first()
+    tracking = Tracking(order_id=order.id, status="pending")
+    db.add(tracking)
+    db.commit()
+
+    queries, data = queries_for(client, query_counter, f"/orders/{order.id}")
+    assert len(data["items"]) == 3
+    assert queries <= 2
+
+    queries, data = queries_for(client, query_counter, f"/guest/track/{tracking.id}")
+    assert len(data["items"]) == 3
+    assert queries <= 3
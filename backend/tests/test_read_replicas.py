@@ -0,0 +1,94 @@
+"""
+Tests for read replica routing and read-your-writes pinning
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app import database
+from app.read_your_writes import PIN_COOKIE, ReadYourWritesMiddleware
+
+
+def fake_session(role):
+    return lambda: SimpleNamespace(role=role, close=lambda: None)
+
+
+@pytest.fixture(autouse=True)
+def replicas(monkeypatch):
+    monkeypatch.setattr(database, "SessionLocal", fake_session("primary"))
+    monkeypatch.setattr(database, "_ReadSessionLocals", [fake_session("replica-1"), fake_session("replica-2")])
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window=60)
+
+    @app.get("/read")
+    def read(db=Depends(database.get_read_db)):
+        return {"db": db.role}
+
+    @app.post("/write")
+    def write():
+        return {"ok": True}
+
+    @app.post("/fail")
+    def fail():
+        raise HTTPException(status_code=400, detail="nope")
+
+    return app
+
+
+@pytest.fixture
+def replica_app():
+    return make_app()
+
+
+def test_reads_round_robin_across_replicas(replica_app):
+    client = TestClient(replica_app)
+    seen = {client.get("/read").json()["db"] for _ in range(4)}
+    assert seen == {"replica-1", "replica-2"}
+
+
+def test_writer_reads_from_primary(replica_app):
+    client = TestClient(replica_app)
+    headers = {"Authorization": "Bearer writer"}
+    response = client.post("/write", headers=headers)
+    assert PIN_COOKIE in response.headers["set-cookie"]
+
+    assert client.get("/read", headers=headers).json()["db"] == "primary"
+    # Another client is still load balanced
+    other = TestClient(replica_app)
+    assert other.get("/read", headers={"Authorization": "Bearer other"}).json()["db"].startswith("replica")
+
+
+def test_cookie_pins_across_workers(replica_app):
+    client = TestClient(replica_app)
+    client.post("/write")
+    # A fresh middleware instance (another worker) only has the cookie to go on
+    fresh = TestClient(make_app())
+    fresh.cookies = client.cookies
+    assert fresh.get("/read", headers={"Authorization": "Bearer elsewhere"}).json()["db"] == "primary"
+
+
+def test_anonymous_write_pins_only_that_client(replica_app):
+    # TestClients share one peer address, like guests behind a reverse proxy
+    writer, other = TestClient(replica_app), TestClient(replica_app)
+    writer.post("/write")
+    assert writer.get("/read").json()["db"] == "primary"
+    assert other.get("/read").json()["db"].startswith("replica")
+
+
+def test_failed_write_does_not_pin(replica_app):
+    client = TestClient(replica_app)
+    headers = {"Authorization": "Bearer failing"}
+    assert client.post("/fail", headers=headers).status_code == 400
+    assert client.get("/read", headers=headers).json()["db"].startswith("replica")
+
+
+def test_read_endpoints_use_read_dependency(client, test_kitchen):
+    # The main app's test client overrides both dependencies with its session
+    login = client.post("/auth/login", data={"username": "kitchen@example.com", "password": "kitchenpass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert client.get("/kitchen/queue", headers=headers).status_code == 200
@@ -0,0 +1,63 @@
+"""
+Tests for per-route request metrics and the Prometheus endpoint
+"""
+import re
+
+import pytest
+
+from app import request_metrics
+from app.models.menu import MenuItem
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    request_metrics.registry.clear()
+    yield
+    request_metrics.registry.clear()
+
+
+def sample(text, name, **labels):
+    """Value of the series `name` whose labels include `labels`, or None."""
+    for line in text.splitlines():
+        match = re.match(r"^(\w+)(\{.*\})? (\S+)$", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ""))
+        if all(found.get(key) == str(value) for key, value in labels.items()):
+            return float(match.group(3))
+    return None
+
+
+def test_metrics_by_route_template(client, db):
+    db.add(MenuItem(name="Burger", price=5, category="Main"))
+    db.commit()
+    assert client.get("/menu/").status_code == 200
+    assert client.get("/orders/1").status_code == 404
+    assert client.get("/orders/2").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+
+    assert sample(text, "http_requests_total", method="GET", route="/orders/{order_id}", status=404) == 2
+    assert sample(text, "http_requests_total", method="GET", route="/menu/", status=200) == 1
+    assert sample(text, "http_request_duration_seconds_count", method="GET", route="/orders/{order_id}") == 2
+    assert sample(text, "http_request_duration_seconds_bucket", method="GET", route="/menu/", le="+Inf") == 1
+    assert sample(text, "http_response_size_bytes_sum", method="GET", route="/menu/") > 0
+    assert sample(text, "http_request_db_queries_total", method="GET", route="/orders/{order_id}") >= 2
+    # The scrape itself is in flight while it renders
+    assert sample(text, "http_requests_in_flight") == 1
+
+
+def test_unknown_paths_share_a_label(client):
+    client.get("/no/such/path/1")
+    client.get("/no/such/path/2")
+    text = client.get("/metrics").text
+    assert sample(text, "http_requests_total", route="unmatched", status=404) == 2
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(request_metrics, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
@@ -0,0 +1,118 @@
+"""
+Tests for the sales_daily rollup behind /admin/reports/sales
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app import sales_rollup
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+from app.database import Base
+from app.models.report import RollupWatermark, SalesDaily
+
+
+@pytest.fixture
+def menu(db):
+    items = {
+        "Main": MenuItem(name="Burger", description="", price=10, category="Main"),
+        "Drink": MenuItem(name="Tea", description="", price=2, category="Drink"),
+    }
+    db.add_all(items.values())
+    db.commit()
+    return items
+
+
+def add_order(db, menu, created_at, lines):
+    order = Order(status="delivered", delivery_address="x", created_at=created_at,
+                  total_amount=sum(menu[c].price * q for c, q in lines))
+    db.add(order)
+    db.flush()
+    db.add_all(OrderItem(order_id=order.id, menu_item_id=menu[c].id, quantity=q, item_price=menu[c].price)
+               for c, q in lines)
+    db.commit()
+    return order
+
+
+def raw_daily(db):
+    """The report as it used to be computed, straight from orders"""
+    from sqlalchemy import func
+    rows = db.query(func.date(Order.created_at), func.count(Order.id), func.sum(Order.total_amount)) \
+        .group_by(func.date(Order.created_at)).all()
+    return [{"date": str(d), "count": c, "revenue": float(r)} for d, c, r in rows]
+
+
+def test_report_matches_raw_aggregate(client, db, admin_headers, menu):
+    """Test that the daily report keeps its shape and numbers"""
+    add_order(db, menu, datetime(2026, 3, 1, 9, 15), [("Main", 2)])
+    add_order(db, menu, datetime(2026, 3, 1, 18, 0), [("Main", 1), ("Drink", 3)])
+    add_order(db, menu, datetime(2026, 3, 3, 12, 0), [("Drink", 1)])
+
+    response = client.get("/admin/reports/sales", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == raw_daily(db)
+
+    response = client.get("/admin/reports/sales?from=2026-03-02&to=2026-03-03", headers=admin_headers)
+    assert response.json() == [{"date": "2026-03-03", "count": 1, "revenue": 2.0}]
+
+
+def test_hourly_and_category_granularity(client, db, admin_headers, menu):
+    """Test hourly and per-category breakdowns"""
+    add_order(db, menu, datetime(2026, 3, 1, 9, 15), [("Main", 2)])
+    add_order(db, menu, datetime(2026, 3, 1, 9, 45), [("Main", 1), ("Drink", 3)])
+    add_order(db, menu, datetime(2026, 3, 1, 18, 0), [("Drink", 1)])
+
+    hourly = client.get("/admin/reports/sales?granularity=hour", headers=admin_headers).json()
+    assert hourly == [
+        {"date": "2026-03-01", "hour": 9, "count": 2, "revenue": 36.0},
+        {"date": "2026-03-01", "hour": 18, "count": 1, "revenue": 2.0},
+    ]
+    by_category = client.get("/admin/reports/sales?by_category=true", headers=admin_headers).json()
+    assert by_category == [
+        {"date": "2026-03-01", "category": "Drink", "count": 2, "items": 4, "revenue": 8.0},
+        {"date": "2026-03-01", "category": "Main", "count": 2, "items": 3, "revenue": 30.0},
+    ]
+    assert client.get("/admin/reports/sales?granularity=week", headers=admin_headers).status_code == 422
+
+
+def test_refresh_only_rebuilds_changed_days(db, menu):
+    """Test that new orders only cause their own days to be recomputed"""
+    now = datetime(2026, 3, 10, 12, 0)
+    for day in range(1, 6):
+        add_order(db, menu, datetime(2026, 3, day, 12, 0), [("Main", 1)])
+    assert sales_rollup.refresh(db, now=now)["days_refreshed"] == 7  # 5 days of orders, plus today and yesterday
+
+    # Touch a rollup row the next refresh must leave alone
+    db.query(SalesDaily).filter(SalesDaily.day == datetime(2026, 3, 1).date()).update({"revenue": Decimal("99")})
+    db.commit()
+
+    add_order(db, menu, datetime(2026, 3, 4, 13, 0), [("Drink", 2)])
+    assert sales_rollup.refresh(db, now=now)["days_refreshed"] == 3
+    report = {row["date"]: row for row in sales_rollup.report(db)}
+    assert report["2026-03-04"] == {"date": "2026-03-04", "count": 2, "revenue": 14.0}
+    assert report["2026-03-01"]["revenue"] == 99.0
+
+
+def test_first_refreshes_racing_on_the_watermark(tmp_path):
+    """Test that a refresh survives another worker creating the watermark row first"""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollup.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db, other = Session(), Session()
+
+    @event.listens_for(db, "before_flush", once=True)
+    def other_worker_wins(session, flush_context, instances):
+        other.add(RollupWatermark(name=sales_rollup.ROLLUP_NAME, last_order_id=0))
+        other.commit()
+
+    try:
+        assert sales_rollup.refresh(db)["last_order_id"] == 0
+        assert db.query(RollupWatermark).count() == 1
+    finally:
+        db.close()
+        other.close()
+        engine.dispose()
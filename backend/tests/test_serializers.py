@@ -0,0 +1,63 @@
+"""
+Tests that the direct list serializers produce the response models' exact JSON
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import models, serializers
+from app.schemas.menu import MenuItemResponse
+from app.schemas.order import OrderResponse
+from app.schemas.user import UserResponse
+
+
+def model_json(model, rows):
+    return TypeAdapter(List[model]).dump_json([model.model_validate(row) for row in rows])
+
+
+def sample_orders():
+    burger = models.MenuItem(id=1, name="Burger", description=None, price=Decimal("8.50"),
+                             image_url=None, category="Main", is_available=True)
+    cola = models.MenuItem(id=2, name='Cola "Zero"', description="Cold\nand fizzy", price=Decimal("2.00"),
+                           image_url="/static/cola.jpg", category=None, is_available=False)
+    return [
+        models.Order(id=1, tracking_id="7", status="paid", delivery_address="1 Main St", notes="No onions",
+                     total_amount=Decimal("19.00"), created_at=datetime(2025, 3, 1, 12, 30, 5, 120000),
+                     customer_id=3, items=[
+                         models.OrderItem(id=1, menu_item_id=1, menu_item=burger, quantity=2, item_price=Decimal("8.50")),
+                         models.OrderItem(id=2, menu_item_id=2, menu_item=cola, quantity=1, item_price=Decimal("2.00")),
+                     ]),
+        models.Order(id=2, tracking_id=None, status="pending", delivery_address="Café Ünïcode 2",
+                     guest_name="Guest", guest_email="g@example.com", guest_phone="555",
+                     total_amount=10, created_at=datetime(2025, 3, 1, tzinfo=timezone.utc), items=[]),
+    ]
+
+
+def test_orders_match_response_model():
+    orders = sample_orders()
+    assert serializers.dumps(serializers.orders(orders)) == model_json(OrderResponse, orders)
+
+
+def test_menu_items_match_response_model():
+    items = [item.menu_item for item in sample_orders()[0].items]
+    assert serializers.dumps(serializers.menu_items(items)) == model_json(MenuItemResponse, items)
+
+
+def test_users_match_response_model():
+    users = [models.User(id=1, email="a@example.com", name="A", role="admin", created_at=datetime(2025, 1, 2, 3, 4, 5))]
+    assert serializers.dumps(serializers.users(users)) == model_json(UserResponse, users)
+
+
+def test_read_orders_keeps_cursor_header(client, db, test_user, auth_headers):
+    for n in range(3):
+        db.add(models.Order(status="pending", total_amount=5, delivery_address=f"{n} St", customer_id=test_user.id))
+    db.commit()
+
+    response = client.get("/orders/?limit=2", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert len(response.json()) == 2
+    assert response.json()[0]["total_amount"] == "5.00"
+    assert response.headers["X-Next-Cursor"]
@@ -0,0 +1,62 @@
+"""
+Tests for the nearest-driver grid index and endpoint
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import location_store
+from app.models.order import DriverLocation, Order
+from app.spatial import GridIndex, haversine_km
+
+
+def test_grid_matches_brute_force():
+    """Test that ring search returns the same k nearest as a full scan"""
+    rng = random.Random(7)
+    index = GridIndex(cell_km=0.5)
+    points = {i: (16.8 + rng.uniform(-0.2, 0.2), 96.15 + rng.uniform(-0.2, 0.2)) for i in range(2000)}
+    for key, (lat, lng) in points.items():
+        index.upsert(key, lat, lng)
+    # Moving a point must drop it from its old cell
+    index.upsert(0, 10.0, 10.0)
+    points[0] = (10.0, 10.0)
+
+    for _ in range(50):
+        lat, lng = 16.8 + rng.uniform(-0.25, 0.25), 96.15 + rng.uniform(-0.25, 0.25)
+        expected = sorted((haversine_km(lat, lng, *p), key) for key, p in points.items())[:5]
+        assert [key for key, _ in index.nearest(lat, lng, 5)] == [key for _, key in expected]
+
+    assert index.nearest(16.8, 96.15, 5, max_km=0.001) == []
+    assert [key for key, _ in index.nearest(10.0, 10.0, 1)] == [0]
+
+
+def test_nearest_endpoint_skips_busy_and_silent_drivers(client, db, admin_headers, auth_headers, add_driver):
+    """Test that only idle drivers with a recent ping are offered, closest first"""
+    near = add_driver("near@example.com", 16.800, 96.150)
+    busy = add_driver("busy@example.com", 16.8001, 96.1501)
+    far = add_driver("far@example.com", 16.830, 96.150)
+    add_driver("silent@example.com", 16.8002, 96.1502, datetime.utcnow() - timedelta(hours=1))
+    add_driver("distant@example.com", 18.0, 96.0)
+    db.add(Order(status="picked_up", total_amount=10, delivery_address="x", driver_id=busy.id))
+    db.commit()
+
+    response = client.get("/users/drivers/nearest?lat=16.8&lng=96.15&k=5", headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [d["driver_id"] for d in body] == [near.id, far.id]
+    assert body[1]["distance_km"] == pytest.approx(3.34, abs=0.01)
+
+    assert client.get("/users/drivers/nearest?lat=16.8&lng=96.15", headers=auth_headers).status_code == 403
+
+
+def test_store_warms_from_table(db, test_driver):
+    """Test that the newest stored row per driver seeds the index after a restart"""
+    db.add_all([
+        DriverLocation(driver_id=test_driver.id, lat=1.0, lng=1.0, updated_at=datetime(2026, 1, 1, 12, 0)),
+        DriverLocation(driver_id=test_driver.id, lat=2.0, lng=2.0, updated_at=datetime(2026, 1, 1, 12, 5)),
+    ])
+    db.commit()
+    assert location_store.store.warm(db) == 1
+    [(position, _)] = location_store.store.nearest(2.0, 2.0, 1, 10)
+    assert (position.driver_id, position.lat) == (test_driver.id, 2.0)
@@ -0,0 +1,49 @@
+"""
+Tests for the SQL profiler headers and the slow-query log
+"""
+import json
+import logging
+
+import pytest
+
+from app import sql_profiler
+
+
+@pytest.fixture
+def profiling(monkeypatch):
+    monkeypatch.setattr(sql_profiler, "SQL_PROFILER_ENABLED", True)
+
+
+def test_admin_gets_sql_summary(client, admin_headers, profiling):
+    response = client.get("/admin/dashboard", headers={**admin_headers, "X-Debug-SQL": "1"})
+    assert response.status_code == 200
+
+    summary = dict(part.split("=") for part in response.headers["X-Debug-SQL"].split("; "))
+    assert int(summary["queries"]) >= 1
+    assert float(summary["total_ms"]) > 0
+    statements = json.loads(response.headers["X-Debug-SQL-Statements"])
+    assert statements and "dashboard_counters" in statements[0]["sql"]
+    assert {"ms", "rows", "count", "sql"} <= statements[0].keys()
+
+
+def test_non_admin_gets_no_summary(client, auth_headers, profiling):
+    response = client.get("/orders/", headers={**auth_headers, "X-Debug-SQL": "1"})
+    assert response.status_code == 200
+    assert "X-Debug-SQL" not in response.headers
+
+
+def test_profiler_is_opt_in(client, admin_headers):
+    response = client.get("/admin/dashboard", headers={**admin_headers, "X-Debug-SQL": "1"})
+    assert "X-Debug-SQL" not in response.headers
+
+
+def test_slow_queries_are_logged(client, monkeypatch, caplog):
+    monkeypatch.setattr(sql_profiler, "SLOW_QUERY_MS", 1e-9)
+    with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+        client.get("/menu/")
+
+    entries = [json.loads(record.getMessage()) for record in caplog.records if record.name == "app.sql.slow"]
+    assert entries
+    assert entries[0]["event"] == "slow_query"
+    assert entries[0]["request"] == "GET /menu/"
+    assert "menu_items" in entries[0]["statement"]